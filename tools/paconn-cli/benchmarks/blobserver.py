@@ -0,0 +1,175 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+A local, in-memory stand-in for the blob storage endpoint.
+
+Supports the requests used by the connector file uploads: single put,
+put block and put block list, and getting a blob back. A latency per
+request and a bandwidth per connection can be simulated.
+
+    python benchmarks/blobserver.py --port 10000 --latency 30 --bandwidth 20
+"""
+
+import time
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate
+from xml.etree import ElementTree
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Expiry of the shared access signatures handed out by the server
+SAS_QUERY = 'sv=2018-03-28&sr=c&sp=rw&se=2099-01-01T00%3A00%3A00Z&sig=local'
+
+
+class BlobStore:
+    """
+    In-memory blobs and uncommitted blocks, with request statistics.
+    """
+    def __init__(self, latency=0, bandwidth=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.blobs = {}
+        self.blocks = {}
+        self.requests = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    def reset_statistics(self):
+        with self.lock:
+            self.requests = 0
+            self.bytes_received = 0
+            self.bytes_sent = 0
+
+    def record(self, bytes_received=0, bytes_sent=0, request=True):
+        """
+        Counts a request and the sizes of its bodies.
+        """
+        with self.lock:
+            self.requests += 1 if request else 0
+            self.bytes_received += bytes_received
+            self.bytes_sent += bytes_sent
+
+    def simulate_transfer(self, size):
+        """
+        Waits for the latency and for the transfer of size bytes at the bandwidth.
+        """
+        delay = self.latency
+        if self.bandwidth:
+            delay += size / self.bandwidth
+        if delay:
+            time.sleep(delay)
+
+    def put(self, path, query, body):
+        """
+        Stores a blob, a block of a blob, or commits the blocks of a blob.
+        """
+        operation = query.get('comp', [None])[0]
+        with self.lock:
+            if operation == 'block':
+                self.blocks[(path, query['blockid'][0])] = body
+            elif operation == 'blocklist':
+                block_ids = [element.text for element in ElementTree.fromstring(body)]
+                self.blobs[path] = b''.join(self.blocks.pop((path, block_id)) for block_id in block_ids)
+            else:
+                self.blobs[path] = body
+
+    def get(self, path):
+        """
+        Returns a blob, or None.
+        """
+        with self.lock:
+            return self.blobs.get(path)
+
+
+class BlobHandler(BaseHTTPRequestHandler):
+    """
+    Handles the blob requests of a BlobStore, set as the store attribute of the server.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', '"{}"'.format(hashlib.md5(body).hexdigest()))
+        self.send_header('Last-Modified', formatdate(usegmt=True))
+        self.send_header('x-ms-request-id', str(id(self)))
+        for (name, value) in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length) if length else b''
+
+    def _put_blob(self, url, body):
+        store = self.server.store
+        store.record(bytes_received=len(body))
+        store.simulate_transfer(len(body))
+        store.put(url.path, parse_qs(url.query), body)
+        self._send(201)
+
+    def _get_blob(self, url):
+        store = self.server.store
+        blob = store.get(url.path)
+        store.record(bytes_sent=len(blob or b''))
+        store.simulate_transfer(len(blob or b''))
+        if blob is None:
+            self._send(404)
+        else:
+            self._send(200, blob, {'Content-Type': 'application/octet-stream'})
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        self._put_blob(urlparse(self.path), self._read_body())
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._get_blob(urlparse(self.path))
+
+
+def start_server(port=0, latency=0, bandwidth=None):
+    """
+    Starts a blob server in a background thread.
+    The latency is in seconds and the bandwidth in bytes per second per connection.
+    Returns the server, its store is the server.store attribute.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), BlobHandler)
+    server.daemon_threads = True
+    server.store = BlobStore(latency=latency, bandwidth=bandwidth)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_sas_url(server, container):
+    """
+    Returns a shared access signature URL for a container of the server.
+    """
+    return 'http://127.0.0.1:{}/{}?{}'.format(server.server_address[1], container, SAS_QUERY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs a local blob storage stand-in.')
+    parser.add_argument('--port', type=int, default=10000, help='Port to listen on.')
+    parser.add_argument('--latency', type=float, default=0, help='Latency per request in milliseconds.')
+    parser.add_argument('--bandwidth', type=float, default=0, help='Bandwidth per connection in MB/s.')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), BlobHandler)
+    server.daemon_threads = True
+    server.store = BlobStore(
+        latency=args.latency / 1000,
+        bandwidth=args.bandwidth * 1024 * 1024 or None)
+    print('Blob server listening, upload with {}'.format(get_sas_url(server, 'container')))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+End-to-end benchmark of the paconn commands against the local RP stand-in.
+
+Copies connectors of the repository to a temporary directory, and runs
+create, update of changed swaggers, update of the unchanged connectors,
+download and validate against mockserver.py, with a temporary home
+directory so that the caches and the login of the user are left alone. Reports the median wall
+time, the number of requests and the bytes sent and received per command.
+
+    python benchmarks/commands.py
+    python benchmarks/commands.py --connectors 20 --workers 8 --latency 100
+    python benchmarks/commands.py --throttle 10 --max-rps 8
+    python benchmarks/commands.py --save before.json
+    python benchmarks/commands.py --compare before.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(PACKAGE_DIR))
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mockserver import start_server, get_url, ENVIRONMENTS  # noqa: E402 pylint: disable=wrong-import-position
+
+ENVIRONMENT = ENVIRONMENTS[1]
+
+CONNECTOR_FILES = {
+    'apiProperties': 'apiProperties.json',
+    'apiDefinition': 'apiDefinition.swagger.json',
+    'icon': 'icon.png',
+    'script': 'script.csx'
+}
+
+# Wall time increase reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.1
+
+
+def _uses_oauth(api_properties_file):
+    """
+    Returns true if a connector has an OAuth connection parameter, which needs a client secret to be created.
+    """
+    with open(api_properties_file, 'rb') as file:
+        properties = json.loads(file.read().decode('utf-8-sig')).get('properties', {})
+
+    parameters = list((properties.get('connectionParameters') or {}).values())
+    for parameter_set in (properties.get('connectionParameterSets') or {}).get('values') or []:
+        parameters.extend((parameter_set.get('parameters') or {}).values())
+    return any(isinstance(parameter, dict) and parameter.get('oAuthSettings') for parameter in parameters)
+
+
+def _find_connectors(count):
+    """
+    Returns the directories of the first certified connectors with an icon and without OAuth,
+    since a batch create can't be given the client secrets of the connectors.
+    """
+    directory = os.path.join(REPOSITORY_DIR, 'certified-connectors')
+    connectors = []
+    for name in sorted(os.listdir(directory)):
+        connector_dir = os.path.join(directory, name)
+        has_files = all(
+            os.path.isfile(os.path.join(connector_dir, CONNECTOR_FILES[key]))
+            for key in ('apiProperties', 'apiDefinition', 'icon'))
+        if has_files and not _uses_oauth(os.path.join(connector_dir, CONNECTOR_FILES['apiProperties'])):
+            connectors.append(connector_dir)
+        if len(connectors) == count:
+            break
+    return connectors
+
+
+def _prepare(work_dir, connectors, url):
+    """
+    Copies the connectors with a settings file for the stand-in.
+    """
+    for connector_dir in connectors:
+        target_dir = os.path.join(work_dir, 'connectors', os.path.basename(connector_dir))
+        os.makedirs(target_dir)
+        settings = {
+            'environment': ENVIRONMENT,
+            'powerAppsUrl': url,
+            'flowUrl': url
+        }
+        for (key, file_name) in CONNECTOR_FILES.items():
+            if os.path.isfile(os.path.join(connector_dir, file_name)):
+                shutil.copy(os.path.join(connector_dir, file_name), target_dir)
+                settings[key] = file_name
+        with open(os.path.join(target_dir, 'settings.json'), 'w') as file:
+            json.dump(settings, file, indent=2)
+
+    # Any token is accepted by the stand-in
+    paconn_dir = os.path.join(work_dir, 'home', '.paconn')
+    os.makedirs(paconn_dir)
+    with open(os.path.join(paconn_dir, 'accessTokens.json'), 'w') as file:
+        json.dump({
+            'access_token': 'benchmark',
+            'token_type': 'Bearer',
+            'expires_on': time.time() + 24 * 3600,
+            'oid': 'benchmark'
+        }, file)
+
+
+def _change_swaggers(work_dir):
+    """
+    Changes the description of every copied swagger, so that the update doesn't skip them.
+    """
+    connectors_dir = os.path.join(work_dir, 'connectors')
+    for name in os.listdir(connectors_dir):
+        file_path = os.path.join(connectors_dir, name, CONNECTOR_FILES['apiDefinition'])
+        with open(file_path, 'rb') as file:
+            swagger = json.loads(file.read().decode('utf-8-sig'))
+        info = swagger.setdefault('info', {})
+        info['description'] = '{} (benchmark update)'.format(info.get('description', ''))
+        with open(file_path, 'w') as file:
+            json.dump(swagger, file, indent=2)
+
+
+def _get_commands(work_dir, url, connectors, args):
+    """
+    Returns the (name, arguments, preparation) of the commands, the preparation run before
+    each run of the command, or None.
+    """
+    batch = ['--batch', os.path.join(work_dir, 'connectors'), '--pau', url, '--workers', str(args.workers)]
+    throughput = ['--max-rps', str(args.max_rps)] if args.max_rps else []
+    swagger = os.path.join(
+        work_dir, 'connectors', os.path.basename(connectors[0]), CONNECTOR_FILES['apiDefinition'])
+    return [
+        ('create', ['create', '--overwrite-settings'] + batch + throughput, None),
+        # The first update after the create would be skipped, the changed swaggers are updated
+        ('update', ['update'] + batch + throughput, lambda: _change_swaggers(work_dir)),
+        ('update unchanged', ['update'] + batch + throughput, None),
+        ('download', ['download', '--all', '--env', ENVIRONMENT, '--dest', os.path.join(work_dir, 'download'),
+                      '--pau', url, '--workers', str(args.workers)] + throughput, None),
+        ('validate', ['validate', '--api-def', swagger, '--pau', url, '--no-cache'], None)
+    ]
+
+
+def run(connectors, args):
+    """
+    Runs the commands once against a new stand-in.
+    Returns the wall time in milliseconds, requests, bytes sent and received,
+    and throttled requests by command.
+    """
+    server = start_server(
+        latency=args.latency / 1000,
+        bandwidth=args.bandwidth * 1024 * 1024 or None,
+        throttle=args.throttle or None)
+    service = server.store
+    url = get_url(server)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        _prepare(work_dir, connectors, url)
+        env = dict(
+            os.environ,
+            PYTHONPATH=PACKAGE_DIR,
+            HOME=os.path.join(work_dir, 'home'),
+            USERPROFILE=os.path.join(work_dir, 'home'))
+
+        for (name, command, preparation) in _get_commands(work_dir, url, connectors, args):
+            if preparation:
+                preparation()
+            service.reset_statistics()
+            start = time.perf_counter()
+            process = subprocess.run(
+                [sys.executable, '-m', 'paconn'] + command,
+                cwd=work_dir,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True)
+            wall_time = (time.perf_counter() - start) * 1000
+            if process.returncode:
+                raise RuntimeError('paconn {} failed:\n{}'.format(name, process.stdout))
+            results[name] = {
+                'time': wall_time,
+                'requests': service.requests,
+                'sent': service.bytes_received,
+                'received': service.bytes_sent,
+                'throttled': service.throttled
+            }
+
+    server.shutdown()
+    return results
+
+
+def _median_results(runs):
+    return {
+        name: {
+            key: statistics.median(result[name][key] for result in runs)
+            for key in runs[0][name]
+        }
+        for name in runs[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the paconn commands against a local RP stand-in.')
+    parser.add_argument('--connectors', type=int, default=10, help='Number of connectors.')
+    parser.add_argument('--workers', type=int, default=4, help='Number of workers of the batch commands.')
+    parser.add_argument('--latency', type=float, default=50, help='Latency per request in milliseconds.')
+    parser.add_argument('--bandwidth', type=float, default=0, help='Bandwidth per connection in MB/s.')
+    parser.add_argument('--throttle', type=float, default=0, help='Requests per second above which the stand-in throttles.')  # noqa: E501
+    parser.add_argument('--max-rps', type=float, default=0, help='Requests per second limit passed to the commands.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs.')
+    parser.add_argument('--save', help='Write the results to a JSON file.')
+    parser.add_argument('--compare', help='Compare the results with a JSON file written by --save.')
+    args = parser.parse_args()
+
+    connectors = _find_connectors(args.connectors)
+    results = _median_results([run(connectors, args) for _ in range(args.repeat)])
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+    print('{} connectors, {} workers, latency {:.0f} ms, throttle {} rps, max-rps {}'.format(
+        len(connectors), args.workers, args.latency, args.throttle or '-', args.max_rps or '-'))
+    print('{:<18} {:>10} {:>9} {:>10} {:>10} {:>10}{}'.format(
+        'command', 'time (ms)', 'requests', 'sent (KB)', 'recv (KB)', 'throttled',
+        '  {:>10}'.format('change') if baseline else ''))
+
+    regressions = []
+    for (name, result) in results.items():
+        change = ''
+        if baseline and name in baseline:
+            ratio = result['time'] / baseline[name]['time'] - 1
+            change = '  {:>+9.0%}'.format(ratio)
+            if ratio > REGRESSION_THRESHOLD:
+                regressions.append(name)
+        print('{:<18} {:>10.0f} {:>9.0f} {:>10.1f} {:>10.1f} {:>10.0f}{}'.format(
+            name,
+            result['time'],
+            result['requests'],
+            result['sent'] / 1024,
+            result['received'] / 1024,
+            result['throttled'],
+            change))
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if regressions:
+        print('Slower by more than {:.0%}: {}'.format(REGRESSION_THRESHOLD, ', '.join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+JSON backend benchmark on the largest swagger files of the repository.
+
+Compares the standard library with the paconn JSON facade, which uses
+orjson when it is installed, for loading, formatting and hashing, and
+checks that the facade output is identical to the standard library output.
+
+    python benchmarks/json_backend.py
+    python benchmarks/json_backend.py --files 20 --repeat 10
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import statistics
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(PACKAGE_DIR))
+
+sys.path.insert(0, PACKAGE_DIR)
+
+from paconn.common import jsonutil  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def _find_swaggers(count):
+    """
+    Returns the largest swagger files of the repository.
+    """
+    pattern = os.path.join(REPOSITORY_DIR, '**', 'apiDefinition.swagger.json')
+    files = [
+        file for file in glob.glob(pattern, recursive=True)
+        if not file.startswith(PACKAGE_DIR)
+    ]
+    return sorted(files, key=os.path.getsize, reverse=True)[:count]
+
+
+def _median_ms(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def _stdlib_format(content):
+    return json.dumps(content, indent=2, separators=(',', ': '))
+
+
+def _stdlib_canonical(content):
+    return json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def measure(file_path, repeat):
+    """
+    Returns the (stdlib, facade) median times in milliseconds
+    of loading, formatting and hashing a swagger.
+    """
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    text = data.decode('utf-8-sig')
+
+    content = json.loads(text)
+    if jsonutil.loads(data) != content:
+        raise AssertionError('Different content loaded from {}'.format(file_path))
+    if jsonutil.dumps(content, indent=2) != _stdlib_format(content):
+        raise AssertionError('Different formatting of {}'.format(file_path))
+    if jsonutil.dumps(content, sort_keys=True, ensure_ascii=False) != _stdlib_canonical(content):
+        raise AssertionError('Different canonical form of {}'.format(file_path))
+
+    return {
+        'load': (
+            _median_ms(lambda: json.loads(data.decode('utf-8-sig')), repeat),
+            _median_ms(lambda: jsonutil.loads(data), repeat)),
+        'format': (
+            _median_ms(lambda: _stdlib_format(content), repeat),
+            _median_ms(lambda: jsonutil.dumps(content, indent=2), repeat)),
+        'hash': (
+            _median_ms(lambda: _stdlib_canonical(content), repeat),
+            _median_ms(lambda: jsonutil.dumps(content, sort_keys=True, ensure_ascii=False), repeat)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the paconn JSON backend on the largest swaggers.')
+    parser.add_argument('--files', type=int, default=10, help='Number of swagger files.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs per operation.')
+    args = parser.parse_args()
+
+    print('JSON backend: {}'.format(jsonutil.get_backend()))
+    print('{:<40} {:>8}  {:>17}  {:>17}  {:>17}'.format(
+        'swagger', 'KB', 'load (ms)', 'format (ms)', 'hash (ms)'))
+
+    totals = {'load': [0, 0], 'format': [0, 0], 'hash': [0, 0]}
+    for file_path in _find_swaggers(args.files):
+        results = measure(file_path, args.repeat)
+        columns = []
+        for operation in ('load', 'format', 'hash'):
+            (stdlib_time, facade_time) = results[operation]
+            totals[operation][0] += stdlib_time
+            totals[operation][1] += facade_time
+            columns.append('{:>7.1f} -> {:>6.1f}'.format(stdlib_time, facade_time))
+        print('{:<40} {:>8.0f}  {}'.format(
+            os.path.basename(os.path.dirname(file_path))[:40],
+            os.path.getsize(file_path) / 1024,
+            '  '.join(columns)))
+
+    print('{:<40} {:>8}  {}'.format('total', '', '  '.join(
+        '{:>7.1f} -> {:>6.1f}'.format(*totals[operation]) for operation in ('load', 'format', 'hash'))))
+    print('All outputs are identical to the standard library.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+A local, in-memory stand-in for the PowerApps and Flow RPs.
+
+Serves the requests of the paconn commands: the environments of the
+Flow RP, the custom connectors (paginated listing, get, create and
+update), the swagger validation and the resource storage of the
+PowerApps RP, and the blob endpoint of the resource storages, which
+also serves the swaggers and icons of the connectors. A latency per
+request, a bandwidth per connection and a throttling rate, above which
+requests are rejected with 429 and a Retry-After, can be simulated.
+
+    python benchmarks/mockserver.py --port 8000 --latency 50 --throttle 20
+
+Point the commands to it with --pau http://127.0.0.1:8000, and the
+environments listing with "flowUrl": "http://127.0.0.1:8000" in a settings file.
+Any access token is accepted.
+"""
+
+import re
+import json
+import gzip
+import math
+import time
+import uuid
+import argparse
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer
+
+from blobserver import BlobStore, BlobHandler, SAS_QUERY
+
+# Environments of the stand-in
+ENVIRONMENTS = ('Default-mock', 'mock-environment')
+
+# Connectors per page of the connector listing
+PAGE_SIZE = 25
+
+_CONNECTOR_PATH = re.compile(r'/providers/Microsoft\.PowerApps/apis(?:/([^/]+))?$')
+_ENVIRONMENT_FILTER = re.compile(r"environment eq '([^']*)'")
+
+
+def _get_time():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+class MockService(BlobStore):
+    """
+    The connectors of the environments and the blobs of the resource storages,
+    with request statistics by operation.
+    """
+    def __init__(self, latency=0, bandwidth=None, throttle=None, page_size=PAGE_SIZE):
+        super().__init__(latency=latency, bandwidth=bandwidth)
+        self.throttle = throttle
+        self.page_size = page_size
+        self.connectors = {}
+        self.operations = {}
+        self.throttled = 0
+        self._tokens = throttle or 0
+        self._updated = time.monotonic()
+
+    def reset_statistics(self):
+        super().reset_statistics()
+        with self.lock:
+            self.operations = {}
+            self.throttled = 0
+
+    def record_operation(self, operation):
+        with self.lock:
+            self.operations[operation] = self.operations.get(operation, 0) + 1
+
+    def try_acquire(self):
+        """
+        Returns None when a request is accepted, or the seconds to wait when it is throttled.
+        The service accepts requests at the throttle rate per second, with bursts of one second.
+        """
+        if not self.throttle:
+            return None
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(self.throttle, self._tokens + (now - self._updated) * self.throttle)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            self.throttled += 1
+            return (1 - self._tokens) / self.throttle
+
+
+class MockHandler(BlobHandler):
+    """
+    Handles the RP and blob requests of a MockService, set as the store attribute of the server.
+    """
+    def _get_base_url(self):
+        return 'http://{}:{}'.format(*self.server.server_address[:2])
+
+    def _send_json(self, status, content):
+        body = json.dumps(content).encode('utf-8')
+        self.server.store.record(bytes_sent=len(body), request=False)
+        self._send(status, body, {'Content-Type': 'application/json'})
+
+    def _read_json(self):
+        body = self._read_body()
+        self.server.store.record(bytes_received=len(body), request=False)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return json.loads(body) if body else None
+
+    def _handle(self, verb):
+        url = urlparse(self.path)
+        service = self.server.store
+
+        if url.path.startswith('/blob/'):
+            service.record_operation('{} blob'.format(verb))
+            if verb == 'PUT':
+                return self._put_blob(url, self._read_body())
+            return self._get_blob(url)
+
+        service.record()
+        wait = service.try_acquire()
+        if wait is not None:
+            self._read_body()
+            service.simulate_transfer(0)
+            service.record_operation('{} throttled'.format(verb))
+            return self._send(429, b'', {'Retry-After': str(math.ceil(wait))})
+
+        payload = self._read_json() if verb in ('POST', 'PATCH') else None
+        service.simulate_transfer(int(self.headers.get('Content-Length', 0)))
+
+        query = parse_qs(url.query)
+        match = _CONNECTOR_PATH.match(url.path)
+        if url.path.endswith('/environments'):
+            service.record_operation('GET environments')
+            return self._list_environments()
+        if url.path.endswith('/validateApiSwagger'):
+            service.record_operation('POST validateApiSwagger')
+            return self._send(200)
+        if url.path.endswith('/generateResourceStorage'):
+            service.record_operation('POST generateResourceStorage')
+            return self._generate_resource_storage()
+        if match and match.group(1):
+            service.record_operation('{} apis/{{connector}}'.format(verb))
+            return self._handle_connector(verb, match.group(1), payload)
+        if match:
+            service.record_operation('{} apis'.format(verb))
+            environment = _ENVIRONMENT_FILTER.search(query.get('$filter', [''])[0])
+            environment = environment.group(1) if environment else None
+            if verb == 'POST':
+                return self._create_connector(environment, payload)
+            return self._list_connectors(environment, int(query.get('skip', ['0'])[0]))
+
+        service.record_operation('{} unknown'.format(verb))
+        return self._send_json(404, {'error': {'code': 'NotFound', 'message': url.path}})
+
+    def _list_environments(self):
+        self._send_json(200, {'value': [
+            {'name': name, 'properties': {'displayName': name}}
+            for name in ENVIRONMENTS
+        ]})
+
+    def _generate_resource_storage(self):
+        sas_url = '{}/blob/{}?{}'.format(self._get_base_url(), uuid.uuid4().hex, SAS_QUERY)
+        self._send_json(200, {'sharedAccessSignature': sas_url})
+
+    def _get_registration(self, connector_id):
+        """
+        Returns a connector as the service does, with its swagger stored as a blob.
+        """
+        service = self.server.store
+        connector = service.connectors[connector_id]
+        properties = dict(connector['properties'])
+        swagger = properties.pop('openApiDefinition', None)
+        if swagger is not None:
+            path = '/blob/swaggers/{}'.format(connector_id)
+            service.put(path, {}, json.dumps(swagger).encode('utf-8'))
+            properties['apiDefinitions'] = {
+                'originalSwaggerUrl': '{}{}?{}'.format(self._get_base_url(), path, SAS_QUERY)
+            }
+        return {
+            'name': connector_id,
+            'id': '/providers/Microsoft.PowerApps/apis/{}'.format(connector_id),
+            'properties': properties
+        }
+
+    def _create_connector(self, environment, payload):
+        service = self.server.store
+        connector_id = 'shared_mock-{}'.format(uuid.uuid4().hex[:16])
+        properties = dict(payload['properties'])
+        properties.update({
+            'isCustomApi': True,
+            'environment': {'name': environment},
+            'createdBy': {'displayName': 'paconn benchmark'},
+            'createdTime': _get_time(),
+            'changedTime': _get_time()
+        })
+        with service.lock:
+            service.connectors[connector_id] = {'properties': properties}
+        self._send_json(201, self._get_registration(connector_id))
+
+    def _handle_connector(self, verb, connector_id, payload):
+        service = self.server.store
+        if connector_id not in service.connectors:
+            return self._send_json(404, {'error': {'code': 'ApiNotFound', 'message': connector_id}})
+        if verb == 'PATCH':
+            with service.lock:
+                service.connectors[connector_id]['properties'].update(payload['properties'])
+                service.connectors[connector_id]['properties']['changedTime'] = _get_time()
+        return self._send_json(200, self._get_registration(connector_id))
+
+    def _list_connectors(self, environment, skip):
+        service = self.server.store
+        with service.lock:
+            connector_ids = [
+                connector_id
+                for (connector_id, connector) in service.connectors.items()
+                if connector['properties']['environment']['name'] == environment
+            ]
+        page_ids = connector_ids[skip:skip + service.page_size]
+        page = {'value': [self._get_registration(connector_id) for connector_id in page_ids]}
+        if skip + service.page_size < len(connector_ids):
+            page['nextLink'] = '{}{}?{}'.format(
+                self._get_base_url(),
+                urlparse(self.path).path,
+                'api-version=2016-11-01&$filter=environment%20eq%20%27{}%27&skip={}'.format(
+                    environment, skip + service.page_size))
+        self._send_json(200, page)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._handle('GET')
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        self._handle('PUT')
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self._handle('POST')
+
+    def do_PATCH(self):  # pylint: disable=invalid-name
+        self._handle('PATCH')
+
+
+def start_server(port=0, latency=0, bandwidth=None, throttle=None):
+    """
+    Starts a stand-in server in a background thread.
+    The latency is in seconds, the bandwidth in bytes per second per connection
+    and the throttle in requests per second.
+    Returns the server, its service is the server.store attribute.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockHandler)
+    server.daemon_threads = True
+    server.store = MockService(latency=latency, bandwidth=bandwidth, throttle=throttle)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_url(server):
+    """
+    Returns the Power Platform and Flow URL of a server.
+    """
+    return 'http://127.0.0.1:{}'.format(server.server_address[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs a local PowerApps and Flow RP stand-in.')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on.')
+    parser.add_argument('--latency', type=float, default=0, help='Latency per request in milliseconds.')
+    parser.add_argument('--bandwidth', type=float, default=0, help='Bandwidth per connection in MB/s.')
+    parser.add_argument('--throttle', type=float, default=0, help='Requests per second above which requests are throttled.')  # noqa: E501
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), MockHandler)
+    server.daemon_threads = True
+    server.store = MockService(
+        latency=args.latency / 1000,
+        bandwidth=args.bandwidth * 1024 * 1024 or None,
+        throttle=args.throttle or None)
+    print('PowerApps and Flow RP stand-in listening on {}'.format(get_url(server)))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
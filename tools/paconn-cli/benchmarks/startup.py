@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Startup time benchmark for the paconn commands.
+
+Runs every command under `python -X importtime` and reports the median
+wall time, the median total import time and which of the slow optional
+dependencies the command imported.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 20 --command "validate --help"
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = [
+    '--help',
+    'login --help',
+    'logout --help',
+    'download --help',
+    'create --help',
+    'update --help',
+    'validate --help'
+]
+
+# Dependencies that are slow to import and only needed by some code paths
+HEAVY_MODULES = [
+    'adal',
+    'msrestazure',
+    'azure.storage.blob',
+    'requests',
+    'fastjsonschema'
+]
+
+
+def _parse_importtime(stderr):
+    """
+    Returns the total import time in microseconds and the imported module names.
+    """
+    total = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        (_, cumulative, name) = line[len('import time:'):].split('|')
+        modules.add(name.strip())
+        # Top-level imports aren't indented
+        if not name[1:].startswith(' '):
+            total += int(cumulative)
+    return total, modules
+
+
+def measure(command, repeat):
+    """
+    Runs a command a number of times.
+    Returns the median wall time and import time in milliseconds and the heavy modules imported.
+    """
+    env = dict(os.environ, PYTHONPATH=PACKAGE_DIR)
+    args = [sys.executable, '-X', 'importtime', '-m', 'paconn'] + command.split()
+
+    wall_times = []
+    import_times = []
+    heavy_modules = set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run(
+            args,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True)
+        wall_times.append((time.perf_counter() - start) * 1000)
+
+        total, modules = _parse_importtime(process.stderr)
+        import_times.append(total / 1000)
+        heavy_modules.update(module for module in HEAVY_MODULES if module in modules)
+
+    return statistics.median(wall_times), statistics.median(import_times), sorted(heavy_modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the startup time of paconn commands.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs per command.')
+    parser.add_argument('--command', action='append', help='Command line to measure, can be repeated.')
+    args = parser.parse_args()
+
+    print('{:<20} {:>10} {:>12}  {}'.format('command', 'wall (ms)', 'import (ms)', 'heavy imports'))
+    for command in args.command or COMMANDS:
+        wall_time, import_time, heavy_modules = measure(command, args.repeat)
+        print('{:<20} {:>10.1f} {:>12.1f}  {}'.format(
+            command,
+            wall_time,
+            import_time,
+            ', '.join(heavy_modules) or '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+File upload benchmark against the local blob server.
+
+Compares the previous uploads, one storage client per file and the files
+one after the other, with the BlobUploader, which shares a client and
+uploads the files and the blocks of large files in parallel. Checks that
+the uploaded blobs are identical to the files.
+
+    python benchmarks/upload.py
+    python benchmarks/upload.py --sizes 100K,2M,32M --latency 50 --bandwidth 10
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+import statistics
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, PACKAGE_DIR)
+
+from blobserver import start_server, get_sas_url  # noqa: E402 pylint: disable=wrong-import-position
+from paconn.apimanager.fileuploader import BlobUploader  # noqa: E402 pylint: disable=wrong-import-position
+
+_UNITS = {'K': 1024, 'M': 1024 * 1024}
+
+
+def _parse_size(size):
+    unit = _UNITS.get(size[-1].upper(), 1)
+    return int(float(size.rstrip('kKmM')) * unit)
+
+
+def _create_files(directory, sizes):
+    file_paths = []
+    for index, size in enumerate(sizes):
+        file_path = os.path.join(directory, 'file{}.bin'.format(index))
+        with open(file_path, 'wb') as file:
+            file.write(os.urandom(size))
+        file_paths.append(file_path)
+    return file_paths
+
+
+def _previous_upload(sas_url, file_path):
+    """
+    Uploads a file the way the previous uploader did: a new storage
+    client with the default settings for every file.
+    """
+    from azure.storage.blob import BlockBlobService
+
+    (scheme, netloc, path, _, query, _) = urlparse(sas_url)
+    blockblob_service = BlockBlobService(
+        account_name=netloc.split(':')[0],
+        sas_token=query,
+        protocol=scheme,
+        custom_domain='{}://{}'.format(scheme, netloc))
+    blockblob_service.create_blob_from_path(
+        container_name=path.strip('/'),
+        blob_name=os.path.basename(file_path),
+        file_path=file_path)
+
+
+def _verify(server, container, file_paths):
+    blobs = server.store.blobs
+    for file_path in file_paths:
+        with open(file_path, 'rb') as file:
+            expected = hashlib.sha256(file.read()).hexdigest()
+        blob = blobs.get('/{}/{}'.format(container, os.path.basename(file_path)))
+        if blob is None or hashlib.sha256(blob).hexdigest() != expected:
+            raise AssertionError('Different content uploaded for {}'.format(file_path))
+
+
+def _measure(server, container, file_paths, upload, repeat):
+    """
+    Returns the median time in milliseconds and the number of requests of an upload.
+    """
+    times = []
+    for _ in range(repeat):
+        server.store.blobs.clear()
+        server.store.reset_statistics()
+        start = time.perf_counter()
+        upload(get_sas_url(server, container), file_paths)
+        times.append((time.perf_counter() - start) * 1000)
+        _verify(server, container, file_paths)
+    return (statistics.median(times), server.store.requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the connector file uploads against a local blob server.')
+    parser.add_argument('--sizes', default='200K,50K,6M,24M', help='Comma separated file sizes, with K or M units.')
+    parser.add_argument('--latency', type=float, default=30, help='Latency per request in milliseconds.')
+    parser.add_argument('--bandwidth', type=float, default=20, help='Bandwidth per connection in MB/s.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs per uploader.')
+    args = parser.parse_args()
+
+    sizes = [_parse_size(size) for size in args.sizes.split(',')]
+    server = start_server(latency=args.latency / 1000, bandwidth=args.bandwidth * 1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_paths = _create_files(directory, sizes)
+
+        def previous(sas_url, file_paths):
+            for file_path in file_paths:
+                _previous_upload(sas_url, file_path)
+
+        def uploader(sas_url, file_paths):
+            # The upsert runs the uploads of a connector as concurrent tasks sharing one uploader
+            storage = BlobUploader(sas_url)
+            with ThreadPoolExecutor(max_workers=len(file_paths)) as executor:
+                list(executor.map(storage.upload, file_paths))
+
+        print('Files: {}, latency {:.0f} ms, bandwidth {:.0f} MB/s per connection'.format(
+            args.sizes, args.latency, args.bandwidth))
+        print('{:<16} {:>10} {:>10}'.format('uploader', 'time (ms)', 'requests'))
+        for (name, upload) in (('previous', previous), ('BlobUploader', uploader)):
+            (median, requests) = _measure(server, name.lower(), file_paths, upload, args.repeat)
+            print('{:<16} {:>10.0f} {:>10}'.format(name, median, requests))
+
+    server.shutdown()
+    print('All uploaded blobs are identical to the files.')
+
+
+if __name__ == '__main__':
+    main()
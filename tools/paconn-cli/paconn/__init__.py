@@ -19,3 +19,5 @@ _DOWNLOAD = 'download'
 _CREATE = 'create'
 _UPDATE = 'update'
 _VALIDATE = 'validate'
+_SCAN = 'scan'
+_DAEMON = 'daemon'
@@ -11,46 +11,6 @@ Defines main entry point for the CLI
 from __future__ import print_function
 import sys
 
-from knack import CLI, CLICommandsLoader
-# pylint: disable=unused-import
-from paconn.commands.help import helps  # noqa: F401
-from paconn.common.util import get_config_dir
-
-
-class ConnectorsCli(CLI):
-    """
-    The CLI CLass
-    """
-    def get_cli_version(self):
-        """
-        Returns cli version
-        """
-        from . import __VERSION__
-        return __VERSION__
-
-
-class ConnectorsCliCommandsLoader(CLICommandsLoader):
-    """
-    Commands loader
-    """
-    def load_command_table(self, args):
-        """
-        Loads command table
-        """
-        from paconn.commands.commands import load_command_table
-
-        load_command_table(self, args)
-        return super(ConnectorsCliCommandsLoader, self).load_command_table(args)
-
-    def load_arguments(self, command):
-        """
-        Load arguments
-        """
-        from paconn.commands.params import load_arguments
-
-        load_arguments(self, command)
-        super(ConnectorsCliCommandsLoader, self).load_arguments(command)
-
 
 def main():
     """
@@ -58,13 +18,14 @@ def main():
     """
 
     try:
-        from paconn import __CLI_NAME__
-        cli_context = ConnectorsCli(
-            cli_name=__CLI_NAME__,
-            commands_loader_cls=ConnectorsCliCommandsLoader,
-            config_dir=get_config_dir())
+        # A running daemon serves the command without loading the CLI in this process
+        from paconn.common.daemonclient import delegate
+        exit_code = delegate(sys.argv[1:])
+
+        if exit_code is None:
+            from paconn.cli import invoke
+            exit_code = invoke(sys.argv[1:])
 
-        exit_code = cli_context.invoke(sys.argv[1:])
         sys.exit(exit_code)
     except KeyboardInterrupt:
         sys.exit(1)
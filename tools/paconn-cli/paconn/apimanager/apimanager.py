@@ -9,13 +9,17 @@ A manager class for the API calls
 """
 
 import json
+import gzip
+import time
 from urllib.parse import urljoin, urlencode, urlunparse, quote
-import requests
 
 from knack.util import CLIError
 from knack.log import get_logger
 
+from paconn.common import jsonutil, tracing
 from paconn.common.util import display, format_json
+from paconn.apimanager.session import create_session
+from paconn.apimanager.retrypolicy import RetryPolicy, get_retry_after
 from paconn.authentication.tokenmanager import (
     _ACCESS_TOKEN,
     _TOKEN_TYPE,
@@ -24,13 +28,38 @@ from paconn.authentication.tokenmanager import (
 
 LOGGER = get_logger(__name__)
 
+# Request bodies of at least this size are compressed, when compression is enabled
+COMPRESSION_THRESHOLD = 16384
+
+COMPRESSION_LEVEL = 6
+
+# Status code of a service rejecting the content encoding of a request body
+_UNSUPPORTED_MEDIA_TYPE = 415
+
+# A bad request is a rejected compression only when its error names the encoding
+_BAD_REQUEST = 400
+_ENCODING_ERROR_MARKERS = ('content-encoding', 'gzip')
+
+
+def _is_compression_rejected(response):
+    """
+    Returns true if the response rejects the content encoding of the request body.
+    """
+    if response.status_code == _UNSUPPORTED_MEDIA_TYPE:
+        return True
+    if response.status_code != _BAD_REQUEST:
+        return False
+    error = response.text.lower()
+    return any(marker in error for marker in _ENCODING_ERROR_MARKERS)
+
 
 class APIManager:
     """
     A manager class for API calls
     """
     # pylint: disable=too-many-arguments
-    def __init__(self, scheme, region, netlocation, base_path, api_version, credentials=None):
+    def __init__(self, scheme, region, netlocation, base_path, api_version, credentials=None, session=None,
+                 compress=False, retry_policy=None, rate_limiter=None):
         self.scheme = scheme
 
         if not region:
@@ -46,6 +75,18 @@ class APIManager:
 
         self.credentials = credentials
 
+        # Share the connection pool across the API managers
+        self.session = session or create_session()
+
+        # Send large request bodies gzip compressed
+        self.compress = compress
+
+        # Retry throttled and transient failures
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        # Optional rate limiter, shared across the API managers of a command
+        self.rate_limiter = rate_limiter
+
     def add_object_id(self, api):
         """
         Add object id to a given api endpoint
@@ -57,6 +98,14 @@ class APIManager:
 
         return path
 
+    def get_service_url(self):
+        """
+        Returns the URL of the service, which tells the endpoints and clouds apart
+        """
+        return '{scheme}://{netloc}'.format(
+            scheme=self.scheme,
+            netloc=self.netloc)
+
     def construct_url(self, path, params=None, query=None, fragment=None):
         """
         Contruct a URL from a set of parameters
@@ -87,9 +136,10 @@ class APIManager:
 
         return endpoint
 
-    def request(self, verb, endpoint, headers=None, payload=None):
+    def request(self, verb, endpoint, headers=None, payload=None, stream=False):
         """
-        Send a request to the given url
+        Send a request to the given url.
+        With stream set, the response body is read by the caller.
         """
         all_headers = {}
         if self.credentials:
@@ -103,14 +153,12 @@ class APIManager:
         if headers:
             all_headers.update(headers)
 
-        response = requests.request(
-            verb,
-            endpoint,
-            headers=all_headers,
-            json=payload)
+        response = self._request_with_retries(verb, endpoint, all_headers, payload, stream)
+
+        from requests.exceptions import HTTPError
         try:
             response.raise_for_status()
-        except requests.exceptions.HTTPError as exception:
+        except HTTPError as exception:
             exception_str = str(exception)
             response_content = json.loads(response.content)
             response_content = format_json(response_content)
@@ -123,3 +171,89 @@ class APIManager:
             raise CLIError(exception_str)
 
         return response
+
+    # pylint: disable=too-many-arguments
+    def _request_with_retries(self, verb, endpoint, headers, payload, stream):
+        """
+        Sends the request, retrying it as the retry policy allows.
+        Returns the last response.
+        """
+        from requests.exceptions import ConnectionError as RequestsConnectionError
+
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                with tracing.span('rate limit'):
+                    self.rate_limiter.acquire()
+
+            start = time.perf_counter()
+            try:
+                (response, compressed) = self._send(verb, endpoint, headers, payload, stream)
+            except RequestsConnectionError as exception:
+                tracing.record_request(verb, endpoint, start, attempt=attempt)
+                delay = self.retry_policy.get_delay(verb, attempt)
+                if delay is None:
+                    raise
+                reason = type(exception).__name__
+            else:
+                tracing.record_request(verb, endpoint, start, response, stream, attempt)
+                if compressed and _is_compression_rejected(response):
+                    # Sent again uncompressed, which isn't a retry of a failure
+                    response.close()
+                    LOGGER.warning('The service rejected a compressed request, request compression is disabled.')
+                    self.compress = False
+                    continue
+                if response.ok:
+                    return response
+                delay = self.retry_policy.get_delay(verb, attempt, response)
+                if delay is None:
+                    return response
+                reason = response.status_code
+                response.close()
+
+                # A throttled worker holds back the others too
+                if self.rate_limiter and (response.status_code == 429 or get_retry_after(response) is not None):
+                    self.rate_limiter.pause(delay)
+
+            attempt += 1
+            LOGGER.warning(
+                '%s %s failed (%s), retrying in %.1f seconds (retry %d of %d).',
+                verb, endpoint, reason, delay, attempt, self.retry_policy.max_retries)
+            with tracing.span('retry backoff', status=reason):
+                time.sleep(delay)
+
+    # pylint: disable=too-many-arguments
+    def _send(self, verb, endpoint, headers, payload, stream):
+        """
+        Sends the request once.
+        With compression enabled, the payload is sent as compact JSON,
+        gzip compressed above the size threshold.
+        Returns the response and whether the body was compressed.
+        """
+        if payload is None or not self.compress:
+            response = self.session.request(
+                verb,
+                endpoint,
+                headers=headers,
+                json=payload,
+                stream=stream)
+            return response, False
+
+        body = jsonutil.dumps(payload).encode('utf-8')
+        json_headers = dict(headers, **{'Content-Type': 'application/json'})
+        if len(body) < COMPRESSION_THRESHOLD:
+            response = self.session.request(
+                verb,
+                endpoint,
+                headers=json_headers,
+                data=body,
+                stream=stream)
+            return response, False
+
+        response = self.session.request(
+            verb,
+            endpoint,
+            headers=dict(json_headers, **{'Content-Encoding': 'gzip'}),
+            data=gzip.compress(body, compresslevel=COMPRESSION_LEVEL),
+            stream=stream)
+        return response, True
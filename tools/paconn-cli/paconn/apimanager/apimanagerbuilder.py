@@ -18,9 +18,13 @@ class APIManagerBuilder:
     A builder class to create an API Manager object from an url
     """
     @staticmethod
-    def get_from_url(url, base_path, api_version, credentials):
+    # pylint: disable=too-many-arguments
+    def get_from_url(url, base_path, api_version, credentials, session=None, compress=False, rate_limiter=None):
         """
-        Creates an APIManager object from given URL, Base Path and credentials
+        Creates an APIManager object from given URL, Base Path and credentials.
+        A session can be given to share its connection pool.
+        Compress enables gzip compressed request bodies.
+        A rate limiter can be given to share it across API managers.
         """
         # pylint: disable=unused-variable
         (scheme, netloc, path, params, query, fragment) = urlparse(url)
@@ -31,4 +35,7 @@ class APIManagerBuilder:
             netlocation=netloc,
             base_path=base_path,
             api_version=api_version,
-            credentials=credentials)
+            credentials=credentials,
+            session=session,
+            compress=compress,
+            rate_limiter=rate_limiter)
@@ -10,49 +10,97 @@ Uploads an file for the custom connector
 import os
 import mimetypes
 from urllib.parse import urlparse, urlunparse
-from azure.storage.blob import ContentSettings, BlockBlobService
-
-
-def upload_file(sas_url, file_path):
-    # Break the SAS URL
-    (scheme, netloc, path, params, query, fragment) = urlparse(sas_url)
-    # Account is the first part of the netlocation upto the dot
-    account_name = netloc[0:netloc.index('.')]
-
-    # The assumption here is that the blob URL will be in the
-    # form accountname.blob.core.windows.net or
-    # accountname.blob.core.usgovcloudapi.net.
-    # Chopping off accountname.blob. to obtain the
-    # endpoint suffix.
-    endpoint_suffix = netloc.replace(account_name+'.blob.', '')
-
-    # Container name is the path
-    container_name = path.strip('/')
-
-    # Create a block blob service
-    blockblob_service = BlockBlobService(
-        account_name=account_name,
-        sas_token=query,
-        endpoint_suffix=endpoint_suffix)
-
-    # Get the file name of the file
-    file_name = os.path.basename(file_path)
-    # Determine the content type and encoding for the file
-    (content_type, content_encoding) = mimetypes.guess_type(file_name)
-    content_settings = ContentSettings(
-        content_type=content_type,
-        content_encoding=content_encoding)
-
-    # Upload the file
-    blockblob_service.create_blob_from_path(
-        container_name=container_name,
-        blob_name=file_name,
-        file_path=file_path,
-        content_settings=content_settings)
-
-    # Append the file name to the path to generate the download link
-    path = path + '/' + file_name
-    urlparts = (scheme, netloc, path, params, query, fragment)
-    sas_download_url = urlunparse(urlparts)
-
-    return sas_download_url
+
+from paconn.apimanager.session import create_session
+
+# Files smaller than this size are uploaded with a single request
+SINGLE_PUT_SIZE = 4 * 1024 * 1024
+
+# Larger files are split into blocks of this size, uploaded in parallel
+BLOCK_SIZE = 1024 * 1024
+
+# Number of parallel requests per uploader
+MAX_CONNECTIONS = 4
+
+
+class BlobUploader:
+    """
+    Uploads files to the blob container of a shared access signature URL.
+    The uploader keeps one storage client and connection pool for all its uploads.
+    """
+    def __init__(self, sas_url, max_connections=MAX_CONNECTIONS, session=None):
+        # The storage SDK is loaded on the first upload only
+        from azure.storage.blob import BlockBlobService
+
+        # Break the SAS URL
+        (scheme, netloc, path, params, query, fragment) = urlparse(sas_url)
+        self._url_parts = (scheme, netloc, path, params, query, fragment)
+
+        # Container name is the path
+        self.container_name = path.strip('/')
+
+        self.max_connections = max_connections
+
+        # The uploads of all the files and blocks share the connection pool
+        session = session or create_session(
+            pool_connections=1,
+            pool_maxsize=max_connections * max_connections)
+
+        if '.blob.' in netloc:
+            # Account is the first part of the netlocation upto the dot
+            account_name = netloc[0:netloc.index('.')]
+
+            # The assumption here is that the blob URL will be in the
+            # form accountname.blob.core.windows.net or
+            # accountname.blob.core.usgovcloudapi.net.
+            # Chopping off accountname.blob. to obtain the
+            # endpoint suffix.
+            endpoint_suffix = netloc.replace(account_name+'.blob.', '')
+
+            self.blockblob_service = BlockBlobService(
+                account_name=account_name,
+                sas_token=query,
+                protocol=scheme,
+                endpoint_suffix=endpoint_suffix,
+                request_session=session)
+        else:
+            # Other endpoints, like a local storage emulator, are addressed as a custom domain
+            self.blockblob_service = BlockBlobService(
+                account_name=netloc.split(':')[0],
+                sas_token=query,
+                protocol=scheme,
+                custom_domain='{}://{}'.format(scheme, netloc),
+                request_session=session)
+
+        self.blockblob_service.MAX_SINGLE_PUT_SIZE = SINGLE_PUT_SIZE
+        self.blockblob_service.MAX_BLOCK_SIZE = BLOCK_SIZE
+
+    def upload(self, file_path):
+        """
+        Uploads a file and returns its download URL.
+        """
+        from azure.storage.blob import ContentSettings
+
+        # Get the file name of the file
+        file_name = os.path.basename(file_path)
+        # Determine the content type and encoding for the file
+        (content_type, content_encoding) = mimetypes.guess_type(file_name)
+        content_settings = ContentSettings(
+            content_type=content_type,
+            content_encoding=content_encoding)
+
+        # Upload the file, in parallel blocks when it is large
+        self.blockblob_service.create_blob_from_path(
+            container_name=self.container_name,
+            blob_name=file_name,
+            file_path=file_path,
+            content_settings=content_settings,
+            max_connections=self.max_connections)
+
+        # Append the file name to the path to generate the download link
+        (scheme, netloc, path, params, query, fragment) = self._url_parts
+        path = path + '/' + file_name
+        urlparts = (scheme, netloc, path, params, query, fragment)
+        sas_download_url = urlunparse(urlparts)
+
+        return sas_download_url
@@ -11,6 +11,19 @@ PowerApps RP manager
 import json
 from urllib.parse import urljoin
 
+from knack.util import CLIError
+
+from paconn.common.jsonstream import iter_json_array
+
+_VALUE = 'value'
+_NAME = 'name'
+_ID = 'id'
+_PROPERTIES = 'properties'
+_NEXT_LINK = 'nextLink'
+
+# Size of the chunks read from a streamed listing
+LISTING_CHUNK_SIZE = 65536
+
 
 class PowerAppsRP:
     """
@@ -76,20 +89,60 @@ class PowerAppsRP:
 
         return response.text
 
-    def get_all_connectors(self, environment):
+    @staticmethod
+    def _select_properties(connector, properties):
         """
-        Returns all connectors.
+        Keeps only the given properties of a connector.
+        """
+        selected = {
+            key: connector[key]
+            for key in (_ID, _NAME)
+            if key in connector
+        }
+        connector_properties = connector.get(_PROPERTIES, {})
+        selected[_PROPERTIES] = {
+            key: connector_properties[key]
+            for key in properties
+            if key in connector_properties
+        }
+        return selected
+
+    def iter_connectors(self, environment, properties=None):
+        """
+        Yields all connectors, following the continuation links.
+        The pages are parsed while they are received, one connector at a time.
+        When properties are provided, only these properties of each connector are kept.
         """
         endpoint = self.api_manager.construct_url(
             path='apis',
             query=PowerAppsRP._get_filter_query(environment))
 
-        response = self.api_manager.request(
-            verb='GET',
-            endpoint=endpoint,
-            headers=self.rp_headers)
-
-        return response.json()
+        from requests.exceptions import RequestException
+
+        while endpoint:
+            page = {}
+            try:
+                with self.api_manager.request(
+                        verb='GET',
+                        endpoint=endpoint,
+                        headers=self.rp_headers,
+                        stream=True) as response:
+                    chunks = response.iter_content(chunk_size=LISTING_CHUNK_SIZE)
+                    for connector in iter_json_array(chunks, _VALUE, page):
+                        if properties is not None:
+                            connector = PowerAppsRP._select_properties(connector, properties)
+                        yield connector
+            except (RequestException, ValueError) as exception:
+                # The connection dropped, or the listing was cut short, while it was streamed
+                raise CLIError('Couldn\'t read the connector listing. {}'.format(exception))
+
+            endpoint = page.get(_NEXT_LINK)
+
+    def get_all_connectors(self, environment, properties=None):
+        """
+        Returns all connectors.
+        """
+        return {_VALUE: list(self.iter_connectors(environment, properties))}
 
     def validate_connector(self, payload, enable_certification_rules):
         """
@@ -0,0 +1,55 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""
+Client side rate limiting of the API calls
+"""
+
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    A token bucket shared by the concurrent workers of a command.
+    Requests are sent at most at the given rate per second, with bursts
+    of up to burst requests. Without a rate, requests are only held back
+    while the service asked the client to pause.
+    """
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.burst = burst or max(rate or 1, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Waits until a request may be sent.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if not self.rate:
+                        return
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """
+        Holds back the requests of all the workers for the given seconds,
+        when the service throttled one of them.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,104 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""
+Retry policy for the API calls
+"""
+
+import time
+import random
+from email.utils import parsedate_to_datetime
+
+# Number of retries after the first attempt
+MAX_RETRIES = 4
+
+# Base of the exponential backoff, in seconds
+BACKOFF_FACTOR = 0.5
+
+# Longest backoff between two attempts, in seconds
+MAX_BACKOFF = 30
+
+# Longest Retry-After the client waits for, in seconds, longer ones fail the request
+MAX_RETRY_AFTER = 120
+
+# Requests that can be repeated without changing the outcome
+IDEMPOTENT_VERBS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'PATCH', 'DELETE'])
+
+# The service throttled or refused the request before processing it,
+# any request can be retried
+THROTTLED_STATUS_CODES = frozenset([429])
+
+# The service may have processed the request, only idempotent requests are retried
+TRANSIENT_STATUS_CODES = frozenset([500, 502, 503, 504])
+
+
+def get_retry_after(response):
+    """
+    Returns the seconds to wait given by the Retry-After header of a response, or None.
+    The header holds either a number of seconds or an HTTP date.
+    """
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is retried:
+    exponential backoff with full jitter, or the Retry-After of the service.
+    """
+    def __init__(self, max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, max_backoff=MAX_BACKOFF,
+                 max_retry_after=MAX_RETRY_AFTER):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+
+    def is_retryable(self, verb, status_code=None):
+        """
+        Returns whether a request failing with the status code can be retried.
+        Without a status code, the request failed on a connection error.
+        """
+        is_idempotent = verb.upper() in IDEMPOTENT_VERBS
+        if status_code is None:
+            return is_idempotent
+        if status_code in THROTTLED_STATUS_CODES:
+            return True
+        return is_idempotent and status_code in TRANSIENT_STATUS_CODES
+
+    def get_backoff(self, attempt):
+        """
+        Returns a random backoff for the attempt, counted from zero.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def get_delay(self, verb, attempt, response=None):
+        """
+        Returns the seconds to wait before retrying a failed attempt, counted from zero,
+        or None when the request must not be retried.
+        The response is None when the attempt failed on a connection error.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        status_code = response.status_code if response is not None else None
+        if not self.is_retryable(verb, status_code):
+            return None
+
+        retry_after = get_retry_after(response)
+        if retry_after is None:
+            return self.get_backoff(attempt)
+        if retry_after > self.max_retry_after:
+            return None
+        return retry_after
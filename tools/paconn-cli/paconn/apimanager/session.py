@@ -0,0 +1,59 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""
+Connection pooled HTTP session shared by the API managers
+"""
+
+import threading
+
+# Number of per-host connection pools to keep
+POOL_CONNECTIONS = 10
+
+# Maximum number of connections kept alive per host
+POOL_MAXSIZE = 10
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def create_session(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=False,
+        keep_alive=True):
+    """
+    Creates a session with a connection pool, so that consecutive
+    requests to the same host reuse the TCP and TLS connection.
+    """
+    # Commands that never reach the network don't pay for importing requests
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+
+    return session
+
+
+def get_shared_session(pool_maxsize=POOL_MAXSIZE):
+    """
+    Returns the session of the process with the given pool size, so that
+    the commands run by a long-lived process reuse its open connections.
+    """
+    with _SESSIONS_LOCK:
+        if pool_maxsize not in _SESSIONS:
+            _SESSIONS[pool_maxsize] = create_session(pool_maxsize=pool_maxsize)
+        return _SESSIONS[pool_maxsize]
@@ -11,7 +11,7 @@ Authentication methods
 from knack.util import CLIError
 
 from paconn.authentication.profile import Profile
-from paconn.authentication.tokenmanager import TokenManager
+from paconn.authentication.tokenmanager import TokenManager, _LOGIN_SETTINGS
 
 
 def get_authentication(settings, force_authenticate):
@@ -22,6 +22,16 @@ def get_authentication(settings, force_authenticate):
     credentials = tokenmanager.read()
 
     token_expired = TokenManager.is_expired(credentials)
+    login_settings = TokenManager.get_login_settings(settings)
+
+    # A login with another client, tenant or authority needs a new token
+    if credentials and credentials.get(_LOGIN_SETTINGS, login_settings) != login_settings:
+        force_authenticate = True
+
+    # Renew the token silently when possible
+    if token_expired and not force_authenticate:
+        credentials = tokenmanager.refresh(credentials, settings)
+        token_expired = TokenManager.is_expired(credentials)
 
     # Get new token
     if token_expired or force_authenticate:
@@ -33,6 +43,8 @@ def get_authentication(settings, force_authenticate):
 
         credentials = profile.authenticate_device_code()
 
+        # Renew the token later with the same client and tenant
+        credentials[_LOGIN_SETTINGS] = login_settings
         tokenmanager.write(credentials)
 
         token_expired = TokenManager.is_expired(credentials)
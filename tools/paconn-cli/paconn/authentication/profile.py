@@ -7,10 +7,11 @@
 """
 User profile management class.`
 """
-import adal
 from urllib.parse import urljoin
-# AADTokenCredentials for multi-factor authentication
-from msrestazure.azure_active_directory import AADTokenCredentials
+
+from knack.log import get_logger
+
+LOGGER = get_logger(__name__)
 
 
 class Profile:
@@ -25,6 +26,9 @@ class Profile:
         self.authority_url = authority_url
 
     def _get_authentication_context(self):
+        # adal takes long to import and is only needed to log in
+        import adal
+
         auth_url = urljoin(self.authority_url, self.tenant)
 
         return adal.AuthenticationContext(
@@ -43,6 +47,9 @@ class Profile:
 
         print(code['message'])
 
+        # AADTokenCredentials for multi-factor authentication
+        from msrestazure.azure_active_directory import AADTokenCredentials
+
         mgmt_token = context.acquire_token_with_device_code(
             resource=self.resource,
             user_code_info=code,
@@ -53,3 +60,28 @@ class Profile:
             client_id=self.client_id)
 
         return credentials.token
+
+    def authenticate_refresh_token(self, refresh_token):
+        """
+        Renews the credentials silently using a refresh token.
+        Returns None when the refresh token was rejected.
+        """
+        import adal
+        from msrestazure.azure_active_directory import AADTokenCredentials
+
+        context = self._get_authentication_context()
+
+        try:
+            mgmt_token = context.acquire_token_with_refresh_token(
+                refresh_token=refresh_token,
+                client_id=self.client_id,
+                resource=self.resource)
+        except adal.AdalError as exception:
+            LOGGER.debug('Token refresh failed: %s', exception)
+            return None
+
+        credentials = AADTokenCredentials(
+            token=mgmt_token,
+            client_id=self.client_id)
+
+        return credentials.token
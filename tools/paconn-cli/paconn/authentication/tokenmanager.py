@@ -12,11 +12,15 @@ import os
 import json
 
 import time
+import threading
 
 from knack.util import CLIError
+from knack.log import get_logger
 
 from paconn.common.util import get_config_dir
 
+LOGGER = get_logger(__name__)
+
 TOKEN_FILE = 'accessTokens.json'
 
 # Token specific variables
@@ -24,11 +28,23 @@ _TOKEN_TYPE = 'token_type'
 _ACCESS_TOKEN = 'access_token'
 _EXPIRES_ON = 'expires_on'
 _OID = 'oid'
+_TENANT_ID = 'tenant_id'
+_REFRESH_TOKEN = 'refresh_token'
+
+# The login settings saved with the token, to renew it with the same client and tenant
+_LOGIN_SETTINGS = 'login_settings'
+_CLIENT_ID = 'client_id'
+_TENANT = 'tenant'
+_AUTHORITY_URL = 'authority_url'
+_RESOURCE = 'resource'
 
 
 # Number of seconds to request a login before the token expires
 TOKEN_BUFFER_SECONDS = 600
 
+# Number of seconds to wait before retrying a failed background refresh
+REFRESH_RETRY_SECONDS = 60
+
 
 class TokenManager:
     """
@@ -37,17 +53,79 @@ class TokenManager:
     def __init__(self, token_file=TOKEN_FILE):
         self.token_file = os.path.join(get_config_dir(), token_file)
 
-    def get_credentials(self):
+    def get_credentials(self, settings=None):
         """
         Returns credential object from token file.
+        An expired token is renewed silently when the settings are provided.
         """
         credentials = self.read()
         token_expired = TokenManager.is_expired(credentials)
+        if token_expired and settings:
+            credentials = self.refresh(credentials, settings)
+            token_expired = TokenManager.is_expired(credentials)
         if token_expired:
             raise CLIError('Access token invalid. Please login again.')
 
         return credentials
 
+    @staticmethod
+    def get_login_settings(settings):
+        """
+        Returns the login settings to save with a token.
+        """
+        return {
+            _CLIENT_ID: settings.client_id,
+            _TENANT: settings.tenant,
+            _AUTHORITY_URL: settings.authority_url,
+            _RESOURCE: settings.resource
+        }
+
+    def refresh(self, credentials, settings):
+        """
+        Renews the credentials using their refresh token and saves them.
+        The token is renewed with the login settings saved with it,
+        or with the given settings for a token saved without them.
+        Returns the given credentials unchanged if they can't be renewed,
+        also when the service can't be reached.
+        """
+        if _REFRESH_TOKEN not in credentials:
+            return credentials
+
+        from requests.exceptions import RequestException
+        from paconn.authentication.profile import Profile
+
+        login_settings = credentials.get(_LOGIN_SETTINGS) or TokenManager.get_login_settings(settings)
+        profile = Profile(
+            client_id=login_settings[_CLIENT_ID],
+            tenant=login_settings[_TENANT],
+            resource=login_settings[_RESOURCE],
+            authority_url=login_settings[_AUTHORITY_URL])
+
+        try:
+            token = profile.authenticate_refresh_token(credentials[_REFRESH_TOKEN])
+        except RequestException as exception:
+            LOGGER.debug('Token refresh failed: %s', exception)
+            return credentials
+        if not token:
+            return credentials
+
+        # Keep the claims the refreshed token may not repeat, such as the object id
+        refreshed = dict(credentials)
+        refreshed.update(token)
+        self.write(refreshed)
+
+        LOGGER.debug('Access token refreshed.')
+        return refreshed
+
+    def get_modified_time(self):
+        """
+        Returns the modification time of the token file, or None if there is none.
+        """
+        try:
+            return os.stat(self.token_file).st_mtime_ns
+        except OSError:
+            return None
+
     def read(self):
         """
         Reads a login token file.
@@ -65,8 +143,11 @@ class TokenManager:
         """
         Writes the login credentials to a token file.
         """
-        with os.fdopen(os.open(self.token_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600), 'w+') as cred_file:
+        # Replace the file atomically, a background refresh may be interrupted at exit
+        temp_file = '{}.{}.tmp'.format(self.token_file, os.getpid())
+        with os.fdopen(os.open(temp_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600), 'w+') as cred_file:
             cred_file.write(json.dumps(credentials))
+        os.replace(temp_file, self.token_file)
 
     @staticmethod
     def is_expired(credentials):
@@ -85,3 +166,58 @@ class TokenManager:
 
     def delete_token_file(self):
         os.remove(self.token_file)
+
+
+class TokenRefresher(threading.Thread):
+    """
+    Background thread renewing the credentials before they expire.
+    The credentials are updated in place, so the API managers
+    sharing them keep working during long runs.
+    """
+    def __init__(self, credentials, settings, token_manager=None):
+        super().__init__(name='paconn-token-refresher', daemon=True)
+        self.credentials = credentials
+        self.settings = settings
+        self.token_manager = token_manager or TokenManager()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while _REFRESH_TOKEN in self.credentials and _EXPIRES_ON in self.credentials:
+            expires_on = self.credentials[_EXPIRES_ON]
+
+            # Stop once the token can't be used anymore
+            if expires_on < time.time():
+                return
+
+            delay = max(expires_on - TOKEN_BUFFER_SECONDS - time.time(), 0)
+            if self._stopped.wait(delay):
+                return
+
+            refreshed = self._refresh()
+            if refreshed is None or TokenManager.is_expired(refreshed):
+                if self._stopped.wait(REFRESH_RETRY_SECONDS):
+                    return
+            else:
+                self.credentials.update(refreshed)
+
+    def _refresh(self):
+        """
+        Renews the credentials, returns None when the renewal failed
+        and should be retried, for example when the network is down.
+        """
+        # adal takes long to import and is only needed to renew the token
+        import adal
+        from requests.exceptions import RequestException
+
+        try:
+            return self.token_manager.refresh(self.credentials, self.settings)
+        except (adal.AdalError, RequestException) as exception:
+            LOGGER.warning(
+                'Background token refresh failed, retrying in %s seconds: %s', REFRESH_RETRY_SECONDS, exception)
+            return None
+
+    def stop(self):
+        """
+        Stops the background refresh.
+        """
+        self._stopped.set()
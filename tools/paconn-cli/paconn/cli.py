@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""
+Defines the CLI and its commands loader
+"""
+
+from knack import CLI, CLICommandsLoader
+from knack.events import EVENT_PARSER_GLOBAL_CREATE, EVENT_INVOKER_POST_PARSE_ARGS
+from paconn import __CLI_NAME__
+# pylint: disable=unused-import
+from paconn.commands.help import helps  # noqa: F401
+from paconn.common.util import get_config_dir, display
+from paconn.common import tracing
+
+
+class ConnectorsCli(CLI):
+    """
+    The CLI CLass
+    """
+    def __init__(self, **kwargs):
+        super(ConnectorsCli, self).__init__(**kwargs)
+        self.register_event(EVENT_PARSER_GLOBAL_CREATE, ConnectorsCli.on_global_arguments)
+        self.register_event(EVENT_INVOKER_POST_PARSE_ARGS, ConnectorsCli.on_parsed_arguments)
+
+    @staticmethod
+    def on_global_arguments(_, **kwargs):
+        """
+        Adds the arguments available to all commands
+        """
+        from paconn.commands.params import PROFILE_OPTIONS, PROFILE_HELP
+        arg_group = kwargs.get('arg_group')
+        arg_group.add_argument(
+            *PROFILE_OPTIONS,
+            dest='_profile',
+            nargs='?',
+            const=True,
+            metavar='FILE',
+            help=PROFILE_HELP)
+
+    @staticmethod
+    def on_parsed_arguments(_, **kwargs):
+        """
+        Starts tracing the command when profiled
+        """
+        profile = getattr(kwargs.get('args'), '_profile', None)
+        if profile:
+            tracing.start_tracing(
+                command=kwargs.get('command'),
+                file_path=profile if isinstance(profile, str) else None)
+
+    def get_cli_version(self):
+        """
+        Returns cli version
+        """
+        from . import __VERSION__
+        return __VERSION__
+
+
+class ConnectorsCliCommandsLoader(CLICommandsLoader):
+    """
+    Commands loader
+    """
+    def load_command_table(self, args):
+        """
+        Loads command table
+        """
+        from paconn.commands.commands import load_command_table
+
+        load_command_table(self, args)
+        return super(ConnectorsCliCommandsLoader, self).load_command_table(args)
+
+    def load_arguments(self, command):
+        """
+        Load arguments
+        """
+        from paconn.commands.params import load_arguments
+
+        load_arguments(self, command)
+        super(ConnectorsCliCommandsLoader, self).load_arguments(command)
+
+
+def invoke(args, cli_cls=ConnectorsCli):
+    """
+    Runs a command and returns its exit code.
+    """
+    cli_context = cli_cls(
+        cli_name=__CLI_NAME__,
+        commands_loader_cls=ConnectorsCliCommandsLoader,
+        config_dir=get_config_dir())
+
+    exit_code = cli_context.invoke(args)
+
+    # Report the profile of failed commands too
+    profile_summary = tracing.finish_tracing()
+    if profile_summary:
+        display(profile_summary)
+
+    return exit_code
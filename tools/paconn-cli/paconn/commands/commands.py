@@ -11,7 +11,7 @@ Defines the command table
 from knack.commands import CommandGroup
 
 from paconn import __CLI_NAME__
-from paconn import _COMMAND_GROUP, _LOGIN, _LOGOUT, _DOWNLOAD, _CREATE, _UPDATE, _VALIDATE
+from paconn import _COMMAND_GROUP, _LOGIN, _LOGOUT, _DOWNLOAD, _CREATE, _UPDATE, _VALIDATE, _SCAN, _DAEMON
 
 
 # pylint: disable=unused-argument
@@ -39,3 +39,11 @@ def load_command_table(self, args):
 
     with CommandGroup(self, _COMMAND_GROUP, operation_group(_VALIDATE)) as command_group:
         command_group.command(_VALIDATE, _VALIDATE)
+
+    with CommandGroup(self, _COMMAND_GROUP, operation_group(_SCAN)) as command_group:
+        command_group.command(_SCAN, _SCAN)
+
+    with CommandGroup(self, _DAEMON, '{}.commands.{}#{{}}'.format(__CLI_NAME__, _DAEMON)) as command_group:
+        command_group.command('start', 'start')
+        command_group.command('stop', 'stop')
+        command_group.command('status', 'status')
@@ -8,10 +8,20 @@
 Create command.
 """
 
+from knack.util import CLIError
+
 from paconn import _CREATE
 from paconn.common.util import display
-from paconn.settings.util import load_powerapps_and_flow_rp
+from paconn.settings.util import load_powerapps_and_flow_rp, load_powerapps_rp
 from paconn.operations.upsert import upsert
+from paconn.operations.fanout import (
+    is_fanout,
+    get_environments,
+    upsert_environments,
+    save_connector_ids,
+    ensure_environments_succeeded
+)
+from paconn.operations.batch import get_settings_files, upsert_batch, ensure_batch_succeeded
 from paconn.settings.settingsbuilder import SettingsBuilder
 
 
@@ -26,14 +36,29 @@ def create(
         powerapps_version,
         client_secret,
         settings_file,
-        overwrite_settings):
+        overwrite_settings,
+        compress,
+        batch=None,
+        workers=None,
+        max_rps=None,
+        env_file=None):
     """
     Create command.
     """
+    if batch and client_secret:
+        raise CLIError(
+            'The --secret and --batch arguments can\'t be combined, '
+            'the connectors of a batch use different OAuth apps.')
+
+    if batch and not overwrite_settings:
+        raise CLIError(
+            'The --batch argument requires --overwrite-settings for a create, '
+            'the new connector IDs are written to the settings files.')
+
     # Get settings
     settings = SettingsBuilder.get_settings(
         environment=environment,
-        settings_file=settings_file,
+        settings_file=None if batch else settings_file,
         api_properties=api_properties,
         api_definition=api_definition,
         icon=icon,
@@ -42,9 +67,61 @@ def create(
         powerapps_url=powerapps_url,
         powerapps_version=powerapps_version)
 
+    if is_fanout(environment, env_file):
+        if batch:
+            raise CLIError('The --batch and --env-file arguments, or several --env environments, can\'t be combined.')
+
+        environments = get_environments(
+            environment=environment,
+            env_file=env_file,
+            connector_id=None,
+            is_update=False)
+
+        powerapps_rp = load_powerapps_rp(
+            settings=settings,
+            max_workers=workers,
+            compress=compress,
+            max_rps=max_rps)
+
+        results = upsert_environments(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            environments=environments,
+            client_secret=client_secret,
+            is_update=False,
+            max_workers=workers)
+
+        # The created connector IDs are kept with their environments
+        if env_file and overwrite_settings:
+            save_connector_ids(env_file, results)
+
+        ensure_environments_succeeded(results, is_update=False)
+        return
+
+    if batch:
+        settings_files = get_settings_files(batch)
+
+        powerapps_rp = load_powerapps_rp(
+            settings=settings,
+            max_workers=workers,
+            compress=compress,
+            max_rps=max_rps)
+
+        results = upsert_batch(
+            powerapps_rp=powerapps_rp,
+            settings_files=settings_files,
+            is_update=False,
+            overwrite_settings=overwrite_settings,
+            max_workers=workers)
+
+        ensure_batch_succeeded(results, is_update=False)
+        return
+
     powerapps_rp, _ = load_powerapps_and_flow_rp(
         settings=settings,
-        command_context=_CREATE)
+        command_context=_CREATE,
+        compress=compress,
+        max_rps=max_rps)
 
     connector_id = upsert(
         powerapps_rp=powerapps_rp,
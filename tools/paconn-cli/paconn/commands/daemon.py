@@ -0,0 +1,58 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Daemon commands.
+"""
+
+import time
+
+from paconn.common.util import display
+
+import paconn.common.daemon
+
+# Seconds per minute of the idle timeout argument
+_MINUTE = 60
+
+
+def _display_status(status):
+    display('The daemon is running in process {}, version {}, since {}, and ran {} command(s).'.format(
+        status['pid'],
+        status['version'],
+        time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(status['started'])),
+        status['commands']))
+
+
+def start(foreground, idle_timeout=None):
+    """
+    Start command.
+    """
+    idle_timeout = paconn.common.daemon.DEFAULT_IDLE_TIMEOUT if idle_timeout is None else idle_timeout * _MINUTE
+
+    if foreground:
+        paconn.common.daemon.serve(idle_timeout=idle_timeout)
+    else:
+        _display_status(paconn.common.daemon.start(idle_timeout=idle_timeout))
+
+
+def stop():
+    """
+    Stop command.
+    """
+    if paconn.common.daemon.stop():
+        display('The daemon is stopped.')
+    else:
+        display('The daemon isn\'t running.')
+
+
+def status():
+    """
+    Status command.
+    """
+    daemon_status = paconn.common.daemon.get_status()
+    if daemon_status:
+        _display_status(daemon_status)
+    else:
+        display('The daemon isn\'t running.')
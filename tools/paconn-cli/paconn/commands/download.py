@@ -7,6 +7,8 @@
 Download command.
 """
 
+from knack.util import CLIError
+
 from paconn import _DOWNLOAD
 
 from paconn.common.util import display
@@ -24,7 +26,11 @@ def download(
         powerapps_url,
         powerapps_version,
         settings_file,
-        overwrite):
+        overwrite,
+        no_format,
+        all_connectors,
+        workers=None,
+        max_rps=None):
     """
     Download command.
     """
@@ -40,14 +46,41 @@ def download(
         powerapps_url=powerapps_url,
         powerapps_version=powerapps_version)
 
+    # Each connector downloads up to three artifacts at the same time
+    max_workers = (workers or paconn.operations.download.DEFAULT_WORKERS) * 3 if all_connectors else None
+
     powerapps_rp, _ = load_powerapps_and_flow_rp(
         settings=settings,
-        command_context=_DOWNLOAD)
+        command_context=_DOWNLOAD,
+        max_workers=max_workers,
+        all_connectors=all_connectors,
+        max_rps=max_rps)
+
+    if all_connectors:
+        directory, results = paconn.operations.download.download_all(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            destination=destination,
+            overwrite=overwrite,
+            max_workers=workers,
+            format_swagger=not no_format)
+
+        failed = [connector_id for (connector_id, _, error) in results if error]
+        downloaded = [connector_id for (connector_id, is_downloaded, _) in results if is_downloaded]
+        display('{} connector(s) downloaded to {}, {} skipped, {} failed.'.format(
+            len(downloaded),
+            directory,
+            len(results) - len(downloaded) - len(failed),
+            len(failed)))
+        if failed:
+            raise CLIError('Failed connectors: {}'.format(', '.join(sorted(failed))))
+        return
 
     directory = paconn.operations.download.download(
         powerapps_rp=powerapps_rp,
         settings=settings,
         destination=destination,
-        overwrite=overwrite)
+        overwrite=overwrite,
+        format_swagger=not no_format)
 
     display('The connector is downloaded to {}.'.format(directory))
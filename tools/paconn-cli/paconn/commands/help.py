@@ -9,7 +9,7 @@ Help strings for the CLI
 """
 
 from knack.help_files import helps  # pylint: disable=unused-import
-from paconn import _COMMAND_GROUP, _LOGIN, _DOWNLOAD, _CREATE, _UPDATE, _VALIDATE
+from paconn import _COMMAND_GROUP, _LOGIN, _DOWNLOAD, _CREATE, _UPDATE, _VALIDATE, _SCAN, _DAEMON
 
 helps[_COMMAND_GROUP] = """
     short-summary: Microsoft Power Platform Connectors CLI
@@ -30,6 +30,8 @@ helps[_DOWNLOAD] = """
     examples:
         - name: Download connector
           text: paconn download
+        - name: Download all the custom connectors of an environment
+          text: paconn download --all -e [Environment GUID] -d backup --workers 8
 """
 
 helps[_CREATE] = """
@@ -38,6 +40,10 @@ helps[_CREATE] = """
     examples:
         - name: Create connector
           text: paconn create
+        - name: Create all the connectors with a settings file under a directory
+          text: paconn create --batch "connectors/**/settings.json" --workers 8 --overwrite-settings
+        - name: Create a connector in the environments of a file, writing the connector IDs into it
+          text: paconn create --env-file environments.txt --overwrite-settings
 """
 
 helps[_UPDATE] = """
@@ -46,6 +52,16 @@ helps[_UPDATE] = """
     examples:
         - name: Update connector.
           text: paconn update
+        - name: Update the connectors listed in a manifest file
+          text: paconn update --batch manifest.txt --workers 8
+        - name: Update the connectors of a manifest file with at most 10 requests per second
+          text: paconn update --batch manifest.txt --workers 16 --max-rps 10
+        - name: Update a connector even if it is unchanged since its last deployment
+          text: paconn update --settings settings.json --force
+        - name: Update the connectors under a directory changed since the main branch
+          text: paconn update --batch connectors --changed-since origin/main
+        - name: Update a connector in the environments listed with their connector IDs in a file
+          text: paconn update --env-file environments.txt --workers 8
 """
 
 helps[_VALIDATE] = """
@@ -54,4 +70,49 @@ helps[_VALIDATE] = """
     examples:
         - name: Validate swagger
           text: paconn validate
+        - name: Validate the swagger and API properties against the bundled schemas, offline
+          text: paconn validate --local --api-def apiDefinition.swagger.json --api-prop apiProperties.json
+        - name: Validate the connectors under the current directory changed since the main branch, offline
+          text: paconn validate --local --changed-since origin/main
+"""
+
+helps[_SCAN] = """
+    type: command
+    short-summary: Check all the connectors under a directory locally.
+    long-summary: >
+        Finds the connector directories under the root directory, and checks their API definition,
+        API properties, settings and script files against the bundled schemas, in parallel processes.
+    examples:
+        - name: Check all the certified connectors
+          text: paconn scan certified-connectors
+        - name: Check the connectors of the repository with 4 processes
+          text: paconn scan . --workers 4
+"""
+
+helps[_DAEMON] = """
+    type: group
+    short-summary: Manage a background process running the commands faster.
+    long-summary: >
+        While the daemon runs, the download, update and validate commands are run by it, without starting
+        the CLI, reading the login or opening new connections each time. Commands that prompt run in the terminal.
+"""
+
+helps['{} start'.format(_DAEMON)] = """
+    type: command
+    short-summary: Start the daemon.
+    examples:
+        - name: Start the daemon, stopping after 30 minutes without a command
+          text: paconn daemon start
+        - name: Start the daemon for the whole session
+          text: paconn daemon start --idle-timeout 0
+"""
+
+helps['{} stop'.format(_DAEMON)] = """
+    type: command
+    short-summary: Stop the daemon.
+"""
+
+helps['{} status'.format(_DAEMON)] = """
+    type: command
+    short-summary: Show whether the daemon is running.
 """
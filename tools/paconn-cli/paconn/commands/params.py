@@ -9,7 +9,8 @@ CLI parameter definitions
 """
 
 from knack.arguments import ArgumentsContext
-from paconn import _LOGIN, _DOWNLOAD, _CREATE, _UPDATE, _VALIDATE
+from paconn import _LOGIN, _DOWNLOAD, _CREATE, _UPDATE, _VALIDATE, _SCAN, _DAEMON
+from paconn.completer import get_environment_completion_list, get_connector_id_completion_list
 
 CLIENT_SECRET = 'client_secret'
 CLIENT_SECRET_OPTIONS = ['--secret', '-r']
@@ -18,6 +19,7 @@ CLIENT_SECRET_HELP = 'The OAuth2 client secret for the connector.'
 ENVIRONMENT = 'environment'
 ENVIRONMENT_OPTIONS = ['--env', '-e']
 ENVIRONMENT_HELP = 'Power Platform environment ID.'
+ENVIRONMENTS_HELP = 'Power Platform environment ID, or a comma-separated list of environment IDs to deploy to concurrently.'  # noqa: E501
 
 CONNECTOR_ID = 'connector_id'
 CONNECTOR_ID_OPTIONS = ['--cid', '-c']
@@ -51,6 +53,34 @@ SCRIPT = 'script'
 SCRIPT_OPTIONS = ['--script', '-x']
 SCRIPT_HELP = 'Location for the script file.'
 
+BATCH = 'batch'
+BATCH_OPTIONS = ['--batch', '-b']
+BATCH_HELP = 'A settings file glob, a directory or a manifest file listing settings files. All the matching connectors are processed concurrently.'  # noqa: E501
+CREATE_BATCH_HELP = BATCH_HELP + ' The new connector IDs are written to the settings files, which requires --overwrite-settings.'  # noqa: E501
+
+COMPRESS = 'compress'
+COMPRESS_OPTIONS = ['--compress']
+COMPRESS_HELP = 'Send large request bodies gzip compressed. Compression is turned off when the service rejects it.'
+
+WORKERS = 'workers'
+WORKERS_OPTIONS = ['--workers']
+WORKERS_HELP = 'Maximum number of connectors processed concurrently in a batch, or of environments deployed to concurrently.'  # noqa: E501
+
+ENV_FILE = 'env_file'
+ENV_FILE_OPTIONS = ['--env-file']
+ENV_FILE_HELP = 'A file listing one environment ID per line, optionally followed by the connector ID in that environment. The connector is loaded and validated once, and deployed to all the environments concurrently.'  # noqa: E501
+
+MAX_RPS = 'max_rps'
+MAX_RPS_OPTIONS = ['--max-rps']
+MAX_RPS_HELP = 'Maximum number of requests per second sent to the service, shared by all the workers.'
+
+CHANGED_SINCE = 'changed_since'
+CHANGED_SINCE_OPTIONS = ['--changed-since']
+CHANGED_SINCE_HELP = 'Only process the connectors with files changed since this git revision, like a branch, tag or commit.'  # noqa: E501
+
+PROFILE_OPTIONS = ['--profile']
+PROFILE_HELP = 'Show the duration of the phases and requests of the command, and write a trace of them to FILE when given.'  # noqa: E501
+
 
 # pylint: disable=unused-argument
 def load_arguments(self, command):
@@ -104,12 +134,14 @@ def load_arguments(self, command):
             options_list=ENVIRONMENT_OPTIONS,
             type=str,
             required=False,
+            completer=get_environment_completion_list,
             help=ENVIRONMENT_HELP)
         arg_context.argument(
             CONNECTOR_ID,
             options_list=CONNECTOR_ID_OPTIONS,
             type=str,
             required=False,
+            completer=get_connector_id_completion_list,
             help=CONNECTOR_ID_HELP)
         arg_context.argument(
             'destination',
@@ -144,6 +176,36 @@ def load_arguments(self, command):
             default=False,
             const=True,
             help='Overwrite all the existing connector and settings files.')
+        arg_context.argument(
+            'no_format',
+            options_list=['--no-format'],
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help='Write the swagger as it is stored, without formatting it.')
+        arg_context.argument(
+            'all_connectors',
+            options_list=['--all', '-a'],
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help='Download all the custom connectors of the environment, each into a sub-directory of the destination. Connectors downloaded by a previous run are skipped unless --overwrite is given.')  # noqa: E501
+        arg_context.argument(
+            WORKERS,
+            options_list=WORKERS_OPTIONS,
+            type=int,
+            required=False,
+            help='Maximum number of connectors downloaded concurrently with --all.')
+        arg_context.argument(
+            MAX_RPS,
+            options_list=MAX_RPS_OPTIONS,
+            type=float,
+            required=False,
+            help=MAX_RPS_HELP)
 
     with ArgumentsContext(self, _CREATE) as arg_context:
         arg_context.argument(
@@ -151,7 +213,8 @@ def load_arguments(self, command):
             options_list=ENVIRONMENT_OPTIONS,
             type=str,
             required=False,
-            help=ENVIRONMENT_HELP)
+            completer=get_environment_completion_list,
+            help=ENVIRONMENTS_HELP)
         arg_context.argument(
             API_PROPERTIES,
             options_list=API_PROPERTIES_OPTIONS,
@@ -209,6 +272,39 @@ def load_arguments(self, command):
             default=False,
             const=True,
             help='Overwrite the existing settings file.')
+        arg_context.argument(
+            BATCH,
+            options_list=BATCH_OPTIONS,
+            type=str,
+            required=False,
+            help=CREATE_BATCH_HELP)
+        arg_context.argument(
+            ENV_FILE,
+            options_list=ENV_FILE_OPTIONS,
+            type=str,
+            required=False,
+            help=ENV_FILE_HELP)
+        arg_context.argument(
+            WORKERS,
+            options_list=WORKERS_OPTIONS,
+            type=int,
+            required=False,
+            help=WORKERS_HELP)
+        arg_context.argument(
+            MAX_RPS,
+            options_list=MAX_RPS_OPTIONS,
+            type=float,
+            required=False,
+            help=MAX_RPS_HELP)
+        arg_context.argument(
+            COMPRESS,
+            options_list=COMPRESS_OPTIONS,
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help=COMPRESS_HELP)
 
     with ArgumentsContext(self, _UPDATE) as arg_context:
         arg_context.argument(
@@ -216,7 +312,8 @@ def load_arguments(self, command):
             options_list=ENVIRONMENT_OPTIONS,
             type=str,
             required=False,
-            help=ENVIRONMENT_HELP)
+            completer=get_environment_completion_list,
+            help=ENVIRONMENTS_HELP)
         arg_context.argument(
             API_PROPERTIES,
             options_list=API_PROPERTIES_OPTIONS,
@@ -246,6 +343,7 @@ def load_arguments(self, command):
             options_list=CONNECTOR_ID_OPTIONS,
             type=str,
             required=False,
+            completer=get_connector_id_completion_list,
             help=CONNECTOR_ID_HELP)
         arg_context.argument(
             POWERAPPS_URL,
@@ -271,6 +369,54 @@ def load_arguments(self, command):
             type=str,
             required=False,
             help=SETTINGS_HELP)
+        arg_context.argument(
+            BATCH,
+            options_list=BATCH_OPTIONS,
+            type=str,
+            required=False,
+            help=BATCH_HELP)
+        arg_context.argument(
+            ENV_FILE,
+            options_list=ENV_FILE_OPTIONS,
+            type=str,
+            required=False,
+            help=ENV_FILE_HELP)
+        arg_context.argument(
+            WORKERS,
+            options_list=WORKERS_OPTIONS,
+            type=int,
+            required=False,
+            help=WORKERS_HELP)
+        arg_context.argument(
+            MAX_RPS,
+            options_list=MAX_RPS_OPTIONS,
+            type=float,
+            required=False,
+            help=MAX_RPS_HELP)
+        arg_context.argument(
+            'force',
+            options_list=['--force', '-f'],
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help='Update even if the connector is unchanged since its last deployment, and upload all the files again.')
+        arg_context.argument(
+            CHANGED_SINCE,
+            options_list=CHANGED_SINCE_OPTIONS,
+            type=str,
+            required=False,
+            help=CHANGED_SINCE_HELP + ' The settings files are searched under --batch, or the current directory.')
+        arg_context.argument(
+            COMPRESS,
+            options_list=COMPRESS_OPTIONS,
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help=COMPRESS_HELP)
 
     with ArgumentsContext(self, _VALIDATE) as arg_context:
         arg_context.argument(
@@ -279,6 +425,51 @@ def load_arguments(self, command):
             type=str,
             required=False,
             help=API_DEFINITION_HELP)
+        arg_context.argument(
+            API_PROPERTIES,
+            options_list=API_PROPERTIES_OPTIONS,
+            type=str,
+            required=False,
+            help='Location of the API properties JSON document. Only used with --local.')
+        arg_context.argument(
+            'local',
+            options_list=['--local', '-l'],
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help='Validate the files against the bundled JSON schemas, without calling the service.')
+        arg_context.argument(
+            'no_cache',
+            options_list=['--no-cache'],
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help='Call the service even when the swagger is unchanged since a previous validation.')
+        arg_context.argument(
+            CHANGED_SINCE,
+            options_list=CHANGED_SINCE_OPTIONS,
+            type=str,
+            required=False,
+            help=CHANGED_SINCE_HELP + ' The connectors are searched under the current directory.')
+        arg_context.argument(
+            WORKERS,
+            options_list=WORKERS_OPTIONS,
+            type=int,
+            required=False,
+            help='Maximum number of connectors validated concurrently with --changed-since.')
+        arg_context.argument(
+            COMPRESS,
+            options_list=COMPRESS_OPTIONS,
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help=COMPRESS_HELP)
         arg_context.argument(
             POWERAPPS_URL,
             options_list=POWERAPPS_URL_OPTIONS,
@@ -297,3 +488,32 @@ def load_arguments(self, command):
             type=str,
             required=False,
             help=SETTINGS_HELP)
+
+    with ArgumentsContext(self, _SCAN) as arg_context:
+        arg_context.positional(
+            'root',
+            type=str,
+            help='Directory under which the connectors are checked.')
+        arg_context.argument(
+            WORKERS,
+            options_list=WORKERS_OPTIONS,
+            type=int,
+            required=False,
+            help='Number of processes checking the connectors. Defaults to the number of cores.')
+
+    with ArgumentsContext(self, '{} start'.format(_DAEMON)) as arg_context:
+        arg_context.argument(
+            'foreground',
+            options_list=['--foreground'],
+            type=bool,
+            required=False,
+            nargs='?',
+            default=False,
+            const=True,
+            help='Serve in this process until stopped, instead of in a background process.')
+        arg_context.argument(
+            'idle_timeout',
+            options_list=['--idle-timeout'],
+            type=float,
+            required=False,
+            help='Minutes without a command after which the daemon stops. 0 keeps it running. Defaults to 30.')
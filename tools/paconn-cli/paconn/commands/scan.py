@@ -0,0 +1,48 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Scan command.
+"""
+
+import os
+import time
+
+from knack.util import CLIError
+from knack.log import get_logger
+
+from paconn.common.util import display
+
+import paconn.operations.scan
+
+LOGGER = get_logger(__name__)
+
+
+def scan(root, workers=None):
+    """
+    Scan command.
+    """
+    if not os.path.isdir(root):
+        raise CLIError('Directory not found: {}'.format(root))
+
+    start = time.perf_counter()
+    scanned = 0
+    failed = []
+    for (directory, errors) in paconn.operations.scan.scan(root, max_workers=workers):
+        scanned += 1
+        name = os.path.relpath(directory, root)
+        if errors:
+            failed.append(name)
+            display('{}:\n  {}'.format(name, '\n  '.join(errors)))
+        else:
+            LOGGER.info('%s: valid.', name)
+
+    display('{} connector(s) scanned in {:.1f} seconds, {} with errors.'.format(
+        scanned,
+        time.perf_counter() - start,
+        len(failed)))
+
+    if failed:
+        raise CLIError('{} connector(s) with errors under {}.'.format(len(failed), root))
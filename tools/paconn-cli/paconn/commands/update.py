@@ -7,10 +7,22 @@
 Update command.
 """
 
+import os
+
+from knack.util import CLIError
+
 from paconn import _UPDATE
 from paconn.common.util import display
-from paconn.settings.util import load_powerapps_and_flow_rp
+from paconn.settings.util import load_powerapps_and_flow_rp, load_powerapps_rp
 from paconn.operations.upsert import upsert
+from paconn.operations.fanout import (
+    is_fanout,
+    get_environments,
+    upsert_environments,
+    ensure_environments_succeeded
+)
+from paconn.operations.batch import get_settings_files, filter_changed, upsert_batch, ensure_batch_succeeded
+from paconn.common.gitchanges import get_changed_files
 from paconn.settings.settingsbuilder import SettingsBuilder
 
 
@@ -25,14 +37,31 @@ def update(
         powerapps_url,
         powerapps_version,
         client_secret,
-        settings_file):
+        settings_file,
+        force,
+        compress,
+        batch=None,
+        workers=None,
+        max_rps=None,
+        changed_since=None,
+        env_file=None):
     """
     Update command.
     """
+    # Only the connectors changed since the revision are updated,
+    # by default those of the settings files under the current directory
+    if changed_since:
+        batch = batch or os.getcwd()
+
+    if batch and client_secret:
+        raise CLIError(
+            'The --secret argument can\'t be combined with --batch or --changed-since, '
+            'the connectors of a batch use different OAuth apps.')
+
     # Get settings
     settings = SettingsBuilder.get_settings(
         environment=environment,
-        settings_file=settings_file,
+        settings_file=None if batch else settings_file,
         api_properties=api_properties,
         api_definition=api_definition,
         icon=icon,
@@ -41,15 +70,76 @@ def update(
         powerapps_url=powerapps_url,
         powerapps_version=powerapps_version)
 
+    if is_fanout(environment, env_file):
+        if batch:
+            raise CLIError('The --batch and --env-file arguments, or several --env environments, can\'t be combined.')
+
+        environments = get_environments(
+            environment=environment,
+            env_file=env_file,
+            connector_id=settings.connector_id,
+            is_update=True)
+
+        powerapps_rp = load_powerapps_rp(
+            settings=settings,
+            max_workers=workers,
+            compress=compress,
+            max_rps=max_rps)
+
+        results = upsert_environments(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            environments=environments,
+            client_secret=client_secret,
+            is_update=True,
+            max_workers=workers,
+            force=force)
+
+        ensure_environments_succeeded(results, is_update=True)
+        return
+
+    if batch:
+        settings_files = get_settings_files(batch)
+
+        if changed_since:
+            settings_files = filter_changed(settings_files, get_changed_files(changed_since))
+            if not settings_files:
+                display('No connector changed since {}.'.format(changed_since))
+                return
+
+        powerapps_rp = load_powerapps_rp(
+            settings=settings,
+            max_workers=workers,
+            compress=compress,
+            max_rps=max_rps)
+
+        results = upsert_batch(
+            powerapps_rp=powerapps_rp,
+            settings_files=settings_files,
+            is_update=True,
+            overwrite_settings=False,
+            max_workers=workers,
+            force=force)
+
+        ensure_batch_succeeded(results, is_update=True)
+        return
+
     powerapps_rp, _ = load_powerapps_and_flow_rp(
         settings=settings,
-        command_context=_UPDATE)
+        command_context=_UPDATE,
+        compress=compress,
+        max_rps=max_rps)
 
     connector_id = upsert(
         powerapps_rp=powerapps_rp,
         settings=settings,
         client_secret=client_secret,
         is_update=True,
-        overwrite_settings=False)
+        overwrite_settings=False,
+        force=force)
 
-    display('{} updated successfully.'.format(connector_id))
+    if connector_id:
+        display('{} updated successfully.'.format(connector_id))
+    else:
+        display('{} is unchanged since its last deployment, update skipped. Use --force to update anyway.'.format(
+            settings.connector_id))
@@ -7,12 +7,18 @@
 Validate command.
 """
 
+import os
+
+from knack.util import CLIError
+
 from paconn import _VALIDATE
 
 from paconn.common.util import display
-from paconn.settings.util import load_powerapps_and_flow_rp
+from paconn.common.gitchanges import get_changed_files
+from paconn.settings.util import load_powerapps_and_flow_rp, load_powerapps_rp
 from paconn.settings.settingsbuilder import SettingsBuilder
 
+import paconn.operations.scan
 import paconn.operations.validate
 
 
@@ -20,15 +26,32 @@ def validate(
         api_definition,
         powerapps_url,
         powerapps_version,
-        settings_file):
+        settings_file,
+        local,
+        no_cache,
+        compress,
+        api_properties=None,
+        changed_since=None,
+        workers=None):
     """
     Validate command.
     """
+    if changed_since:
+        _validate_changed(
+            changed_since=changed_since,
+            powerapps_url=powerapps_url,
+            powerapps_version=powerapps_version,
+            local=local,
+            no_cache=no_cache,
+            compress=compress,
+            workers=workers)
+        return
+
     # Get settings
     settings = SettingsBuilder.get_settings(
         environment=None,
         settings_file=settings_file,
-        api_properties=None,
+        api_properties=api_properties,
         api_definition=api_definition,
         icon=None,
         script=None,
@@ -36,15 +59,80 @@ def validate(
         powerapps_url=powerapps_url,
         powerapps_version=powerapps_version)
 
-    powerapps_rp, _ = load_powerapps_and_flow_rp(
-        settings=settings,
-        command_context=_VALIDATE)
+    # Local validation doesn't need a login
+    if local:
+        result = paconn.operations.validate.validate_local(
+            settings=settings,
+            settings_file=settings_file)
+        if result:
+            raise CLIError(result)
+    else:
+        powerapps_rp, _ = load_powerapps_and_flow_rp(
+            settings=settings,
+            command_context=_VALIDATE,
+            compress=compress)
 
-    result = paconn.operations.validate.validate(
-        powerapps_rp=powerapps_rp,
-        settings=settings)
+        result = paconn.operations.validate.validate(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            use_cache=not no_cache)
 
     if result:
         display(result)
     else:
         display('{} validated successfully.'.format(settings.api_definition))
+
+
+# pylint: disable=too-many-arguments
+def _validate_changed(changed_since, powerapps_url, powerapps_version, local, no_cache, compress, workers):
+    """
+    Validates the connectors under the current directory changed since a git revision.
+    """
+    directories = paconn.operations.scan.find_changed_connectors(
+        root=os.getcwd(),
+        changed_files=get_changed_files(changed_since))
+    if not directories:
+        display('No connector changed since {}.'.format(changed_since))
+        return
+
+    settings = SettingsBuilder.get_settings(
+        environment=None,
+        settings_file=None,
+        api_properties=None,
+        api_definition=None,
+        icon=None,
+        script=None,
+        connector_id=None,
+        powerapps_url=powerapps_url,
+        powerapps_version=powerapps_version)
+
+    powerapps_rp = None
+    if not local:
+        powerapps_rp = load_powerapps_rp(
+            settings=settings,
+            max_workers=workers,
+            compress=compress)
+
+    failed = []
+    for (directory, result, error) in paconn.operations.validate.validate_all(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            directories=directories,
+            local=local,
+            use_cache=not no_cache,
+            max_workers=workers):
+        name = os.path.relpath(directory)
+        if error:
+            failed.append(name)
+            display('{}: failed. {}'.format(name, error))
+        elif result and local:
+            failed.append(name)
+            display('{}:\n{}'.format(name, result))
+        elif result:
+            display('{}:\n{}'.format(name, result))
+        else:
+            display('{}: validated successfully.'.format(name))
+
+    display('{} connector(s) validated, {} failed.'.format(len(directories), len(failed)))
+    if failed:
+        raise CLIError('Failed connectors: {}'.format(', '.join(sorted(failed))))
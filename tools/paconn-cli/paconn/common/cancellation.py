@@ -0,0 +1,46 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Cancellation of the running command, used by the daemon when its client disconnects.
+The concurrent operations check it between their tasks, so that no further
+connector is deployed once the command is cancelled.
+"""
+
+import threading
+
+from knack.util import CLIError
+
+_CANCELLED = threading.Event()
+
+
+class CommandCancelled(CLIError):
+    """
+    Raised by a task started after the command was cancelled.
+    """
+    def __init__(self):
+        super(CommandCancelled, self).__init__('The command was cancelled.')
+
+
+def cancel():
+    """
+    Cancels the running command.
+    """
+    _CANCELLED.set()
+
+
+def reset():
+    """
+    Clears the cancellation, before a command starts.
+    """
+    _CANCELLED.clear()
+
+
+def check():
+    """
+    Raises CommandCancelled if the running command was cancelled.
+    """
+    if _CANCELLED.is_set():
+        raise CommandCancelled()
@@ -0,0 +1,26 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Runs a function for many items concurrently.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def run_concurrently(function, arguments, max_workers):
+    """
+    Calls the function with the keyword arguments of each (name, keyword arguments) pair,
+    at most max_workers at a time.
+    Yields (name, result, error) tuples as the calls complete,
+    a failed call yielding its exception as error and None as result.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(function, **kwargs): name for (name, kwargs) in arguments}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as exception:  # pylint: disable=broad-except
+                yield futures[future], None, exception
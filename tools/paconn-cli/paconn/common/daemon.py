@@ -0,0 +1,398 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+The paconn daemon, a long-lived process serving commands over a Unix socket.
+The credentials, connection pools, compiled schemas and caches loaded by
+a command stay loaded for the next ones.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import threading
+import subprocess
+import socketserver
+
+from knack.util import CLIError
+from knack.log import CLI_LOGGER_NAME
+from knack.prompting import NoTTYException
+
+from paconn import __VERSION__, __CLI_NAME__, _DAEMON
+from paconn.cli import ConnectorsCli, invoke
+from paconn.common.util import get_config_dir
+from paconn.common import tracing, cancellation
+from paconn.common.daemonclient import (
+    get_socket_path,
+    get_command_environment,
+    send_message,
+    request_control,
+    VERSION,
+    ARGS,
+    CWD,
+    ENVIRONMENT,
+    CONTROL,
+    STDOUT,
+    STDERR,
+    EXIT,
+    FALLBACK,
+    STATUS,
+    STATUS_REQUEST,
+    STOP_REQUEST
+)
+
+LOG_FILE = 'daemon.log'
+
+# Seconds without a command after which the daemon exits
+DEFAULT_IDLE_TIMEOUT = 1800
+
+# Seconds to wait for a daemon to start serving, or to stop
+START_TIMEOUT_SECONDS = 10
+
+# Seconds between the checks for an idle daemon
+_IDLE_CHECK_SECONDS = 5
+
+
+def _log(message):
+    # The output of the commands is redirected, the log goes to the original stdout
+    sys.__stdout__.write('{} {}\n'.format(time.strftime('%Y-%m-%d %H:%M:%S'), message))
+    sys.__stdout__.flush()
+
+
+def _get_exit_code(code):
+    """
+    Returns the exit code of a SystemExit code.
+    """
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    sys.stderr.write('{}\n'.format(code))
+    return 1
+
+
+def _reset_logging():
+    """
+    Removes the console handlers of the loggers, so that the next command
+    configures them with its verbosity and output streams.
+    """
+    for logger in (logging.getLogger(), logging.getLogger(CLI_LOGGER_NAME)):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+
+
+class _ClientStream(io.TextIOBase):
+    """
+    Sends what is written as messages of a kind to a client.
+    Once the client disconnected, the output is dropped and the command is cancelled.
+    """
+    def __init__(self, connection, key, lock, watcher):
+        super().__init__()
+        self.connection = connection
+        self.key = key
+        self.lock = lock
+        self.watcher = watcher
+        self.disconnected = False
+
+    def write(self, text):
+        if text and not self.disconnected:
+            with self.lock:
+                try:
+                    send_message(self.connection, {self.key: text})
+                except OSError:
+                    self.disconnected = True
+                    self.watcher.disconnected()
+        return len(text)
+
+    def isatty(self):
+        return False
+
+
+class _DisconnectWatcher(threading.Thread):
+    """
+    Cancels the running command once its client disconnected, like on Ctrl+C,
+    so that a batch doesn't carry on deploying connectors nobody waits for.
+    """
+    def __init__(self, connection):
+        super().__init__(name='paconn-disconnect-watcher', daemon=True)
+        self.connection = connection
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def run(self):
+        try:
+            # The client sends nothing after its request, the read ends when it closes the connection
+            while self.connection.recv(1024):
+                pass
+        except OSError:
+            pass
+        self.disconnected()
+
+    def disconnected(self):
+        """
+        Cancels the command, unless it already completed.
+        """
+        with self._lock:
+            if not self._finished:
+                self._finished = True
+                _log('The client disconnected, cancelling the command.')
+                cancellation.cancel()
+
+    def finish(self):
+        """
+        Marks the command completed and stops watching.
+        """
+        with self._lock:
+            self._finished = True
+        try:
+            self.connection.shutdown(socket.SHUT_RD)
+        except OSError:
+            pass
+
+
+class _InteractiveCommand(Exception):
+    """
+    Raised when a command prompts, which only the client can do.
+    """
+
+
+class _DaemonBusy(Exception):
+    """
+    Raised when a command arrives while another one is running.
+    """
+
+
+class DaemonCli(ConnectorsCli):
+    """
+    The CLI without a terminal, leaving the commands that prompt to the client.
+    """
+    def exception_handler(self, ex):
+        if isinstance(ex, NoTTYException):
+            raise _InteractiveCommand()
+        return super(DaemonCli, self).exception_handler(ex)
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves the commands one at a time, since they share the process streams and
+    working directory, and answers the control requests meanwhile.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, idle_timeout):
+        # Only the user can connect to the socket
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, DaemonHandler)
+        finally:
+            os.umask(umask)
+
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.commands = 0
+        self.last_active = time.monotonic()
+        self._command_lock = threading.Lock()
+
+    def get_status(self):
+        return {
+            'pid': os.getpid(),
+            'version': __VERSION__,
+            'started': self.started,
+            'commands': self.commands,
+            'busy': self._command_lock.locked()
+        }
+
+    def run_command(self, connection, args, cwd):
+        """
+        Runs a command with its output sent to the client, cancelled if the client disconnects.
+        Returns the exit code, or None when the client must run the command itself.
+        Raises _DaemonBusy when another command is running, rather than making the client wait.
+        """
+        if not self._command_lock.acquire(blocking=False):
+            raise _DaemonBusy()
+        try:
+            self.commands += 1
+            _log('Running {}'.format(' '.join(args[:1])))
+            cancellation.reset()
+            watcher = _DisconnectWatcher(connection)
+            watcher.start()
+            lock = threading.Lock()
+            streams = (sys.stdin, sys.stdout, sys.stderr)
+            working_dir = os.getcwd()
+            sys.stdin = io.StringIO()
+            sys.stdout = _ClientStream(connection, STDOUT, lock, watcher)
+            sys.stderr = _ClientStream(connection, STDERR, lock, watcher)
+            _reset_logging()
+            try:
+                os.chdir(cwd)
+                return invoke(args, cli_cls=DaemonCli)
+            except SystemExit as exception:
+                # Help and argument errors exit
+                return _get_exit_code(exception.code)
+            except _InteractiveCommand:
+                return None
+            finally:
+                watcher.finish()
+                # A command exiting early leaves its trace open
+                tracing.finish_tracing()
+                (sys.stdin, sys.stdout, sys.stderr) = streams
+                _reset_logging()
+                os.chdir(working_dir)
+                self.last_active = time.monotonic()
+        finally:
+            self._command_lock.release()
+
+    def watch_idle(self):
+        """
+        Shuts the server down once no command ran for the idle timeout.
+        """
+        while True:
+            time.sleep(_IDLE_CHECK_SECONDS)
+            if not self._command_lock.locked() and time.monotonic() - self.last_active > self.idle_timeout:
+                _log('Idle for {} seconds, stopping.'.format(self.idle_timeout))
+                self.shutdown()
+                return
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """
+    Handles a command or control request, a single JSON line.
+    """
+    def _reply(self, message):
+        try:
+            send_message(self.connection, message)
+        except OSError:
+            # The client is gone, its command was cancelled
+            pass
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        message = json.loads(line)
+
+        # The control requests of any version are answered, so that an upgraded CLI stops an older daemon
+        control = message.get(CONTROL)
+        if control == STATUS_REQUEST:
+            self._reply({STATUS: self.server.get_status()})
+        elif control == STOP_REQUEST:
+            self._reply({STATUS: self.server.get_status()})
+            _log('Stopping.')
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif message.get(VERSION) != __VERSION__:
+            # A client of another version could run another set of commands
+            self._reply({FALLBACK: 'version'})
+        elif message.get(ENVIRONMENT) != get_command_environment():
+            # The proxies, CA bundle and configuration of the daemon would apply instead of the client's
+            self._reply({FALLBACK: 'environment'})
+        else:
+            self._run_command(message)
+
+    def _run_command(self, message):
+        try:
+            exit_code = self.server.run_command(self.connection, message[ARGS], message[CWD])
+        except _DaemonBusy:
+            # The client runs the command itself instead of waiting for the running one
+            self._reply({FALLBACK: 'busy'})
+            return
+        if exit_code is None:
+            self._reply({FALLBACK: 'interactive'})
+        else:
+            self._reply({EXIT: exit_code})
+
+
+def _ensure_supported():
+    if not hasattr(socket, 'AF_UNIX'):
+        raise CLIError('The daemon requires Unix domain sockets, which this platform doesn\'t support.')
+
+
+def get_status():
+    """
+    Returns the status of the running daemon, or None when it isn't running.
+    """
+    reply = request_control(STATUS_REQUEST)
+    return reply.get(STATUS) if reply else None
+
+
+def serve(idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Serves commands in this process until stopped, or idle for the timeout in seconds.
+    """
+    _ensure_supported()
+    if get_status():
+        raise CLIError('The daemon is already running.')
+
+    socket_path = get_socket_path()
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    server = DaemonServer(socket_path, idle_timeout)
+    if idle_timeout:
+        threading.Thread(target=server.watch_idle, daemon=True).start()
+
+    _log('Serving on {}, process {}.'.format(socket_path, os.getpid()))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def start(idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Starts the daemon in a background process, logging to the config directory.
+    Returns its status once it serves.
+    """
+    _ensure_supported()
+    if get_status():
+        raise CLIError('The daemon is already running.')
+
+    config_dir = get_config_dir()
+    os.makedirs(config_dir, exist_ok=True)
+    log_file = os.path.join(config_dir, LOG_FILE)
+    with open(log_file, 'a') as log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', __CLI_NAME__, _DAEMON, 'start', '--foreground',
+             '--idle-timeout', str(idle_timeout / 60)],
+            cwd=config_dir,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True)
+
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        status = get_status()
+        if status:
+            return status
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+
+    raise CLIError('The daemon didn\'t start, see {}.'.format(log_file))
+
+
+def stop():
+    """
+    Stops the daemon.
+    Returns its last status, or None when it wasn't running.
+    """
+    reply = request_control(STOP_REQUEST)
+    if not reply:
+        return None
+
+    # The daemon removes its socket once it stopped serving
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while os.path.exists(get_socket_path()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    return reply.get(STATUS)
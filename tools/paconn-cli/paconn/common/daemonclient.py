@@ -0,0 +1,164 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Client of the paconn daemon, which runs commands in a long-lived process.
+Doesn't import the CLI, so that a delegated command doesn't pay for loading it.
+"""
+
+import os
+import sys
+import json
+import socket
+
+from paconn import __VERSION__, __CLI_NAME__, _DOWNLOAD, _UPDATE, _VALIDATE
+
+SOCKET_FILE = 'daemon.sock'
+
+# Commands the regular CLI runs in the daemon when it is running
+DELEGATED_COMMANDS = (_DOWNLOAD, _UPDATE, _VALIDATE)
+
+# Environment variables changing how a command runs, besides the paconn configuration ones.
+# A command is only delegated to a daemon running with the same values.
+COMMAND_VARIABLES = (
+    'HTTP_PROXY',
+    'HTTPS_PROXY',
+    'ALL_PROXY',
+    'NO_PROXY',
+    'REQUESTS_CA_BUNDLE',
+    'CURL_CA_BUNDLE'
+)
+_CONFIG_VARIABLE_PREFIX = '{}_'.format(__CLI_NAME__.upper())
+
+# Message keys
+VERSION = 'version'
+ARGS = 'args'
+CWD = 'cwd'
+ENVIRONMENT = 'environment'
+CONTROL = 'control'
+STDOUT = 'stdout'
+STDERR = 'stderr'
+EXIT = 'exit'
+FALLBACK = 'fallback'
+STATUS = 'status'
+
+# Control requests
+STATUS_REQUEST = 'status'
+STOP_REQUEST = 'stop'
+
+
+def get_socket_path():
+    """
+    Returns the path of the daemon socket, in the config directory.
+    """
+    # Same as get_config_dir, which would import the CLI
+    return os.path.join(os.path.expanduser('~'), '.{}'.format(__CLI_NAME__), SOCKET_FILE)
+
+
+def get_command_environment():
+    """
+    Returns the environment variables of this process changing how a command runs,
+    like the proxies, the CA bundle and the paconn configuration.
+    """
+    return {
+        name: value
+        for (name, value) in os.environ.items()
+        if name.upper() in COMMAND_VARIABLES or name.upper().startswith(_CONFIG_VARIABLE_PREFIX)
+    }
+
+
+def connect():
+    """
+    Returns a socket connected to the daemon, or None when it isn't running.
+    """
+    socket_path = get_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        # A daemon that didn't exit cleanly leaves its socket file behind
+        connection.close()
+        return None
+    return connection
+
+
+def send_message(connection, message):
+    """
+    Sends a message as a line of JSON.
+    """
+    connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def read_messages(connection):
+    """
+    Yields the messages received until the connection is closed.
+    """
+    with connection.makefile('r', encoding='utf-8') as reader:
+        for line in reader:
+            yield json.loads(line)
+
+
+def request_control(control):
+    """
+    Sends a control request to the daemon.
+    Returns its reply, or None when the daemon isn't running.
+    """
+    connection = connect()
+    if connection is None:
+        return None
+    with connection:
+        try:
+            send_message(connection, {VERSION: __VERSION__, CONTROL: control})
+            return next(read_messages(connection), None)
+        except OSError:
+            # The daemon is stopping
+            return None
+
+
+def delegate(args):
+    """
+    Runs a command in the daemon when it is running and serves the command,
+    writing the output of the command as it comes.
+    Returns the exit code of the command, or None to run the command in this process.
+    """
+    if not args or args[0] not in DELEGATED_COMMANDS:
+        return None
+
+    connection = connect()
+    if connection is None:
+        return None
+
+    with connection:
+        try:
+            send_message(connection, {
+                VERSION: __VERSION__,
+                ARGS: args,
+                CWD: os.getcwd(),
+                ENVIRONMENT: get_command_environment()
+            })
+        except OSError:
+            # The daemon is stopping
+            return None
+
+        for message in read_messages(connection):
+            if STDOUT in message:
+                sys.stdout.write(message[STDOUT])
+                sys.stdout.flush()
+            elif STDERR in message:
+                sys.stderr.write(message[STDERR])
+                sys.stderr.flush()
+            elif EXIT in message:
+                return message[EXIT]
+            elif FALLBACK in message:
+                # Another version or environment, a command prompting in the terminal,
+                # or a busy daemon running the command of another client
+                return None
+
+    # The command may have been partly done, running it again could repeat it
+    sys.stderr.write('The daemon stopped before the command completed.\n')
+    return 1
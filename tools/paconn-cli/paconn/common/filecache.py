@@ -0,0 +1,119 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+A JSON file backed key value cache in the config directory.
+"""
+
+import os
+import json
+import threading
+
+from knack.log import get_logger
+
+from paconn.common.util import get_config_dir
+
+LOGGER = get_logger(__name__)
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+class FileCache:
+    """
+    Key value cache persisted as a JSON file in the config directory.
+    When max_entries is set, the least recently used entries are evicted.
+    The file is read again when another process changed it.
+    Use get_cache to share a single instance per file across threads.
+    """
+    def __init__(self, cache_file, max_entries=None):
+        self.cache_file = os.path.join(get_config_dir(), cache_file)
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._entries = None
+        self._modified_time = None
+
+    def _get_modified_time(self):
+        try:
+            return os.stat(self.cache_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        modified_time = self._get_modified_time()
+        if self._entries is None or modified_time != self._modified_time:
+            self._entries = {}
+            self._modified_time = modified_time
+            if modified_time is not None:
+                try:
+                    with open(self.cache_file, 'r') as file:
+                        self._entries = json.load(file)
+                except ValueError as exception:
+                    # A corrupt cache is discarded, not fatal
+                    LOGGER.debug('Ignoring cache file %s: %s', self.cache_file, exception)
+        return self._entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temp_file = '{}.{}.tmp'.format(self.cache_file, os.getpid())
+        # Cached values may hold signed URLs, keep them private like the tokens
+        with os.fdopen(os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as file:
+            json.dump(self._entries, file)
+        os.replace(temp_file, self.cache_file)
+        self._modified_time = self._get_modified_time()
+
+    def get(self, key, default=None):
+        """
+        Returns the value for a key.
+        """
+        with self._lock:
+            entries = self._load()
+            if key not in entries:
+                return default
+
+            # Keep the entries ordered by use, the order is persisted on the next write
+            if self.max_entries:
+                entries[key] = entries.pop(key)
+            return entries[key]
+
+    def set(self, key, value):
+        """
+        Sets the value for a key and persists the cache.
+        """
+        with self._lock:
+            entries = self._load()
+            entries.pop(key, None)
+            entries[key] = value
+
+            if self.max_entries:
+                while len(entries) > self.max_entries:
+                    del entries[next(iter(entries))]
+
+            self._save()
+
+    def items(self):
+        """
+        Returns a snapshot of the cached key value pairs.
+        """
+        with self._lock:
+            return list(self._load().items())
+
+    def delete(self, key):
+        """
+        Removes a key and persists the cache.
+        """
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._save()
+
+
+def get_cache(cache_file, max_entries=None):
+    """
+    Returns the shared cache for a file.
+    """
+    with _CACHES_LOCK:
+        if cache_file not in _CACHES:
+            _CACHES[cache_file] = FileCache(cache_file, max_entries)
+        return _CACHES[cache_file]
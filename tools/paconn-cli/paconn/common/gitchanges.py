@@ -0,0 +1,61 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Files changed in a git working tree since a revision.
+"""
+
+import os
+import subprocess
+
+from knack.util import CLIError
+from knack.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+
+def _git(arguments, directory):
+    """
+    Runs a git command and returns its output.
+    """
+    try:
+        process = subprocess.run(
+            ['git'] + arguments,
+            cwd=directory,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True)
+    except OSError as exception:
+        raise CLIError('Git is required to find the changed connectors: {}'.format(exception))
+
+    if process.returncode:
+        raise CLIError('git {} failed: {}'.format(' '.join(arguments), process.stderr.strip()))
+
+    return process.stdout
+
+
+def get_changed_files(revision, directory=None):
+    """
+    Returns the absolute paths of the files changed since the revision:
+    the files changed by the commits since the common ancestor of the revision and HEAD,
+    the uncommitted changes and the untracked files.
+    Deleted files are included.
+    """
+    directory = directory or os.getcwd()
+    top_level = _git(['rev-parse', '--show-toplevel'], directory).strip()
+
+    # Compare with the fork point, so that changes made on the revision
+    # since the branch was created don't count
+    merge_base = _git(['merge-base', revision, 'HEAD'], directory).strip()
+    LOGGER.debug('Changes since %s, merge base %s', revision, merge_base)
+
+    changed = _git(['diff', '--name-only', '-z', '--no-renames', merge_base], top_level).split('\0')
+    untracked = _git(['ls-files', '--others', '--exclude-standard', '-z'], top_level).split('\0')
+
+    return sorted(set(
+        os.path.normpath(os.path.join(top_level, path))
+        for path in changed + untracked
+        if path
+    ))
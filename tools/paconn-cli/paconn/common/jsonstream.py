@@ -0,0 +1,145 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Incremental parsing of streamed JSON documents.
+"""
+
+import re
+import json
+import codecs
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Characters that may continue a number
+_NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+
+class _StreamReader:
+    """
+    Reads JSON values from a stream of byte chunks,
+    keeping only the unparsed part of the stream in memory.
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+
+    def _read_more(self):
+        """
+        Reads until the unparsed part of the buffer doubled, or the stream ended.
+        Doubling keeps parsing linear when a value spans many chunks.
+        """
+        self._buffer = self._buffer[self._position:]
+        self._position = 0
+
+        target = max(len(self._buffer) * 2, 1)
+        while not self._eof and len(self._buffer) < target:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._buffer += self._decoder.decode(b'', final=True)
+                self._eof = True
+            else:
+                self._buffer += self._decoder.decode(chunk)
+
+    def _skip_whitespace(self):
+        while True:
+            self._position = _WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer) or self._eof:
+                return
+            self._read_more()
+
+    def next_char(self):
+        """
+        Consumes the next non whitespace character.
+        """
+        self._skip_whitespace()
+        if self._position >= len(self._buffer):
+            raise ValueError('Unexpected end of the JSON document.')
+        char = self._buffer[self._position]
+        self._position += 1
+        return char
+
+    def peek_char(self):
+        """
+        Returns the next non whitespace character without consuming it.
+        """
+        char = self.next_char()
+        self._position -= 1
+        return char
+
+    def expect_char(self, expected):
+        char = self.next_char()
+        if char != expected:
+            raise ValueError('Expected \'{}\' but found \'{}\' in the JSON document.'.format(expected, char))
+
+    def value(self):
+        """
+        Consumes the next JSON value.
+        """
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+                # A number may continue in the next chunk
+                if self._eof or (end < len(self._buffer) and self._buffer[end] not in _NUMBER_CHARS):
+                    self._position = end
+                    return value
+            except ValueError:
+                if self._eof:
+                    raise
+            self._read_more()
+
+
+def _iter_array_items(reader):
+    """
+    Yields the items of the array at the position of the reader, one at a time.
+    """
+    reader.expect_char('[')
+    if reader.peek_char() == ']':
+        reader.next_char()
+        return
+
+    while True:
+        yield reader.value()
+        char = reader.next_char()
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError('Expected \',\' or \']\' but found \'{}\' in the JSON document.'.format(char))
+
+
+def iter_json_array(chunks, array_key, members=None):
+    """
+    Yields the items of the array stored under array_key in a streamed JSON object,
+    one at a time. The other members of the object are stored in the members
+    dictionary, when provided, and are complete once the generator is exhausted.
+    """
+    reader = _StreamReader(chunks)
+
+    reader.expect_char('{')
+    if reader.peek_char() == '}':
+        return
+
+    while True:
+        key = reader.value()
+        reader.expect_char(':')
+
+        if key == array_key:
+            yield from _iter_array_items(reader)
+        else:
+            value = reader.value()
+            if members is not None:
+                members[key] = value
+
+        char = reader.next_char()
+        if char == '}':
+            return
+        if char != ',':
+            raise ValueError('Expected \',\' or \'}}\' but found \'{}\' in the JSON document.'.format(char))
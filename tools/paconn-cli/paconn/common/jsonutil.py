@@ -0,0 +1,189 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+JSON facade using orjson when it is installed, and the standard library otherwise.
+The output is identical with both backends.
+"""
+
+import io
+import os
+import re
+import json
+import codecs
+
+from knack.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+# Set to 'stdlib' to disable the fast backend
+JSON_BACKEND_ENV = 'PACONN_JSON_BACKEND'
+
+ORJSON_BACKEND = 'orjson'
+STDLIB_BACKEND = 'stdlib'
+
+# Characters the standard library escapes with ensure_ascii, but orjson doesn't
+_NON_ASCII = re.compile('[\\x7f-\\U0010ffff]')
+
+# orjson parses the integers that don't fit in 64 bits as floats.
+# Documents with long digit sequences are detected by mapping all the
+# digits to zeros, which is much faster than a regular expression.
+_LONG_NUMBER_DIGITS = 19
+_DIGITS_TO_ZEROS = str.maketrans('123456789', '000000000')
+_DIGITS_TO_ZEROS_BYTES = bytes.maketrans(b'123456789', b'000000000')
+
+# Types orjson writes like the standard library
+_PLAIN_TYPES = frozenset([str, int, bool, type(None)])
+
+_ORJSON = None
+_ORJSON_LOADED = False
+
+
+def _get_orjson():
+    """
+    Returns the orjson module, or None when the standard library is used.
+    """
+    global _ORJSON, _ORJSON_LOADED  # pylint: disable=global-statement
+    if not _ORJSON_LOADED:
+        if os.environ.get(JSON_BACKEND_ENV, ORJSON_BACKEND).lower() != STDLIB_BACKEND:
+            try:
+                import orjson
+                _ORJSON = orjson
+            except ImportError:
+                pass
+        _ORJSON_LOADED = True
+    return _ORJSON
+
+
+def get_backend():
+    """
+    Returns the name of the JSON backend in use.
+    """
+    return ORJSON_BACKEND if _get_orjson() else STDLIB_BACKEND
+
+
+def _escape(match):
+    code = ord(match.group(0))
+    if code < 0x10000:
+        return '\\u{:04x}'.format(code)
+    code -= 0x10000
+    return '\\u{:04x}\\u{:04x}'.format(0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+
+def _has_different_floats(content, orjson):
+    """
+    Returns true if the content has a float orjson doesn't write like the standard library.
+    """
+    stack = [content]
+    while stack:
+        value = stack.pop()
+        # Exact type checks first, this runs for every value of large documents
+        value_type = type(value)
+        if value_type is dict:
+            stack.extend(value.values())
+        elif value_type is list:
+            stack.extend(value)
+        elif value_type in _PLAIN_TYPES:
+            continue
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, float) and orjson.dumps(value) != float.__repr__(value).encode('ascii'):
+            return True
+    return False
+
+
+def _has_long_number(data):
+    if isinstance(data, bytes):
+        return b'0' * _LONG_NUMBER_DIGITS in data.translate(_DIGITS_TO_ZEROS_BYTES)
+    return '0' * _LONG_NUMBER_DIGITS in data.translate(_DIGITS_TO_ZEROS)
+
+
+def loads(data):
+    """
+    Parses a JSON document from a string or UTF-8 bytes, with or without a byte order mark.
+    """
+    if isinstance(data, bytes):
+        if data.startswith(codecs.BOM_UTF8):
+            data = data[len(codecs.BOM_UTF8):]
+    elif data.startswith('\ufeff'):
+        data = data[1:]
+
+    orjson = _get_orjson()
+    if orjson and not _has_long_number(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Documents orjson rejects, like NaN or lone surrogates, get the standard parsing and errors
+            pass
+
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def load(file):
+    """
+    Parses a JSON document from a binary file object, with or without a byte order mark.
+    The standard library decodes the file through a text stream, without a copy of its bytes.
+    """
+    if _get_orjson():
+        return loads(file.read())
+
+    return json.load(io.TextIOWrapper(file, encoding='utf-8-sig'))
+
+
+def load_file(file_path):
+    """
+    Parses a JSON file.
+    """
+    with open(file_path, 'rb') as file:
+        return load(file)
+
+
+def dumps(content, sort_keys=False, indent=None, ensure_ascii=True):
+    """
+    Serializes to a JSON string, as json.dumps does with the same arguments
+    and separators without trailing spaces.
+    """
+    orjson = _get_orjson()
+    if orjson and indent in (None, 2) and not _has_different_floats(content, orjson):
+        option = 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            json_string = orjson.dumps(content, option=option).decode('utf-8')
+        except TypeError as exception:
+            # Like integers over 64 bits, or non string keys
+            LOGGER.debug('Falling back to the standard JSON encoder: %s', exception)
+        else:
+            # orjson requires Python 3.7, where str.isascii is available
+            if ensure_ascii and (not json_string.isascii() or '\x7f' in json_string):
+                json_string = _NON_ASCII.sub(_escape, json_string)
+            return json_string
+
+    return json.dumps(
+        content,
+        sort_keys=sort_keys,
+        indent=indent,
+        ensure_ascii=ensure_ascii,
+        separators=(',', ': ') if indent else (',', ':'))
+
+
+def dump(content, file, sort_keys=False, indent=None):
+    """
+    Writes JSON to a text file object, as dumps does, in chunks.
+    The whole document is never held as a string, so the standard encoder
+    is used for large documents even when orjson is installed.
+    """
+    json.dump(
+        content,
+        file,
+        sort_keys=sort_keys,
+        indent=indent,
+        separators=(',', ': ') if indent else (',', ':'))
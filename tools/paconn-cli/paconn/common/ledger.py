@@ -0,0 +1,298 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+A SQLite ledger in the config directory of what was deployed to, uploaded for
+and downloaded from each connector, and of the results of swagger validations.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import calendar
+import threading
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs
+
+from knack.log import get_logger
+
+from paconn.common.util import get_config_dir
+
+LOGGER = get_logger(__name__)
+
+LEDGER_FILE = 'ledger.db'
+
+# A ledger written with another schema version is discarded
+SCHEMA_VERSION = 2
+
+# Seconds to wait for another paconn process writing to the ledger
+LOCK_TIMEOUT_SECONDS = 30
+
+# Number of seconds a recorded blob URI must remain valid to be reused
+URI_BUFFER_SECONDS = 600
+
+# Maximum number of validation results kept
+VALIDATION_LIMIT = 2000
+
+# Parts of a connector with a content hash
+API_DEFINITION = 'apiDefinition'
+API_PROPERTIES = 'apiProperties'
+ICON = 'icon'
+SCRIPT = 'script'
+PARTS = (API_DEFINITION, API_PROPERTIES, ICON, SCRIPT)
+
+DEPLOYED_AT = 'deployedAt'
+
+_SCHEMA = [
+    '''CREATE TABLE deployments (
+        service_url TEXT NOT NULL,
+        environment TEXT NOT NULL,
+        connector_id TEXT NOT NULL,
+        apiDefinition TEXT,
+        apiProperties TEXT,
+        icon TEXT,
+        script TEXT,
+        deployed_at REAL NOT NULL,
+        PRIMARY KEY (service_url, environment, connector_id))''',
+    '''CREATE TABLE uploads (
+        service_url TEXT NOT NULL,
+        environment TEXT NOT NULL,
+        connector_id TEXT NOT NULL,
+        part TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        uri TEXT NOT NULL,
+        uploaded_at REAL NOT NULL,
+        PRIMARY KEY (service_url, environment, connector_id, part))''',
+    '''CREATE TABLE downloads (
+        service_url TEXT NOT NULL,
+        environment TEXT NOT NULL,
+        connector_id TEXT NOT NULL,
+        directory TEXT NOT NULL,
+        changed_time TEXT NOT NULL,
+        formatted INTEGER NOT NULL,
+        file_hashes TEXT NOT NULL,
+        downloaded_at REAL NOT NULL,
+        PRIMARY KEY (service_url, environment, connector_id, directory))''',
+    '''CREATE TABLE validations (
+        cache_key TEXT PRIMARY KEY,
+        result TEXT NOT NULL,
+        validated_at REAL NOT NULL,
+        used_at REAL NOT NULL)''',
+    'CREATE INDEX validations_used_at ON validations (used_at)'
+]
+
+_TABLES = ['deployments', 'uploads', 'downloads', 'validations']
+
+# The files of the SQLite write-ahead log next to the ledger
+_WAL_SUFFIXES = ['-wal', '-shm']
+
+# Shared access signature expiry query parameter
+_SAS_EXPIRY = 'se'
+_SAS_EXPIRY_FORMATS = ['%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%MZ', '%Y-%m-%d']
+
+_LEDGER = None
+_LEDGER_LOCK = threading.Lock()
+
+
+def _get_expiry(uri):
+    """
+    Returns the expiry of a SAS URI in seconds since epoch, or None if unknown.
+    """
+    expiry = parse_qs(urlparse(uri).query).get(_SAS_EXPIRY, [None])[0]
+    for expiry_format in _SAS_EXPIRY_FORMATS:
+        try:
+            return calendar.timegm(datetime.strptime(expiry, expiry_format).timetuple())
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class Ledger:
+    """
+    Records, per service, environment and connector, the content hashes of the last deployment,
+    the blob URIs of the uploaded files and the files of the last download,
+    and the validation results by swagger.
+    A single connection is shared by the threads of a command, and the
+    processes running at the same time wait for each other's writes.
+    Use get_ledger to share a single instance.
+    """
+    def __init__(self, ledger_file=None):
+        self.ledger_file = ledger_file or os.path.join(get_config_dir(), LEDGER_FILE)
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.ledger_file), exist_ok=True)
+        # The ledger holds signed URLs, keep it private like the tokens
+        if not os.path.exists(self.ledger_file):
+            os.close(os.open(self.ledger_file, os.O_WRONLY | os.O_CREAT, 0o600))
+
+        connection = sqlite3.connect(self.ledger_file, timeout=LOCK_TIMEOUT_SECONDS, check_same_thread=False)
+        try:
+            # Readers don't wait for the writes of other processes
+            connection.execute('PRAGMA journal_mode=WAL')
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+            if version != SCHEMA_VERSION:
+                with connection:
+                    for table in _TABLES:
+                        connection.execute('DROP TABLE IF EXISTS {}'.format(table))
+                    for statement in _SCHEMA:
+                        connection.execute(statement)
+                    connection.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def _remove(self):
+        """
+        Removes the ledger with its write-ahead log, which would otherwise be replayed on the new ledger.
+        """
+        for file_path in [self.ledger_file] + [self.ledger_file + suffix for suffix in _WAL_SUFFIXES]:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def _connect(self):
+        if self._connection is None:
+            try:
+                self._connection = self._open()
+            except sqlite3.DatabaseError as exception:
+                # A corrupt ledger is discarded, not fatal
+                LOGGER.debug('Discarding ledger %s: %s', self.ledger_file, exception)
+                self._remove()
+                self._connection = self._open()
+        return self._connection
+
+    def _execute(self, statement, parameters=()):
+        """
+        Runs a statement in its own transaction and returns the rows.
+        """
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                return connection.execute(statement, parameters).fetchall()
+
+    def get_deployment(self, service_url, environment, connector_id):
+        """
+        Returns the content hashes of the last deployment of a connector by part,
+        and its time as DEPLOYED_AT, or None if unknown.
+        The hash of a part is None when the part wasn't deployed or can't be compared.
+        """
+        rows = self._execute(
+            'SELECT {}, deployed_at FROM deployments '
+            'WHERE service_url = ? AND environment = ? AND connector_id = ?'.format(', '.join(PARTS)),
+            (service_url, environment, connector_id))
+        if not rows:
+            return None
+        deployment = dict(zip(PARTS, rows[0]))
+        deployment[DEPLOYED_AT] = rows[0][-1]
+        return deployment
+
+    def set_deployment(self, service_url, environment, connector_id, content_hashes):
+        """
+        Records the content hashes of a deployment by part.
+        """
+        self._execute(
+            'INSERT OR REPLACE INTO deployments VALUES (?, ?, ?, {}, ?)'.format(', '.join('?' * len(PARTS))),
+            [service_url, environment, connector_id] + [content_hashes.get(part) for part in PARTS] + [time.time()])
+
+    # pylint: disable=too-many-arguments
+    def get_upload_uri(self, service_url, environment, connector_id, part, content_hash):
+        """
+        Returns the blob URI of a previous upload of the same content for a connector,
+        if it is still valid.
+        """
+        if not connector_id:
+            return None
+
+        rows = self._execute(
+            'SELECT uri FROM uploads '
+            'WHERE service_url = ? AND environment = ? AND connector_id = ? AND part = ? AND content_hash = ?',
+            (service_url, environment, connector_id, part, content_hash))
+        if not rows:
+            return None
+
+        uri = rows[0][0]
+        expiry = _get_expiry(uri)
+        if expiry is None or expiry < time.time() + URI_BUFFER_SECONDS:
+            return None
+
+        return uri
+
+    # pylint: disable=too-many-arguments
+    def set_upload_uri(self, service_url, environment, connector_id, part, content_hash, uri):
+        """
+        Records the blob URI of an uploaded file.
+        """
+        self._execute(
+            'INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (service_url, environment, connector_id, part, content_hash, uri, time.time()))
+
+    def get_download(self, service_url, environment, connector_id, directory):
+        """
+        Returns the change time of the connector, whether the swagger was formatted
+        and the file hashes by file name of its last download to a directory,
+        or None if unknown.
+        """
+        rows = self._execute(
+            'SELECT changed_time, formatted, file_hashes FROM downloads '
+            'WHERE service_url = ? AND environment = ? AND connector_id = ? AND directory = ?',
+            (service_url, environment, connector_id, os.path.realpath(directory)))
+        if not rows:
+            return None
+        (changed_time, formatted, file_hashes) = rows[0]
+        return changed_time, bool(formatted), json.loads(file_hashes)
+
+    # pylint: disable=too-many-arguments
+    def set_download(self, service_url, environment, connector_id, directory, changed_time, formatted, file_hashes):
+        """
+        Records a download of a connector, changed at the given time, to a directory.
+        """
+        self._execute(
+            'INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (service_url, environment, connector_id, os.path.realpath(directory), changed_time, int(formatted),
+             json.dumps(file_hashes), time.time()))
+
+    def get_validation(self, cache_key):
+        """
+        Returns the result of a previous validation, or None if unknown.
+        """
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                rows = connection.execute(
+                    'SELECT result FROM validations WHERE cache_key = ?', (cache_key,)).fetchall()
+                if rows:
+                    # The least recently used results are evicted first
+                    connection.execute(
+                        'UPDATE validations SET used_at = ? WHERE cache_key = ?', (time.time(), cache_key))
+        return rows[0][0] if rows else None
+
+    def set_validation(self, cache_key, result):
+        """
+        Records the result of a validation, evicting the least recently used ones above the limit.
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO validations VALUES (?, ?, ?, ?)', (cache_key, result, now, now))
+                connection.execute(
+                    'DELETE FROM validations WHERE cache_key NOT IN '
+                    '(SELECT cache_key FROM validations ORDER BY used_at DESC LIMIT ?)',
+                    (VALIDATION_LIMIT,))
+
+
+def get_ledger():
+    """
+    Returns the shared ledger.
+    """
+    global _LEDGER  # pylint: disable=global-statement
+    with _LEDGER_LOCK:
+        if _LEDGER is None:
+            _LEDGER = Ledger()
+        return _LEDGER
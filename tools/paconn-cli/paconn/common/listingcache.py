@@ -0,0 +1,97 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Time bound cache of the environment and connector listings.
+"""
+
+import time
+
+from paconn.common.filecache import get_cache
+from paconn.authentication.tokenmanager import _TENANT_ID
+
+LISTING_CACHE_FILE = 'listingCache.json'
+
+# Maximum number of listings kept in the cache
+LISTING_CACHE_SIZE = 100
+
+# Number of seconds a listing is used before it is downloaded again
+LISTING_TTL_SECONDS = 900
+
+# Listing kinds
+ENVIRONMENTS = 'environments'
+CONNECTORS = 'connectors'
+
+_TIMESTAMP = 'timestamp'
+_ITEMS = 'items'
+
+
+def _get_tenant(credentials):
+    return (credentials or {}).get(_TENANT_ID, '')
+
+
+def _get_key(api_manager, listing, environment=None):
+    """
+    Listings are cached per tenant, service and environment.
+    """
+    parts = [_get_tenant(api_manager.credentials), api_manager.netloc, listing]
+    if environment:
+        parts.append(environment)
+    return '|'.join(parts)
+
+
+def _is_fresh(entry, ttl):
+    return entry is not None and entry[_TIMESTAMP] + ttl >= time.time()
+
+
+def get_listing(api_manager, listing, environment=None, ttl=LISTING_TTL_SECONDS):
+    """
+    Returns the cached (display name, name) pairs of a listing,
+    or None when the listing isn't cached or has expired.
+    """
+    cache = get_cache(LISTING_CACHE_FILE, LISTING_CACHE_SIZE)
+    entry = cache.get(_get_key(api_manager, listing, environment))
+    if not _is_fresh(entry, ttl):
+        return None
+    return entry[_ITEMS]
+
+
+def set_listing(api_manager, listing, items, environment=None):
+    """
+    Caches the (display name, name) pairs of a listing.
+    """
+    cache = get_cache(LISTING_CACHE_FILE, LISTING_CACHE_SIZE)
+    cache.set(
+        _get_key(api_manager, listing, environment),
+        {_TIMESTAMP: time.time(), _ITEMS: [list(item) for item in items]})
+
+
+def invalidate_listing(api_manager, listing, environment=None):
+    """
+    Removes a listing, so the next use downloads it again.
+    """
+    cache = get_cache(LISTING_CACHE_FILE, LISTING_CACHE_SIZE)
+    cache.delete(_get_key(api_manager, listing, environment))
+
+
+def get_cached_names(credentials, listing, environment=None, ttl=LISTING_TTL_SECONDS):
+    """
+    Returns the names of all the fresh cached listings of the tenant.
+    Used for shell completion, which shouldn't make any network call.
+    """
+    cache = get_cache(LISTING_CACHE_FILE, LISTING_CACHE_SIZE)
+    tenant = _get_tenant(credentials)
+
+    names = []
+    for key, entry in cache.items():
+        parts = key.split('|')
+        if parts[0] != tenant or parts[2] != listing:
+            continue
+        if environment and parts[3:] != [environment]:
+            continue
+        if _is_fresh(entry, ttl):
+            names.extend(name for (_, name) in entry[_ITEMS])
+
+    return sorted(set(names))
@@ -10,6 +10,8 @@ Prompts the user for missing arguments
 
 from knack.prompting import prompt_choice_list
 
+from paconn.common.listingcache import get_listing, set_listing, ENVIRONMENTS, CONNECTORS
+
 _PROPERTIES = 'properties'
 _VALUE = 'value'
 _DISPLAY_NAME = 'displayName'
@@ -22,12 +24,17 @@ def get_environment(flow_rp):
     """
     Prompt for environment if not provided.
     """
-    environments_val = flow_rp.get_environments()
-    environments_list = environments_val[_VALUE]
-    environments = {
-        env[_PROPERTIES][_DISPLAY_NAME]: env[_NAME]
-        for env in environments_list
-    }
+    environments_items = get_listing(flow_rp.api_manager, ENVIRONMENTS)
+    if environments_items is None:
+        environments_val = flow_rp.get_environments()
+        environments_list = environments_val[_VALUE]
+        environments_items = [
+            (env[_PROPERTIES][_DISPLAY_NAME], env[_NAME])
+            for env in environments_list
+        ]
+        set_listing(flow_rp.api_manager, ENVIRONMENTS, environments_items)
+
+    environments = dict(environments_items)
 
     environment_keys = list(environments.keys())
 
@@ -43,13 +50,19 @@ def get_connector_id(powerapps_rp, environment):
     """
     Select connector id if not provided.
     """
-    connectors_val = powerapps_rp.get_all_connectors(environment)
-    connectors_list = connectors_val[_VALUE]
-    custom_connectors = filter(lambda conn: conn[_PROPERTIES][_IS_CUSTOM_API], connectors_list)
-    connectors = {
-        conn[_PROPERTIES][_DISPLAY_NAME] + ' - ' + conn[_PROPERTIES][_CREATED_BY][_DISPLAY_NAME]: conn[_NAME]
-        for conn in custom_connectors
-    }
+    connectors_items = get_listing(powerapps_rp.api_manager, CONNECTORS, environment)
+    if connectors_items is None:
+        connectors_list = powerapps_rp.iter_connectors(
+            environment=environment,
+            properties=[_DISPLAY_NAME, _CREATED_BY, _IS_CUSTOM_API])
+        custom_connectors = filter(lambda conn: conn[_PROPERTIES].get(_IS_CUSTOM_API), connectors_list)
+        connectors_items = [
+            (conn[_PROPERTIES][_DISPLAY_NAME] + ' - ' + conn[_PROPERTIES][_CREATED_BY][_DISPLAY_NAME], conn[_NAME])
+            for conn in custom_connectors
+        ]
+        set_listing(powerapps_rp.api_manager, CONNECTORS, connectors_items, environment)
+
+    connectors = dict(connectors_items)
 
     connectors_keys = list(connectors.keys())
 
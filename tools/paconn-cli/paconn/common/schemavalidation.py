@@ -0,0 +1,164 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Local JSON schema validation against the bundled schemas.
+"""
+
+import io
+import os
+import re
+import json
+import hashlib
+import py_compile
+import threading
+import importlib.util
+
+from knack.util import CLIError
+from knack.log import get_logger
+
+from paconn.common.util import get_config_dir
+
+LOGGER = get_logger(__name__)
+
+# Bundled schemas
+API_DEFINITION_SCHEMA = 'apiDefinition.swagger.schema.json'
+API_PROPERTIES_SCHEMA = 'paconn-apiProperties.schema.json'
+SETTINGS_SCHEMA = 'paconn-settings.schema.json'
+
+# The swagger schema references the draft-04 meta-schema remotely
+_META_SCHEMA = 'draft-04.schema.json'
+_META_SCHEMA_URI = 'http://json-schema.org/draft-04/schema'
+
+# Compiled validators are cached in this config sub-directory
+_COMPILED_SCHEMAS_DIR = 'schemas'
+
+# Length of the digest suffix of the compiled module names
+_DIGEST_LENGTH = 16
+
+_SCHEMAS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'schemas')
+
+# Matches string literals, to keep them, and comments, to remove them
+_COMMENTS = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+_VALIDATORS = {}
+_VALIDATORS_LOCK = threading.Lock()
+
+
+def _read_schema(schema_name):
+    """
+    Reads a bundled schema. The schemas may contain comments.
+    """
+    with io.open(os.path.join(_SCHEMAS_DIR, schema_name), 'r', encoding='utf-8-sig') as file:
+        content = file.read()
+    return _COMMENTS.sub(lambda match: match.group(1) or '', content)
+
+
+def _resolve_meta_schema(uri):
+    if not uri.startswith(_META_SCHEMA_URI):
+        raise CLIError('Remote schema references are not supported: {}'.format(uri))
+    return json.loads(_read_schema(_META_SCHEMA))
+
+
+def _compile(schema_name, module_file):
+    """
+    Compiles a schema into a Python module.
+    """
+    import fastjsonschema
+    from fastjsonschema.ref_resolver import RefResolver
+
+    schema = json.loads(_read_schema(schema_name))
+    handlers = {'http': _resolve_meta_schema}
+
+    code = fastjsonschema.compile_to_code(schema, handlers=handlers, use_default=False)
+    scope_name = RefResolver.from_schema(schema, handlers=handlers, store={}).get_scope_name()
+
+    os.makedirs(os.path.dirname(module_file), exist_ok=True)
+    temp_file = '{}.{}.tmp'.format(module_file, os.getpid())
+    with open(temp_file, 'w') as file:
+        # The generated code can miss this import for remote references
+        file.write('from decimal import Decimal  # noqa: F401\n')
+        file.write(code)
+        file.write('\n\nvalidate = {}\n'.format(scope_name))
+    os.replace(temp_file, module_file)
+
+
+def _remove_stale_modules(module_prefix, module_file):
+    """
+    Removes the modules compiled for older versions of a schema, and their bytecode.
+    """
+    directory = os.path.dirname(module_file)
+    stale_module = re.compile(r'{}_[0-9a-f]{{{}}}\.py$'.format(re.escape(module_prefix), _DIGEST_LENGTH))
+    for file_name in os.listdir(directory):
+        file_path = os.path.join(directory, file_name)
+        if file_path == module_file or not stale_module.match(file_name):
+            continue
+        LOGGER.debug('Removing stale compiled schema %s', file_path)
+        for stale_file in (file_path, importlib.util.cache_from_source(file_path)):
+            try:
+                os.remove(stale_file)
+            except OSError:
+                # Already removed, or in use by another process
+                pass
+
+
+def _load_validator(schema_name):
+    """
+    Loads the validator for a schema, compiling it when the schema
+    or the compiler changed since the last compilation.
+    """
+    try:
+        import fastjsonschema
+    except ImportError:
+        raise CLIError('Local validation requires the fastjsonschema package: pip install fastjsonschema')
+
+    digest = hashlib.sha256()
+    digest.update(fastjsonschema.VERSION.encode('utf-8'))
+    digest.update(_read_schema(schema_name).encode('utf-8'))
+    digest.update(_read_schema(_META_SCHEMA).encode('utf-8'))
+
+    module_prefix = re.sub(r'\W', '_', os.path.splitext(schema_name)[0])
+    module_name = '{}_{}'.format(module_prefix, digest.hexdigest()[:_DIGEST_LENGTH])
+    module_file = os.path.join(get_config_dir(), _COMPILED_SCHEMAS_DIR, module_name + '.py')
+
+    if not os.path.isfile(module_file):
+        LOGGER.debug('Compiling schema %s to %s', schema_name, module_file)
+        _compile(schema_name, module_file)
+        _remove_stale_modules(module_prefix, module_file)
+
+    # The generated modules are large, cache their bytecode as well
+    if not os.path.isfile(importlib.util.cache_from_source(module_file)):
+        py_compile.compile(module_file, doraise=True)
+
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module.validate
+
+
+def get_validator(schema_name):
+    """
+    Returns the validation function of a bundled schema.
+    """
+    with _VALIDATORS_LOCK:
+        if schema_name not in _VALIDATORS:
+            _VALIDATORS[schema_name] = _load_validator(schema_name)
+        return _VALIDATORS[schema_name]
+
+
+def validate_schema(content, schema_name):
+    """
+    Validates a JSON document against a bundled schema.
+    Returns the error message, or None when the document is valid.
+    """
+    validator = get_validator(schema_name)
+
+    from fastjsonschema import JsonSchemaValueException
+    try:
+        validator(content)
+    except JsonSchemaValueException as exception:
+        return str(exception)
+    return None
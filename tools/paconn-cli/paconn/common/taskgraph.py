@@ -0,0 +1,68 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Runs dependent tasks concurrently.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from paconn.common import cancellation
+
+
+class TaskGraph:
+    """
+    A set of named tasks with dependencies between them.
+    Each task starts as soon as the tasks it depends on completed,
+    and receives the results of the tasks mapped by its inputs as keyword arguments.
+    """
+    def __init__(self):
+        self._tasks = {}
+
+    def add(self, name, function, dependencies=(), inputs=None):
+        """
+        Adds a task, run after its dependencies.
+        The inputs map keyword arguments of the function to the tasks whose result
+        they receive, which are dependencies too.
+        The dependencies must have been added before, which keeps the graph free of cycles.
+        """
+        inputs = dict(inputs or {})
+        if name in self._tasks:
+            raise ValueError('Duplicate task: {}'.format(name))
+        dependencies = list(dict.fromkeys(list(dependencies) + list(inputs.values())))
+        for dependency in dependencies:
+            if dependency not in self._tasks:
+                raise ValueError('Unknown dependency of task {}: {}'.format(name, dependency))
+        self._tasks[name] = (function, dependencies, inputs)
+
+    def run(self):
+        """
+        Runs all the tasks and returns their results by name.
+        When a task fails, or the command is cancelled, no other task is started, the queued
+        ones are cancelled and the exception is raised once the running ones completed.
+        """
+        results = {}
+        pending = dict(self._tasks)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max(len(self._tasks), 1)) as executor:
+            try:
+                while pending or running:
+                    cancellation.check()
+                    for name, (function, dependencies, inputs) in list(pending.items()):
+                        if all(dependency in results for dependency in dependencies):
+                            del pending[name]
+                            kwargs = {argument: results[task] for (argument, task) in inputs.items()}
+                            running[executor.submit(function, **kwargs)] = name
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[running.pop(future)] = future.result()
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+        return results
@@ -0,0 +1,237 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Records the phases of a command and its requests, enabled by --profile.
+The trace is written in the Chrome trace event format, which can be
+opened in chrome://tracing or https://ui.perfetto.dev, and summarized
+as a table.
+"""
+
+import os
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from paconn.common import jsonutil
+
+PHASE = 'phase'
+REQUEST = 'request'
+
+# Path segments followed by an identifier, replaced in the URL templates of the requests
+_ID_SEGMENTS = {
+    'apis': '{connectorId}',
+    'objectIds': '{objectId}',
+    'environments': '{environment}'
+}
+
+_TRACER = None
+
+
+class Tracer:
+    """
+    Collects the spans of all the threads of a command.
+    """
+    def __init__(self, command, file_path=None):
+        self.command = command
+        self.file_path = file_path
+        self.origin = time.perf_counter()
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _get_stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, category, attributes):
+        """
+        Records the duration of the block, nested in the open span of the thread.
+        Yields the attributes of the span, which the block can add to.
+        """
+        stack = self._get_stack()
+        attributes = dict(attributes)
+        if stack:
+            attributes.setdefault('parent', stack[-1])
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as exception:
+            attributes['error'] = type(exception).__name__
+            raise
+        finally:
+            stack.pop()
+            self.add(name, category, start, time.perf_counter(), attributes)
+
+    def add(self, name, category, start, end, attributes):
+        """
+        Adds a span from perf_counter start and end times.
+        """
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((start - self.origin) * 1e6),
+            'dur': round((end - start) * 1e6),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': attributes
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def get_duration(self):
+        """
+        Returns the seconds since tracing started.
+        """
+        return time.perf_counter() - self.origin
+
+
+def start_tracing(command, file_path=None):
+    """
+    Starts recording the spans of a command.
+    The trace is written to the file, if any, by finish_tracing.
+    """
+    global _TRACER  # pylint: disable=global-statement
+    _TRACER = Tracer(command, file_path)
+
+
+def is_tracing():
+    return _TRACER is not None
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Records a phase of the command when tracing.
+    Yields a dictionary of attributes the phase can add to.
+    """
+    tracer = _TRACER
+    if tracer is None:
+        yield {}
+        return
+    with tracer.span(name, PHASE, attributes) as span_attributes:
+        yield span_attributes
+
+
+def traced(name, function, **attributes):
+    """
+    Returns the function recording a phase for each call, for functions run in other threads.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with span(name, **attributes):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def get_url_template(url):
+    """
+    Returns the URL without its query, with the identifiers in its path replaced by placeholders.
+    """
+    (scheme, netloc, path, _, _, _) = urlparse(url)
+    segments = path.split('/')
+    for index in range(1, len(segments)):
+        placeholder = _ID_SEGMENTS.get(segments[index - 1])
+        if placeholder and segments[index]:
+            segments[index] = placeholder
+    return '{}://{}{}'.format(scheme, netloc, '/'.join(segments))
+
+
+# pylint: disable=too-many-arguments
+def record_request(verb, url, start, response=None, stream=False, attempt=0):
+    """
+    Records a request sent at the perf_counter start time, when tracing.
+    The response is None when the request failed on a connection error.
+    For a streamed response, the duration ends when the headers are received.
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return
+    end = time.perf_counter()
+
+    attributes = {
+        'method': verb,
+        'url': get_url_template(url),
+        'status': None,
+        'sent': 0,
+        'received': None,
+        'attempt': attempt
+    }
+    if response is not None:
+        body = response.request.body if response.request is not None else None
+        attributes['status'] = response.status_code
+        attributes['sent'] = len(body or b'')
+        content_length = response.headers.get('Content-Length')
+        if content_length is not None:
+            attributes['received'] = int(content_length)
+        elif not stream:
+            attributes['received'] = len(response.content)
+
+    tracer.add('{} {}'.format(verb, urlparse(attributes['url']).path), REQUEST, start, end, attributes)
+
+
+def _format_summary(tracer):
+    """
+    Returns a table of the phases and the requests of the trace.
+    """
+    phases = {}
+    requests = {}
+    for event in tracer.events:
+        duration = event['dur'] / 1000
+        if event['cat'] == REQUEST:
+            args = event['args']
+            entry = requests.setdefault(event['name'], [0, 0, 0, 0, set()])
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] += args['sent']
+            entry[3] += args['received'] or 0
+            entry[4].add(str(args['status'] or 'error'))
+        else:
+            entry = phases.setdefault(event['name'], [0, 0, 0])
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+
+    lines = ['Profile of {}: {:.0f} ms'.format(tracer.command, tracer.get_duration() * 1000), '']
+    lines.append('{:<40} {:>6} {:>11} {:>10}'.format('phase', 'count', 'total (ms)', 'max (ms)'))
+    for (name, (count, total, maximum)) in sorted(phases.items(), key=lambda item: -item[1][1]):
+        lines.append('{:<40} {:>6} {:>11.1f} {:>10.1f}'.format(name[:40], count, total, maximum))
+
+    lines.append('')
+    lines.append('{:<72} {:>6} {:>11} {:>10} {:>10} {:>10}  {}'.format(
+        'request', 'count', 'total (ms)', 'avg (ms)', 'sent (KB)', 'recv (KB)', 'status'))
+    for (name, (count, total, sent, received, statuses)) in sorted(requests.items(), key=lambda item: -item[1][1]):
+        lines.append('{:<72} {:>6} {:>11.1f} {:>10.1f} {:>10.1f} {:>10.1f}  {}'.format(
+            name[:72], count, total, total / count, sent / 1024, received / 1024, ','.join(sorted(statuses))))
+
+    return '\n'.join(lines)
+
+
+def finish_tracing():
+    """
+    Stops tracing, writes the trace file if any and returns the summary table,
+    or None when not tracing.
+    """
+    global _TRACER  # pylint: disable=global-statement
+    tracer = _TRACER
+    if tracer is None:
+        return None
+    _TRACER = None
+
+    if tracer.file_path:
+        with open(tracer.file_path, 'w') as file:
+            file.write(jsonutil.dumps({
+                'traceEvents': sorted(tracer.events, key=lambda event: event['ts']),
+                'displayTimeUnit': 'ms',
+                'otherData': {'command': tracer.command}
+            }))
+
+    return _format_summary(tracer)
@@ -8,11 +8,13 @@ Utility methods.
 """
 import sys
 import os
-import json
+import hashlib
 
 from knack.util import CLIError
 from knack.prompting import prompt_y_n
 
+from paconn.common import jsonutil
+
 
 def get_config_dir():
     """
@@ -33,14 +35,48 @@ def format_json(content, sort_keys=False):
     """
     Format a given dictionary to a json formatted string.
     """
-    json_string = json.dumps(
+    json_string = jsonutil.dumps(
         content,
         sort_keys=sort_keys,
-        indent=2,
-        separators=(',', ': '))
+        indent=2)
     return json_string
 
 
+def write_json(content, file, sort_keys=False):
+    """
+    Writes a given dictionary to a file object, formatted as format_json does,
+    without building the whole string in memory.
+    """
+    jsonutil.dump(
+        content,
+        file,
+        sort_keys=sort_keys,
+        indent=2)
+
+
+def hash_file(file_path, chunk_size=65536):
+    """
+    Returns the SHA-256 hex digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_json(content):
+    """
+    Returns the SHA-256 hex digest of a canonical serialization of a JSON object,
+    independent of key order and formatting.
+    """
+    canonical = jsonutil.dumps(
+        content,
+        sort_keys=True,
+        ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
 def ensure_file_exists(file, file_type):
     """
     Check if the given file exists.
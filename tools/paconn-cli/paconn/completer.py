@@ -22,3 +22,35 @@ class Completer:
         prefix = kwargs['prefix']
         cmd = namespace._cmd  # pylint: disable=protected-access
         return self.func(cmd, prefix, namespace)
+
+
+def _get_cached_names(listing, environment=None):
+    # Completion only reads the caches, it never calls the services
+    from paconn.authentication.tokenmanager import TokenManager
+    from paconn.common.listingcache import get_cached_names
+
+    return get_cached_names(
+        credentials=TokenManager().read(),
+        listing=listing,
+        environment=environment)
+
+
+@Completer
+def get_environment_completion_list(cmd, prefix, namespace):  # pylint: disable=unused-argument
+    """
+    Completes the environment IDs of the cached environment listings.
+    """
+    from paconn.common.listingcache import ENVIRONMENTS
+
+    return [name for name in _get_cached_names(ENVIRONMENTS) if name.startswith(prefix)]
+
+
+@Completer
+def get_connector_id_completion_list(cmd, prefix, namespace):  # pylint: disable=unused-argument
+    """
+    Completes the connector IDs of the cached connector listings.
+    """
+    from paconn.common.listingcache import CONNECTORS
+
+    environment = getattr(namespace, 'environment', None)
+    return [name for name in _get_cached_names(CONNECTORS, environment) if name.startswith(prefix)]
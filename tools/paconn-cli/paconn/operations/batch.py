@@ -0,0 +1,160 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""
+Method for the batch create/update operation
+"""
+
+import os
+import glob
+
+from knack.util import CLIError
+
+from paconn.common import cancellation
+from paconn.operations.upsert import upsert, upsert_concurrently, ensure_upserts_succeeded
+from paconn.operations.scan import get_connector_files, is_connector_changed
+from paconn.settings.settingsserializer import SettingsSerializer
+from paconn.settings.util import SETTINGS_FILE
+
+# Number of connectors processed at the same time
+DEFAULT_WORKERS = 4
+
+
+def _expand(pattern, base_dir):
+    """
+    Expands a settings file, a directory or a glob into settings files.
+    """
+    pattern = os.path.join(base_dir, os.path.expanduser(pattern))
+
+    if glob.has_magic(pattern):
+        files = glob.glob(pattern, recursive=True)
+    elif os.path.isdir(pattern):
+        files = glob.glob(os.path.join(pattern, '**', SETTINGS_FILE), recursive=True)
+    else:
+        files = [pattern]
+
+    return [os.path.normpath(file) for file in files if os.path.isfile(file)]
+
+
+def get_settings_files(batch):
+    """
+    Returns the settings files for a batch argument.
+    The argument is either a glob, a directory or a manifest file
+    listing one settings file, directory or glob per line.
+    """
+    if glob.has_magic(batch) or os.path.isdir(batch) or os.path.basename(batch) == SETTINGS_FILE:
+        settings_files = _expand(batch, os.getcwd())
+    elif os.path.isfile(batch):
+        base_dir = os.path.dirname(os.path.abspath(batch))
+        settings_files = []
+        with open(batch, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    settings_files.extend(_expand(line, base_dir))
+    else:
+        raise CLIError('Batch manifest or pattern not found: {}'.format(batch))
+
+    # Remove duplicates while keeping the order
+    settings_files = list(dict.fromkeys(settings_files))
+
+    if not settings_files:
+        raise CLIError('No settings files found for {}.'.format(batch))
+
+    return settings_files
+
+
+def filter_changed(settings_files, changed_files):
+    """
+    Returns the settings files of which the connector has a changed file.
+    """
+    changed_files = set(os.path.realpath(file_path) for file_path in changed_files)
+    return [
+        settings_file
+        for settings_file in settings_files
+        if is_connector_changed(os.path.dirname(os.path.abspath(settings_file)), changed_files, settings_file)
+    ]
+
+
+def _load_settings(settings_file, is_update):
+    """
+    Loads a settings file with the connector files relative to its directory.
+    """
+    settings = SettingsSerializer.from_json(settings_file)
+
+    base_dir = os.path.dirname(os.path.abspath(settings_file))
+    (settings.api_definition, settings.api_properties, settings.icon, settings.script) = get_connector_files(
+        base_dir,
+        settings_file)
+
+    # Nothing can be prompted for in a batch
+    if not settings.environment:
+        raise CLIError('The environment is missing.')
+    if is_update and not settings.connector_id:
+        raise CLIError('The connector ID is missing.')
+
+    return settings
+
+
+def _save_connector_id(settings_file, connector_id):
+    """
+    Writes the ID of a created connector back into its settings file.
+    """
+    settings = SettingsSerializer.from_json(settings_file)
+    settings.connector_id = connector_id
+    SettingsSerializer.to_json(settings, settings_file)
+
+
+# pylint: disable=too-many-arguments
+def _upsert_one(powerapps_rp, settings_file, is_update, overwrite_settings, force):
+    """
+    Creates or updates the connector of a single settings file.
+    Returns None when the update was skipped.
+    """
+    cancellation.check()
+    settings = _load_settings(settings_file, is_update)
+
+    connector_id = upsert(
+        powerapps_rp=powerapps_rp,
+        settings=settings,
+        client_secret=None,
+        is_update=is_update,
+        overwrite_settings=overwrite_settings,
+        save_settings=False,
+        force=force)
+
+    if not is_update and overwrite_settings:
+        _save_connector_id(settings_file, connector_id)
+
+    return connector_id
+
+
+# pylint: disable=too-many-arguments
+def upsert_batch(powerapps_rp, settings_files, is_update, overwrite_settings, max_workers, force=False):
+    """
+    Creates or updates the connectors of the given settings files concurrently.
+    No client secret is set, the connectors of a batch use different OAuth apps.
+    Returns a list of (settings file, connector id, error) tuples,
+    with neither a connector id nor an error for a skipped update.
+    """
+    arguments = [
+        (settings_file, {
+            'powerapps_rp': powerapps_rp,
+            'settings_file': settings_file,
+            'is_update': is_update,
+            'overwrite_settings': overwrite_settings,
+            'force': force
+        })
+        for settings_file in settings_files
+    ]
+    return upsert_concurrently(_upsert_one, arguments, is_update, max_workers or DEFAULT_WORKERS)
+
+
+def ensure_batch_succeeded(results, is_update):
+    """
+    Displays a summary of the batch results and fails when any connector failed.
+    """
+    ensure_upserts_succeeded(results, is_update, 'connector(s)', 'Failed connector settings')
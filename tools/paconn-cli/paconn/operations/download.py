@@ -8,14 +8,19 @@ Save operation.
 """
 
 import os
-import json
-import requests
+import copy
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from knack.util import CLIError
 from knack.prompting import prompt_y_n
 
-from paconn.common.util import format_json
+from paconn.common import tracing, cancellation
+from paconn.common.util import display, format_json, write_json, hash_file
+from paconn.common.concurrency import run_concurrently
+from paconn.common.ledger import get_ledger
+from paconn.common import jsonutil
 from paconn.settings.util import write_settings, SETTINGS_FILE
+from paconn.settings.settingsserializer import SettingsSerializer
 
 from paconn.operations.json_keys import (
     _PROPERTIES,
@@ -30,9 +35,18 @@ from paconn.operations.json_keys import (
     _CAPABILITIES,
     _POLICY_TEMPLATE_INSTANCES,
     _PUBLISHER,
-    _STACKOWNER
+    _STACKOWNER,
+    _NAME,
+    _IS_CUSTOM_API,
+    _CHANGED_TIME
 )
 
+# Size of the chunks written while downloading a file
+DOWNLOAD_CHUNK_SIZE = 65536
+
+# Number of connectors downloaded at the same time by a bulk download
+DEFAULT_WORKERS = 4
+
 
 def _prepare_directory(destination, connector_id):
     """
@@ -76,28 +90,92 @@ def _ensure_overwrite(settings):
     return overwrite
 
 
-def download(powerapps_rp, settings, destination, overwrite):
+def _write_stream(session, url, file_path, file_name=None):
     """
-    Download operation.
+    Downloads a file in chunks, without holding it in memory.
+    The file name names the artifact in the errors, by default the one of the file path.
     """
-    # Prepare folders
-    directory = _prepare_directory(
-        destination=destination,
-        connector_id=settings.connector_id)
+    from requests.exceptions import RequestException
+
+    try:
+        with session.get(url, allow_redirects=True, stream=True) as response:
+            response.raise_for_status()
+            with open(file_path, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+    except RequestException as exception:
+        # The URL isn't shown, its shared access signature is a secret
+        file_name = file_name or os.path.basename(file_path)
+        if exception.response is not None:
+            raise CLIError('Couldn\'t download {}: HTTP {} {}.'.format(
+                file_name,
+                exception.response.status_code,
+                exception.response.reason))
+        raise CLIError('Couldn\'t download {}: {}.'.format(file_name, type(exception).__name__))
+
+
+def _write_swagger(session, url, file_path):
+    """
+    Downloads a swagger and writes it formatted.
+    The download is streamed to a temporary file first,
+    so only the parsed swagger is held in memory.
+    """
+    temp_file = file_path + '.download'
+    try:
+        _write_stream(session, url, temp_file, os.path.basename(file_path))
 
-    # Check if files could be overwritten
-    if not overwrite:
-        overwrite = _ensure_overwrite(settings)
+        with open(temp_file, 'rb') as file:
+            swagger = jsonutil.load(file)
 
-    api_registration = powerapps_rp.get_connector(
-        environment=settings.environment,
-        connector_id=settings.connector_id)
+        with open(file_path, 'w') as file:
+            write_json(
+                content=swagger,
+                file=file,
+                sort_keys=False)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+# pylint: disable=too-many-arguments
+def _is_downloaded(ledger, service_url, settings, directory, changed_time, format_swagger, file_names):
+    """
+    Returns true if the connector was downloaded to the directory since it last changed,
+    and the downloaded files weren't modified since.
+    """
+    download = ledger.get_download(service_url, settings.environment, settings.connector_id, directory)
+    if not download:
+        return False
+
+    (downloaded_changed_time, formatted, file_hashes) = download
+    if downloaded_changed_time != changed_time or formatted != format_swagger or set(file_hashes) != set(file_names):
+        return False
+
+    return all(
+        os.path.isfile(os.path.join(directory, file_name))
+        and hash_file(os.path.join(directory, file_name)) == file_hash
+        for (file_name, file_hash) in file_hashes.items())
+
+
+def _download_connector(powerapps_rp, settings, directory, format_swagger):
+    """
+    Downloads the files of a connector into a directory.
+    The settings file names are relative to the directory.
+    Returns false when the files were already downloaded since the connector last changed.
+    """
+    with tracing.span('get connector', connector_id=settings.connector_id):
+        api_registration = powerapps_rp.get_connector(
+            environment=settings.environment,
+            connector_id=settings.connector_id)
 
     if _PROPERTIES not in api_registration:
         raise CLIError('Properties not present in the api registration information.')
 
     api_properties = api_registration[_PROPERTIES]
 
+    # Reuse the pooled connections of the RP for the artifact downloads
+    session = powerapps_rp.api_manager.session
+
     # Property whitelist
     property_keys_whitelist = [
         _CONNECTION_PARAMETERS,
@@ -122,55 +200,178 @@ def download(powerapps_rp, settings, destination, overwrite):
         for prop in properties_present
     }
 
+    # Collect the artifacts to download,
+    # the swagger from the swagger URL when available.
+    downloads = []
+    if _API_DEFINITIONS in api_properties and _ORIGINAL_SWAGGER_URL in api_properties[_API_DEFINITIONS]:
+        original_swagger_url = api_properties[_API_DEFINITIONS][_ORIGINAL_SWAGGER_URL]
+        swagger_writer = _write_swagger if format_swagger else _write_stream
+        downloads.append((swagger_writer, original_swagger_url, settings.api_definition))
+
+    if api_properties.get(_ICON_URI):
+        downloads.append((_write_stream, api_properties[_ICON_URI], settings.icon))
+
+    if api_properties.get(_SCRIPT_URI):
+        downloads.append((_write_stream, api_properties[_SCRIPT_URI], settings.script))
+    else:
+        settings.script = None
+
+    # The files of an unchanged connector are the same as in its last download
+    ledger = get_ledger()
+    service_url = powerapps_rp.api_manager.get_service_url()
+    changed_time = api_properties.get(_CHANGED_TIME)
+    file_names = [settings.api_properties] + [file_name for (_, _, file_name) in downloads]
+    if changed_time and _is_downloaded(
+            ledger, service_url, settings, directory, changed_time, format_swagger, file_names):
+        return False
+
     # Write the api properties
     api_prop = format_json(
         content=api_properties_selected,
         sort_keys=False)
 
     open(
-        file=settings.api_properties,
+        file=os.path.join(directory, settings.api_properties),
         mode='w'
         ).write(api_prop)
 
-    # Write the open api definition,
-    # either from swagger URL when available or from swagger property.
-    if _API_DEFINITIONS in api_properties and _ORIGINAL_SWAGGER_URL in api_properties[_API_DEFINITIONS]:
-        original_swagger_url = api_properties[_API_DEFINITIONS][_ORIGINAL_SWAGGER_URL]
-        response = requests.get(original_swagger_url, allow_redirects=True)
-        response_string = response.content.decode('utf-8-sig')
-
-        swagger = format_json(
-            content=json.loads(response_string),
-            sort_keys=False)
-
-        open(
-            file=settings.api_definition,
-            mode='w'
-            ).write(swagger)
-
-    # Write the icon
-    if _ICON_URI in api_properties:
-        icon_url = api_properties[_ICON_URI]
-        response = requests.get(icon_url, allow_redirects=True)
-
-        open(
-            file=settings.icon,
-            mode='wb'
-            ).write(response.content)
-
-    # Write the script
-    if _SCRIPT_URI in api_properties:
-        script_url = api_properties[_SCRIPT_URI]
-        response = requests.get(script_url, allow_redirects=True)
-
-        open(
-            file=settings.script,
-            mode='wb'
-            ).write(response.content)
-    else:
-        settings.script = None
+    # The artifacts are independent once the registration is known,
+    # fetch them concurrently and write each one as it completes.
+    if downloads:
+        with ThreadPoolExecutor(max_workers=len(downloads)) as executor:
+            futures = [
+                executor.submit(
+                    tracing.traced('download file', writer, file=file_name),
+                    session,
+                    url,
+                    os.path.join(directory, file_name))
+                for (writer, url, file_name) in downloads
+            ]
+            for future in as_completed(futures):
+                future.result()
+
+    if changed_time:
+        ledger.set_download(
+            service_url=service_url,
+            environment=settings.environment,
+            connector_id=settings.connector_id,
+            directory=directory,
+            changed_time=changed_time,
+            formatted=format_swagger,
+            file_hashes={
+                file_name: hash_file(os.path.join(directory, file_name))
+                for file_name in file_names
+            })
+
+    return True
+
+
+def download(powerapps_rp, settings, destination, overwrite, format_swagger=True):
+    """
+    Download operation.
+    """
+    # Prepare folders
+    directory = _prepare_directory(
+        destination=destination,
+        connector_id=settings.connector_id)
+
+    # Check if files could be overwritten
+    if not overwrite:
+        overwrite = _ensure_overwrite(settings)
+
+    with tracing.span('download connector', connector_id=settings.connector_id):
+        _download_connector(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            directory=directory,
+            format_swagger=format_swagger)
 
     # Save the settings
     write_settings(settings, overwrite)
 
     return directory
+
+
+def _download_one(powerapps_rp, settings, directory, overwrite, format_swagger):
+    """
+    Downloads a connector of a bulk download into its directory,
+    unless a previous run already completed it,
+    or downloaded it since it last changed.
+    Returns true if the connector was downloaded.
+    """
+    cancellation.check()
+    settings_file = os.path.join(directory, SETTINGS_FILE)
+
+    # The settings file is written last, so it marks a completed download
+    if not overwrite and os.path.exists(settings_file):
+        return False
+
+    os.makedirs(directory, exist_ok=True)
+
+    with tracing.span('download connector', connector_id=settings.connector_id):
+        downloaded = _download_connector(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            directory=directory,
+            format_swagger=format_swagger)
+
+        SettingsSerializer.to_json(settings, settings_file)
+
+    return downloaded
+
+
+def _ensure_relative_files(settings):
+    """
+    Ensure the file names are inside the connector directory, where each connector of a bulk download writes.
+    """
+    for file_name in (settings.api_properties, settings.api_definition, settings.icon, settings.script):
+        if file_name and (os.path.isabs(file_name) or os.path.normpath(file_name).split(os.sep)[0] == os.pardir):
+            error = 'The file {} is outside of the connector directory, use a relative file name to download all.'
+            raise CLIError(error.format(file_name))
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def download_all(powerapps_rp, settings, destination, overwrite, max_workers, format_swagger=True):
+    """
+    Downloads all the custom connectors of an environment concurrently,
+    each into a sub-directory named after the connector ID.
+    Connectors downloaded by a previous run are skipped unless overwrite is set.
+    Returns the destination directory and a list of (connector id, downloaded, error) tuples.
+    """
+    _ensure_relative_files(settings)
+
+    directory = os.path.abspath(destination or os.getcwd())
+
+    with tracing.span('list connectors') as span_attributes:
+        connectors = powerapps_rp.iter_connectors(
+            environment=settings.environment,
+            properties=[_IS_CUSTOM_API])
+        connector_ids = [
+            connector[_NAME]
+            for connector in connectors
+            if connector[_PROPERTIES].get(_IS_CUSTOM_API)
+        ]
+        span_attributes['connectors'] = len(connector_ids)
+
+    arguments = []
+    for connector_id in connector_ids:
+        connector_settings = copy.copy(settings)
+        connector_settings.connector_id = connector_id
+        arguments.append((connector_id, {
+            'powerapps_rp': powerapps_rp,
+            'settings': connector_settings,
+            'directory': os.path.join(directory, connector_id),
+            'overwrite': overwrite,
+            'format_swagger': format_swagger
+        }))
+
+    results = []
+    for (connector_id, downloaded, error) in run_concurrently(
+            _download_one, arguments, max_workers or DEFAULT_WORKERS):
+        if error:
+            display('{}: failed. {}'.format(connector_id, error))
+        else:
+            display('{}: {}.'.format(connector_id, 'downloaded' if downloaded else 'skipped, already downloaded'))
+        results.append((connector_id, bool(downloaded), error))
+
+    return directory, results
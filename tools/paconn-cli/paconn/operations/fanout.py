@@ -0,0 +1,195 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""
+Method for the create/update operation of a connector in several environments
+"""
+
+import copy
+import threading
+
+from knack.util import CLIError
+
+from paconn.common import tracing, cancellation
+from paconn.operations.upsert import (
+    load_connector,
+    deploy,
+    get_validation,
+    upsert_concurrently,
+    ensure_upserts_succeeded
+)
+
+# Number of environments deployed to at the same time
+DEFAULT_WORKERS = 4
+
+
+def _read_environment_file(env_file):
+    """
+    Returns the (environment, connector id) pairs of an environment file,
+    listing one environment per line optionally followed by its connector ID.
+    """
+    try:
+        with open(env_file, 'r') as file:
+            lines = file.readlines()
+    except OSError:
+        raise CLIError('Environment file not found: {}'.format(env_file))
+
+    environments = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            fields = line.split()
+            if len(fields) > 2:
+                raise CLIError('Invalid line in {}: {}'.format(env_file, line))
+            environments.append((fields[0], fields[1] if len(fields) > 1 else None))
+    return environments
+
+
+def is_fanout(environment, env_file):
+    """
+    Returns true if the arguments target several environments.
+    """
+    return bool(env_file) or ',' in (environment or '')
+
+
+def get_environments(environment, env_file, connector_id, is_update):
+    """
+    Returns the (environment, connector id) pairs targeted by a comma-separated
+    environment argument and an environment file.
+    The connector ID argument applies to the environments without one.
+    """
+    environments = []
+    if env_file:
+        environments.extend(_read_environment_file(env_file))
+    if environment:
+        environments.extend((name.strip(), None) for name in environment.split(',') if name.strip())
+
+    # Remove duplicates while keeping the order, the connector IDs of the file first
+    targets = {}
+    for (name, target_id) in environments:
+        if not targets.get(name):
+            targets[name] = target_id or connector_id
+
+    if not targets:
+        raise CLIError('No environments found.')
+
+    if is_update:
+        missing = [name for (name, target_id) in targets.items() if not target_id]
+        if missing:
+            raise CLIError('The connector ID is missing for the environments: {}'.format(', '.join(missing)))
+
+    return list(targets.items())
+
+
+def _run_once(function):
+    """
+    Returns a function calling the given one only the first time,
+    all the calls returning its result or raising its exception.
+    """
+    lock = threading.Lock()
+    outcome = []
+
+    def wrapper():
+        with lock:
+            if not outcome:
+                try:
+                    outcome.append((function(), None))
+                except Exception as exception:  # pylint: disable=broad-except
+                    outcome.append((None, exception))
+        (result, exception) = outcome[0]
+        if exception:
+            raise exception
+        return result
+
+    return wrapper
+
+
+# pylint: disable=too-many-arguments
+def _deploy_one(powerapps_rp, settings, connector, client_secret, is_update, validation, force):
+    cancellation.check()
+    with tracing.span('upsert', environment=settings.environment) as span_attributes:
+        connector_id = deploy(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            connector=connector,
+            client_secret=client_secret,
+            is_update=is_update,
+            validation=validation,
+            force=force)
+        span_attributes['connector_id'] = connector_id
+        return connector_id
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def upsert_environments(powerapps_rp, settings, environments, client_secret, is_update, max_workers, force=False):
+    """
+    Creates or updates the connector of the settings in the given
+    (environment, connector id) pairs concurrently.
+    The connector files are loaded and validated once for all the environments,
+    and each environment gets its own resource storage for the uploads.
+    Returns a list of (environment, connector id, error) tuples,
+    with neither a connector id nor an error for a skipped update.
+    """
+    connector = load_connector(
+        settings=settings,
+        client_secret=client_secret,
+        is_update=is_update)
+
+    # The environments that need a validation share the first one
+    validation = _run_once(get_validation(powerapps_rp, connector))
+
+    arguments = []
+    for (environment, connector_id) in environments:
+        environment_settings = copy.copy(settings)
+        environment_settings.environment = environment
+        environment_settings.connector_id = connector_id
+        arguments.append((environment, {
+            'powerapps_rp': powerapps_rp,
+            'settings': environment_settings,
+            'connector': connector,
+            'client_secret': client_secret,
+            'is_update': is_update,
+            'validation': validation,
+            'force': force
+        }))
+
+    return upsert_concurrently(_deploy_one, arguments, is_update, max_workers or DEFAULT_WORKERS)
+
+
+def save_connector_ids(env_file, results):
+    """
+    Writes the IDs of the created connectors into the environment file,
+    keeping its comments and the order of its lines.
+    """
+    connector_ids = {environment: connector_id for (environment, connector_id, _) in results if connector_id}
+
+    with open(env_file, 'r') as file:
+        lines = file.readlines()
+
+    written = set()
+    for index, line in enumerate(lines):
+        fields = line.split()
+        if fields and not fields[0].startswith('#') and fields[0] in connector_ids:
+            lines[index] = '{} {}\n'.format(fields[0], connector_ids[fields[0]])
+            written.add(fields[0])
+
+    # The environments of the argument are appended
+    if lines and not lines[-1].endswith('\n'):
+        lines[-1] += '\n'
+    lines.extend(
+        '{} {}\n'.format(environment, connector_id)
+        for (environment, connector_id) in connector_ids.items()
+        if environment not in written)
+
+    with open(env_file, 'w') as file:
+        file.writelines(lines)
+
+
+def ensure_environments_succeeded(results, is_update):
+    """
+    Displays a summary of the results by environment and fails when any environment failed.
+    """
+    ensure_upserts_succeeded(results, is_update, 'environment(s)', 'Failed environments')
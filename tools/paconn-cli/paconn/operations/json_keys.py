@@ -16,6 +16,10 @@ _CONNECTION_PARAMETERS = 'connectionParameters'
 _CONNECTION_PARAMETER_SET = 'connectionParameterSets'
 _PARAMETERS = 'parameters'
 _VALUES = 'values'
+_NAME = 'name'
+_VALUE = 'value'
+_IS_CUSTOM_API = 'isCustomApi'
+_CHANGED_TIME = 'changedTime'
 
 # Save
 _API_DEFINITIONS = 'apiDefinitions'
@@ -42,5 +46,8 @@ _TOKEN = 'token'
 _OAUTH_SETTINGS = 'oAuthSettings'
 _CLIENT_SECRET = 'clientSecret'
 _DISPLAY_NAME = 'displayName'
-_NAME = 'name'
 _STACKOWNER = 'stackOwner'
+
+# Scan
+_PATHS = 'paths'
+_OPERATION_ID = 'operationId'
@@ -0,0 +1,232 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""
+Method for the scan operation
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from paconn.common.jsonutil import load_file
+from paconn.common.schemavalidation import (
+    get_validator,
+    validate_schema,
+    API_DEFINITION_SCHEMA,
+    API_PROPERTIES_SCHEMA,
+    SETTINGS_SCHEMA
+)
+from paconn.settings.util import SETTINGS_FILE
+from paconn.settings.settingsserializer import SettingsSerializer
+from paconn.operations.json_keys import (
+    _PROPERTIES,
+    _SCRIPT_OPERATIONS,
+    _PATHS,
+    _OPERATION_ID
+)
+
+API_DEFINITION_FILE = 'apiDefinition.swagger.json'
+API_PROPERTIES_FILE = 'apiProperties.json'
+ICON_FILE = 'icon.png'
+SCRIPT_FILE = 'script.csx'
+
+# Files of which one makes a directory a connector directory
+_CONNECTOR_MARKERS = (SETTINGS_FILE, API_DEFINITION_FILE, API_PROPERTIES_FILE)
+
+# Largest script accepted by the service
+MAX_SCRIPT_SIZE = 1024 * 1024
+
+
+def find_connectors(root):
+    """
+    Yields the directories under the root holding a settings, API definition or API properties file.
+    Hidden directories are skipped.
+    """
+    for (directory, sub_directories, files) in os.walk(root):
+        sub_directories[:] = sorted(name for name in sub_directories if not name.startswith('.'))
+        if any(file_name in files for file_name in _CONNECTOR_MARKERS):
+            yield directory
+
+
+def get_connector_files(directory, settings_file=None):
+    """
+    Returns the API definition, API properties, icon and script files of a connector directory,
+    named as in its settings file when it has one, and by the default names otherwise.
+    The icon and script are None when the settings file doesn't name them.
+    """
+    default_settings_file = os.path.join(directory, SETTINGS_FILE)
+    if not settings_file and os.path.isfile(default_settings_file):
+        settings_file = default_settings_file
+
+    if settings_file:
+        settings = SettingsSerializer.from_json(settings_file)
+        file_names = (
+            settings.api_definition or API_DEFINITION_FILE,
+            settings.api_properties or API_PROPERTIES_FILE,
+            settings.icon,
+            settings.script
+        )
+    else:
+        file_names = (API_DEFINITION_FILE, API_PROPERTIES_FILE, ICON_FILE, SCRIPT_FILE)
+
+    return tuple(os.path.join(directory, file_name) if file_name else None for file_name in file_names)
+
+
+def is_connector_changed(directory, changed_files, settings_file=None):
+    """
+    Returns true if the settings file or a file of the connector of a directory
+    is in the changed files, a set of real paths.
+    """
+    connector_files = [settings_file or os.path.join(directory, SETTINGS_FILE)]
+    connector_files.extend(file_path for file_path in get_connector_files(directory, settings_file) if file_path)
+    return any(os.path.realpath(file_path) in changed_files for file_path in connector_files)
+
+
+def _is_connector_directory(directory):
+    return any(os.path.isfile(os.path.join(directory, file_name)) for file_name in _CONNECTOR_MARKERS)
+
+
+def find_changed_connectors(root, changed_files):
+    """
+    Returns the connector directories under the root with a changed file,
+    that still hold an API definition.
+    The connector files are those named by the settings file of a directory, like for a batch update,
+    so the directories holding a changed file and their parents up to the root are checked.
+    """
+    root = os.path.realpath(root)
+    changed_files = set(os.path.realpath(file_path) for file_path in changed_files)
+
+    candidates = set()
+    for file_path in changed_files:
+        directory = os.path.dirname(file_path)
+        while os.path.commonpath([root, directory]) == root and directory not in candidates:
+            candidates.add(directory)
+            if directory == root:
+                break
+            directory = os.path.dirname(directory)
+
+    return sorted(
+        directory
+        for directory in candidates
+        if _is_connector_directory(directory)
+        and is_connector_changed(directory, changed_files)
+        and os.path.isfile(get_connector_files(directory)[0]))
+
+
+def _get_operation_ids(openapi_definition):
+    return set(
+        operation.get(_OPERATION_ID)
+        for path in (openapi_definition.get(_PATHS) or {}).values() if isinstance(path, dict)
+        for operation in path.values() if isinstance(operation, dict)
+    )
+
+
+def _check_json(file_path, schema_name):
+    """
+    Returns the content of a JSON file and the errors of its parsing and schema validation.
+    """
+    try:
+        content = load_file(file_path)
+    except (ValueError, UnicodeDecodeError) as exception:
+        return None, ['{}: {}'.format(os.path.basename(file_path), exception)]
+
+    error = validate_schema(content, schema_name)
+    return content, ['{}: {}'.format(os.path.basename(file_path), error)] if error else []
+
+
+def _check_script(file_path):
+    file_name = os.path.basename(file_path)
+    size = os.path.getsize(file_path)
+    if size > MAX_SCRIPT_SIZE:
+        return ['{}: {} bytes, larger than the {} bytes limit.'.format(file_name, size, MAX_SCRIPT_SIZE)]
+    try:
+        with open(file_path, 'rb') as file:
+            file.read().decode('utf-8-sig')
+    except UnicodeDecodeError as exception:
+        return ['{}: not UTF-8 encoded, {}'.format(file_name, exception)]
+    return []
+
+
+def _get_scanned_files(directory):
+    """
+    Returns the errors of the settings file of a connector directory, and the connector files
+    named as in the settings file, or by the default names when the settings file can't be read.
+    """
+    settings_file = os.path.join(directory, SETTINGS_FILE)
+    if not os.path.isfile(settings_file):
+        return [], get_connector_files(directory)
+
+    (_, errors) = _check_json(settings_file, SETTINGS_SCHEMA)
+    try:
+        return errors, get_connector_files(directory, settings_file)
+    except (ValueError, TypeError, AttributeError, UnicodeDecodeError):
+        # The errors of the settings file are reported already
+        file_names = (API_DEFINITION_FILE, API_PROPERTIES_FILE, ICON_FILE, SCRIPT_FILE)
+        return errors, tuple(os.path.join(directory, file_name) for file_name in file_names)
+
+
+def scan_connector(directory):
+    """
+    Checks the files of a connector directory locally.
+    Returns the list of errors, empty when the connector is valid.
+    """
+    openapi_definition = None
+    properties = None
+
+    (errors, (api_definition, api_properties, _, script)) = _get_scanned_files(directory)
+
+    if os.path.isfile(api_definition):
+        openapi_definition, file_errors = _check_json(api_definition, API_DEFINITION_SCHEMA)
+        errors.extend(file_errors)
+    else:
+        errors.append('{} is missing.'.format(os.path.relpath(api_definition, directory)))
+
+    if os.path.isfile(api_properties):
+        properties, file_errors = _check_json(api_properties, API_PROPERTIES_SCHEMA)
+        errors.extend(file_errors)
+    else:
+        errors.append('{} is missing.'.format(os.path.relpath(api_properties, directory)))
+
+    if script and os.path.isfile(script):
+        errors.extend(_check_script(script))
+
+    # The script operations must be operations of the swagger
+    if isinstance(openapi_definition, dict) and isinstance(properties, dict):
+        script_operations = (properties.get(_PROPERTIES) or {}).get(_SCRIPT_OPERATIONS) or []
+        unknown_operations = set(script_operations) - _get_operation_ids(openapi_definition)
+        if unknown_operations:
+            errors.append('{}: unknown script operations {}.'.format(
+                os.path.basename(api_properties),
+                ', '.join(sorted(unknown_operations))))
+
+    return errors
+
+
+def scan(root, max_workers=None):
+    """
+    Checks the connectors under the root in a process pool, one process per core by default.
+    Yields (directory, errors) tuples as the connectors are checked.
+    """
+    directories = list(find_connectors(root))
+    if not directories:
+        return
+
+    # Compile the schemas once, rather than in every process
+    for schema_name in (API_DEFINITION_SCHEMA, API_PROPERTIES_SCHEMA, SETTINGS_SCHEMA):
+        get_validator(schema_name)
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = {
+            executor.submit(scan_connector, directory): directory
+            for directory in directories
+        }
+        for future in as_completed(futures):
+            directory = futures[future]
+            try:
+                errors = future.result()
+            except Exception as exception:  # pylint: disable=broad-except
+                errors = ['Scan failed: {}'.format(exception)]
+            yield directory, errors
@@ -10,13 +10,20 @@ Method for create/update operation
 
 import os
 import json
+import functools
 import urllib.parse
 
 from knack.util import CLIError
 
-from paconn.common.util import ensure_file_exists
+from paconn.common.util import display, ensure_file_exists, hash_file, hash_json
+from paconn.common.jsonutil import load_file
+from paconn.common.ledger import get_ledger, API_DEFINITION, API_PROPERTIES, ICON, SCRIPT, PARTS
+from paconn.common.taskgraph import TaskGraph
+from paconn.common.concurrency import run_concurrently
+from paconn.common import tracing
+from paconn.common.listingcache import invalidate_listing, CONNECTORS
 from paconn.settings.util import write_settings
-from paconn.apimanager.fileuploader import upload_file
+from paconn.apimanager.fileuploader import BlobUploader
 from paconn.operations.json_keys import (
     _PROPERTIES,
     _ICON_URI,
@@ -43,6 +50,16 @@ from paconn.operations.json_keys import (
     _SHARED_ACCESS_SIGNATURE
 )
 
+# Names of the upsert tasks, besides the uploads named after their property
+_VALIDATION_TASK = 'validation'
+_STORAGE_TASK = 'storage'
+
+# Ledger parts of the uploaded files
+_FILE_PARTS = {
+    _ICON_URI: ICON,
+    _SCRIPT_URI: SCRIPT
+}
+
 
 def _create_backendservice_url(openapi_definition):
     """
@@ -65,9 +82,105 @@ def _create_backendservice_url(openapi_definition):
     return url
 
 
-def upsert(powerapps_rp, settings, client_secret, is_update, overwrite_settings):
+def _get_uploaded_uris(service_url, settings, files, file_hashes, ledger):
+    """
+    Returns the blob URIs of the files uploaded before with the same content.
+    """
+    uris = {}
+    for key in files:
+        uri = ledger.get_upload_uri(
+            service_url=service_url,
+            environment=settings.environment,
+            connector_id=settings.connector_id,
+            part=_FILE_PARTS[key],
+            content_hash=file_hashes[key])
+        if uri:
+            uris[key] = uri
+    return uris
+
+
+def _generate_storage(powerapps_rp, environment):
+    """
+    Returns an uploader for a new resource storage,
+    shared by the uploads of the connector files.
+    """
+    response = powerapps_rp.generate_resource_storage(environment)
+    return BlobUploader(response[_SHARED_ACCESS_SIGNATURE])
+
+
+def _upload(file_path, storage):
+    return storage.upload(file_path)
+
+
+def _get_payload(property_definition, environment, uris):
+    """
+    Returns the payload of a create or update in an environment.
+    The payloads of the environments share everything but their properties object,
+    the swagger included.
+    """
+    properties = dict(property_definition[_PROPERTIES])
+
+    # Append the environment id
+    properties[_ENVIRONMENT] = {_NAME: environment}
+
+    properties.update(uris)
+    if _SCRIPT_URI not in uris:
+        properties[_SCRIPT_URI] = ""
+
+    payload = dict(property_definition)
+    payload[_PROPERTIES] = properties
+    return payload
+
+
+def get_validation(powerapps_rp, connector):
+    """
+    Returns a function validating the swagger of a loaded connector.
+    """
+    (property_definition, _, _, _) = connector
+    return functools.partial(
+        tracing.traced('validate', powerapps_rp.validate_connector),
+        payload=property_definition[_PROPERTIES][_OPEN_API_DEFINITION],
+        enable_certification_rules=False)
+
+
+# pylint: disable=too-many-arguments
+def upsert(powerapps_rp, settings, client_secret, is_update, overwrite_settings, save_settings=True, force=False):
+    """
+    Method for create/update operation.
+    Returns the connector ID, or None when an update was skipped
+    because the content didn't change since it was last deployed.
+    Force deploys and uploads everything, regardless of the previous deployments.
+    """
+    with tracing.span('upsert', api_definition=settings.api_definition) as span_attributes:
+        connector = load_connector(
+            settings=settings,
+            client_secret=client_secret,
+            is_update=is_update)
+
+        connector_id = deploy(
+            powerapps_rp=powerapps_rp,
+            settings=settings,
+            connector=connector,
+            client_secret=client_secret,
+            is_update=is_update,
+            validation=get_validation(powerapps_rp, connector),
+            force=force)
+        span_attributes['connector_id'] = connector_id
+
+    # Save the settings
+    if connector_id and not is_update and save_settings:
+        write_settings(settings, overwrite_settings)
+
+    return connector_id
+
+
+# pylint: disable=too-many-locals
+def load_connector(settings, client_secret, is_update):
     """
-    Method for create/update operation
+    Loads the files of a connector for a create or update in any environment.
+    Returns the payload without the environment and uploaded file URIs,
+    the icon and script files and their hashes by property,
+    and the content hashes by ledger part.
     """
 
     # Make sure the required files exist
@@ -79,8 +192,8 @@ def upsert(powerapps_rp, settings, client_secret, is_update, overwrite_settings)
         file_type='API Definition')
 
     # Open the property file
-    with open(settings.api_properties, 'r') as file:
-        property_definition = json.load(file)
+    with tracing.span('load api properties'):
+        property_definition = load_file(settings.api_properties)
 
     # Get the property object
     properties = property_definition[_PROPERTIES]
@@ -106,67 +219,175 @@ def upsert(powerapps_rp, settings, client_secret, is_update, overwrite_settings)
                 raise CLIError('Please provide OAuth2 client secret using the --secret argument.')
 
     # Load swagger definition
-    with open(settings.api_definition, 'r') as file:
-        openapi_definition = json.load(file)
-
-    # Append swagger
-    properties[_OPEN_API_DEFINITION] = openapi_definition
+    with tracing.span('load api definition'):
+        openapi_definition = load_file(settings.api_definition)
 
     # Add backend service
     backend_service_url = _create_backendservice_url(openapi_definition)
     properties[_BACKEND_SERVICE] = {_SERVICE_URL: backend_service_url}
 
-    # Append the environment id
-    properties[_ENVIRONMENT] = {_NAME: settings.environment}
-
-    # Add displayName only when creating a new connector
-    if is_update is not True:
-        properties[_DISPLAY_NAME] = openapi_definition[_INFO][_TITLE]
-
     # Add description
     properties[_DESCRIPTION] = openapi_definition[_INFO][_DESCRIPTION]
 
-    # Validate Open API Definition
-    powerapps_rp.validate_connector(
-        payload=openapi_definition,
-        enable_certification_rules=False)
+    # Collect the icon and the script
+    files = {}
+    if settings.icon and os.path.exists(settings.icon):
+        files[_ICON_URI] = settings.icon
+    if settings.script and os.path.exists(settings.script):
+        files[_SCRIPT_URI] = settings.script
+
+    # The deployed secret can't be compared, so the properties
+    # of an update with a secret are never the same as deployed
+    with tracing.span('hash content'):
+        file_hashes = {key: hash_file(file_path) for key, file_path in files.items()}
+        content_hashes = {
+            API_DEFINITION: hash_json(openapi_definition),
+            API_PROPERTIES: None if client_secret else hash_json(property_definition)
+        }
+        content_hashes.update((_FILE_PARTS[key], file_hash) for key, file_hash in file_hashes.items())
+
+    # Add displayName only when creating a new connector.
+    # It is left out of the hash, so that the first update after a create can be skipped.
+    if is_update is not True:
+        properties[_DISPLAY_NAME] = openapi_definition[_INFO][_TITLE]
 
-    # Get the shared access signature
-    response = powerapps_rp.generate_resource_storage(settings.environment)
-    sas_url = response[_SHARED_ACCESS_SIGNATURE]
+    # Append swagger
+    properties[_OPEN_API_DEFINITION] = openapi_definition
 
-    # Upload the icon
-    if settings.icon and os.path.exists(settings.icon):
-        icon_uri = upload_file(
-            sas_url=sas_url,
-            file_path=settings.icon)
-        properties[_ICON_URI] = icon_uri
+    return property_definition, files, file_hashes, content_hashes
 
-    # Upload the script
-    if settings.script and os.path.exists(settings.script):
-        script_uri = upload_file(
-            sas_url=sas_url,
-            file_path=settings.script)
-        properties[_SCRIPT_URI] = script_uri
 
-    else:
-        properties[_SCRIPT_URI] = ""
+# pylint: disable=too-many-arguments,too-many-locals
+def deploy(powerapps_rp, settings, connector, client_secret, is_update, validation, force=False):
+    """
+    Creates or updates a loaded connector in the environment of the settings,
+    with its own resource storage for the uploads.
+    The validation runs unless the swagger is the one deployed last.
+    Returns the connector ID, also set in the settings,
+    or None when the update was skipped.
+    """
+    (property_definition, files, file_hashes, content_hashes) = connector
+
+    # Skip an update when the content is the same as the last deployment
+    ledger = get_ledger()
+    service_url = powerapps_rp.api_manager.get_service_url()
+    deployment = None
+    if is_update is True and not force:
+        deployment = ledger.get_deployment(service_url, settings.environment, settings.connector_id)
+        if deployment and not client_secret and all(
+                deployment[part] == content_hashes.get(part) for part in PARTS):
+            return None
+
+    # Reuse the blobs of previous uploads of the same content
+    uris = {} if force else _get_uploaded_uris(
+        service_url=service_url,
+        settings=settings,
+        files=files,
+        file_hashes=file_hashes,
+        ledger=ledger)
+    upload_keys = [key for key in files if key not in uris]
+
+    # The validation doesn't depend on the uploads, and the uploads only
+    # depend on the resource storage, so they run concurrently.
+    # A swagger already deployed to the connector passed the validation.
+    tasks = TaskGraph()
+    if not deployment or deployment[API_DEFINITION] != content_hashes[API_DEFINITION]:
+        tasks.add(_VALIDATION_TASK, validation)
+
+    # The resource storage is only generated when a file has to be uploaded
+    if upload_keys:
+        tasks.add(
+            _STORAGE_TASK,
+            functools.partial(
+                tracing.traced('generate storage', _generate_storage),
+                powerapps_rp,
+                settings.environment))
+        for key in upload_keys:
+            upload = tracing.traced('upload', _upload, file=files[key], size=os.path.getsize(files[key]))
+            tasks.add(key, functools.partial(upload, files[key]), inputs={'storage': _STORAGE_TASK})
+
+    with tracing.span('validate and upload'):
+        results = tasks.run()
+    uris.update((key, results[key]) for key in upload_keys)
+
+    payload = _get_payload(property_definition, settings.environment, uris)
 
     # Update or create the connector
     if is_update is True:
-        api_registration = powerapps_rp.update_connector(
-            environment=settings.environment,
-            connector_id=settings.connector_id,
-            payload=property_definition)
+        with tracing.span('update connector'):
+            api_registration = powerapps_rp.update_connector(
+                environment=settings.environment,
+                connector_id=settings.connector_id,
+                payload=payload)
         connector_id = settings.connector_id
     else:
-        api_registration = powerapps_rp.create_connector(
-            environment=settings.environment,
-            payload=property_definition)
+        with tracing.span('create connector'):
+            api_registration = powerapps_rp.create_connector(
+                environment=settings.environment,
+                payload=payload)
         connector_id = json.loads(api_registration)[_NAME]
-
-        # Save the settings
         settings.connector_id = connector_id
-        write_settings(settings, overwrite_settings)
+
+    # The cached connector listing misses the new connector or has a stale title
+    invalidate_listing(
+        api_manager=powerapps_rp.api_manager,
+        listing=CONNECTORS,
+        environment=settings.environment)
+
+    # Remember the deployed content and the uploads for the next update
+    ledger.set_deployment(service_url, settings.environment, connector_id, content_hashes)
+
+    for key, uri in uris.items():
+        ledger.set_upload_uri(
+            service_url=service_url,
+            environment=settings.environment,
+            connector_id=connector_id,
+            part=_FILE_PARTS[key],
+            content_hash=file_hashes[key],
+            uri=uri)
 
     return connector_id
+
+
+def _get_operation_name(is_update):
+    return 'updated' if is_update else 'created'
+
+
+def upsert_concurrently(function, arguments, is_update, max_workers):
+    """
+    Creates or updates connectors by calling the function with the keyword arguments
+    of each (name, keyword arguments) pair concurrently, and displays each result
+    as soon as it is done.
+    Returns a list of (name, connector id, error) tuples,
+    with neither a connector id nor an error for a skipped update.
+    """
+    operation = _get_operation_name(is_update)
+    results = []
+
+    for (name, connector_id, error) in run_concurrently(function, arguments, max_workers):
+        if error:
+            display('{}: failed. {}'.format(name, error))
+        elif connector_id:
+            display('{}: {} {} successfully.'.format(name, connector_id, operation))
+        else:
+            display('{}: unchanged, skipped.'.format(name))
+        results.append((name, connector_id, error))
+
+    return results
+
+
+def ensure_upserts_succeeded(results, is_update, unit, failed_label):
+    """
+    Displays a summary of the results of upsert_concurrently, counting them as the unit,
+    and fails listing the names of the failed ones after the label.
+    """
+    failed = [name for (name, _, error) in results if error]
+    skipped = [name for (name, connector_id, error) in results if not connector_id and not error]
+
+    summary = '{} {} {}, '.format(len(results) - len(failed) - len(skipped), unit, _get_operation_name(is_update))
+    if is_update:
+        summary += '{} unchanged, '.format(len(skipped))
+    display('{}{} failed.'.format(summary, len(failed)))
+
+    if failed:
+        raise CLIError('{}: {}'.format(failed_label, ', '.join(sorted(failed))))
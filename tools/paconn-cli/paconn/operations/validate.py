@@ -8,13 +8,38 @@
 Method for create/update operation
 """
 
-import io
-import json
+import os
+import copy
 
-from paconn.common.util import ensure_file_exists
+from paconn.common import tracing
+from paconn.common.util import ensure_file_exists, hash_json
+from paconn.common.concurrency import run_concurrently
+from paconn.common.jsonutil import load_file
+from paconn.common.ledger import get_ledger
+from paconn.common.schemavalidation import (
+    validate_schema,
+    API_DEFINITION_SCHEMA,
+    API_PROPERTIES_SCHEMA,
+    SETTINGS_SCHEMA
+)
+from paconn.operations.scan import get_connector_files
 
+# Number of connectors validated at the same time
+DEFAULT_WORKERS = 4
 
-def validate(powerapps_rp, settings):
+
+def _get_cache_key(settings, openapi_definition, enable_certification_rules):
+    """
+    Returns the validation cache key for a swagger.
+    """
+    return '{}|{}|{}|{}'.format(
+        settings.powerapps_url,
+        settings.powerapps_api_version,
+        enable_certification_rules,
+        hash_json(openapi_definition))
+
+
+def validate(powerapps_rp, settings, use_cache=True):
     """
     Method for create/update operation
     """
@@ -25,13 +50,27 @@ def validate(powerapps_rp, settings):
         file_type='API Definition')
 
     # Load swagger definition
-    with io.open(settings.api_definition, 'r', encoding='utf-8-sig') as file:
-        openapi_definition = json.load(file)
+    with tracing.span('load api definition'):
+        openapi_definition = load_file(settings.api_definition)
+
+    # Unchanged swaggers reuse the result of the last validation
+    with tracing.span('validation cache') as span_attributes:
+        ledger = get_ledger()
+        cache_key = _get_cache_key(
+            settings=settings,
+            openapi_definition=openapi_definition,
+            enable_certification_rules=True)
 
-    # Validate Open API Definition
-    result = powerapps_rp.validate_connector(
-        payload=openapi_definition,
-        enable_certification_rules=True)
+        result = ledger.get_validation(cache_key) if use_cache else None
+        span_attributes['hit'] = result is not None
+
+    if result is None:
+        # Validate Open API Definition
+        with tracing.span('validate'):
+            result = powerapps_rp.validate_connector(
+                payload=openapi_definition,
+                enable_certification_rules=True)
+        ledger.set_validation(cache_key, result)
 
     # Replace \r\n in the string to newlines
     result = bytes(result, 'utf-8').decode('unicode-escape')
@@ -39,3 +78,72 @@ def validate(powerapps_rp, settings):
     result = result.strip('"')
 
     return result
+
+
+def validate_local(settings, settings_file=None):
+    """
+    Validates the connector files against the bundled JSON schemas,
+    without calling the service.
+    """
+
+    # Make sure the required files exist
+    ensure_file_exists(
+        file=settings.api_definition,
+        file_type='API Definition')
+
+    documents = [(settings.api_definition, API_DEFINITION_SCHEMA)]
+    if settings.api_properties:
+        ensure_file_exists(
+            file=settings.api_properties,
+            file_type='API Properties')
+        documents.append((settings.api_properties, API_PROPERTIES_SCHEMA))
+    if settings_file:
+        documents.append((settings_file, SETTINGS_SCHEMA))
+
+    errors = []
+    for (file_name, schema_name) in documents:
+        try:
+            with tracing.span('load file', file=file_name):
+                content = load_file(file_name)
+        except ValueError as exception:
+            errors.append('{}: {}'.format(file_name, exception))
+            continue
+
+        with tracing.span('validate schema', schema=schema_name):
+            error = validate_schema(content, schema_name)
+        if error:
+            errors.append('{}: {}'.format(file_name, error))
+
+    return '\n'.join(errors)
+
+
+def _validate_directory(powerapps_rp, settings, directory, local, use_cache):
+    """
+    Validates the connector files of a directory.
+    """
+    connector_settings = copy.copy(settings)
+    (connector_settings.api_definition, api_properties, _, _) = get_connector_files(directory)
+    connector_settings.api_properties = api_properties if os.path.isfile(api_properties) else None
+
+    if local:
+        return validate_local(connector_settings)
+    return validate(powerapps_rp, connector_settings, use_cache)
+
+
+# pylint: disable=too-many-arguments
+def validate_all(powerapps_rp, settings, directories, local, use_cache=True, max_workers=None):
+    """
+    Validates the connectors of the directories concurrently.
+    Returns an iterator of (directory, result, error) tuples yielded as the validations complete.
+    """
+    arguments = [
+        (directory, {
+            'powerapps_rp': powerapps_rp,
+            'settings': settings,
+            'directory': directory,
+            'local': local,
+            'use_cache': use_cache
+        })
+        for directory in directories
+    ]
+    return run_concurrently(_validate_directory, arguments, max_workers or DEFAULT_WORKERS)
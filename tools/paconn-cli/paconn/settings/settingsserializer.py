@@ -7,8 +7,8 @@
 Represents a settings object consructed from settings.json
 """
 
-import json
 from paconn.common.util import format_json
+from paconn.common.jsonutil import load_file
 from paconn.settings.settings import Settings
 
 # Connector sepecific settings
@@ -63,8 +63,7 @@ class SettingsSerializer:
         """
         Deserializes a settings object from the settings.json file
         """
-        with open(filename, 'r') as file:
-            settings_dict = json.load(file)  # pylint: disable=attribute-defined-outside-init
+        settings_dict = load_file(filename)
         settings = SettingsSerializer.deserialize(settings_dict)
         return settings
 
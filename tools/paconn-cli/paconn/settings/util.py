@@ -7,17 +7,25 @@
 Utility for loading settings.
 """
 
+import threading
+
 from paconn import _UPDATE, _DOWNLOAD, _VALIDATE
 from paconn.common.util import write_with_prompt
-from paconn.authentication.tokenmanager import TokenManager
+from paconn.authentication.tokenmanager import TokenManager, TokenRefresher
 from paconn.apimanager.powerappsrpbuilder import PowerAppsRPBuilder
 from paconn.apimanager.flowrpbuilder import FlowRPBuilder
+from paconn.apimanager.session import get_shared_session, POOL_MAXSIZE
+from paconn.apimanager.ratelimiter import RateLimiter
 from paconn.common.prompts import get_environment, get_connector_id
 from paconn.settings.settingsserializer import SettingsSerializer
 
 # Setting file name
 SETTINGS_FILE = 'settings.json'
 
+# Credentials loaded by the process, with the time of the token file they were read from and their refresher
+_CREDENTIALS = {}
+_CREDENTIALS_LOCK = threading.Lock()
+
 
 def prompt_for_environment(settings, flow_rp):
     # Select environment if not provided
@@ -34,20 +42,61 @@ def prompt_for_connector_id(settings, powerapps_rp):
             environment=settings.environment)
 
 
-def load_powerapps_and_flow_rp(settings, command_context):
+def load_credentials(settings):
+    """
+    Loads the credentials, renewing them when expired,
+    and keeps them fresh in the background for long runs.
+    A long-lived process reuses the credentials until
+    the token file changes, by a login, logout or refresh.
+    """
+    token_manager = TokenManager()
+    with _CREDENTIALS_LOCK:
+        modified_time = token_manager.get_modified_time()
+        (loaded_time, credentials, refresher) = _CREDENTIALS.get(token_manager.token_file, (None, None, None))
+        if credentials and loaded_time == modified_time and not TokenManager.is_expired(credentials):
+            return credentials
+        if refresher:
+            refresher.stop()
+
+        credentials = token_manager.get_credentials(settings)
+
+        refresher = TokenRefresher(
+            credentials=credentials,
+            settings=settings,
+            token_manager=token_manager)
+        refresher.start()
+
+        _CREDENTIALS[token_manager.token_file] = (token_manager.get_modified_time(), credentials, refresher)
+
+    return credentials
+
+
+# pylint: disable=too-many-arguments
+def load_powerapps_and_flow_rp(settings, command_context, max_workers=None, all_connectors=False, compress=False,
+                               max_rps=None):
 
     # Get credentials
-    credentials = TokenManager().get_credentials()
+    credentials = load_credentials(settings)
+
+    # Both RPs share one connection pool and rate limiter
+    session = get_shared_session(
+        pool_maxsize=max(POOL_MAXSIZE, max_workers or 0))
+    rate_limiter = RateLimiter(rate=max_rps)
 
     # Get powerapps rp
     powerapps_rp = PowerAppsRPBuilder.get_from_settings(
         credentials=credentials,
-        settings=settings)
+        settings=settings,
+        session=session,
+        compress=compress,
+        rate_limiter=rate_limiter)
 
     # Get flow rp
     flow_rp = FlowRPBuilder.get_from_settings(
         credentials=credentials,
-        settings=settings)
+        settings=settings,
+        session=session,
+        rate_limiter=rate_limiter)
 
     # If the file names are missing for the download command
     # use default names
@@ -65,8 +114,9 @@ def load_powerapps_and_flow_rp(settings, command_context):
             flow_rp=flow_rp)
 
     # Prompt for connector id for
-    # operation `update` and `download`
-    if command_context is _UPDATE or command_context is _DOWNLOAD:
+    # operation `update` and `download`,
+    # unless all the connectors are processed
+    if (command_context is _UPDATE or command_context is _DOWNLOAD) and not all_connectors:
         prompt_for_connector_id(
             settings=settings,
             powerapps_rp=powerapps_rp)
@@ -74,6 +124,29 @@ def load_powerapps_and_flow_rp(settings, command_context):
     return powerapps_rp, flow_rp
 
 
+def load_powerapps_rp(settings, max_workers=None, compress=False, max_rps=None):
+    """
+    Loads the PowerApps RP without prompting for missing settings,
+    with a connection pool large enough for the given number of workers
+    and a rate limiter shared by the workers.
+    """
+
+    # Get credentials
+    credentials = load_credentials(settings)
+
+    session = get_shared_session(
+        pool_maxsize=max(POOL_MAXSIZE, max_workers or 0))
+
+    powerapps_rp = PowerAppsRPBuilder.get_from_settings(
+        credentials=credentials,
+        settings=settings,
+        session=session,
+        compress=compress,
+        rate_limiter=RateLimiter(rate=max_rps))
+
+    return powerapps_rp
+
+
 def write_settings(settings, overwrite):
     filename = SETTINGS_FILE
     settings_json = SettingsSerializer.to_json_string(settings)
@@ -46,6 +46,7 @@ setup(
         'paconn.common',
         'paconn.config',
         'paconn.operations',
+        'paconn.schemas',
         'paconn.settings'
     ],
     install_requires=[
@@ -59,13 +60,18 @@ setup(
         'requests',
         'adal',
         'msrestazure',
-        'azure-storage-blob>=2.1,<12.0'
+        'azure-storage-blob>=2.1,<12.0',
+        'fastjsonschema'
     ],
     extras_require={
         ":python_version<'3.0'": ['pylint~=1.9.2'],
-        ":python_version>='3.0'": ['pylint~=2.0.0']
+        ":python_version>='3.0'": ['pylint~=2.0.0'],
+        'fast': ['orjson']
+    },
+    package_data={
+        'paconn.config': ['*.*'],
+        'paconn.schemas': ['*.json']
     },
-    package_data={'paconn.config': ['*.*']},
     include_package_data=True,
     entry_points={
         'console_scripts': ['paconn=paconn.__main__:main']
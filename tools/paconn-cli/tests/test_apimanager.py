@@ -0,0 +1,131 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the request compression of the API manager.
+"""
+
+import gzip
+import json
+import unittest
+
+from paconn.apimanager.apimanager import APIManager, COMPRESSION_THRESHOLD
+
+_ENDPOINT = 'https://api.example.com/connectors'
+_PAYLOAD = {'swagger': 'x' * COMPRESSION_THRESHOLD}
+
+
+class _Response:
+    def __init__(self, status_code, text='{}'):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.ok = status_code < 400
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class _Session:
+    """
+    Returns the given responses in order and records the content encoding and the body of the requests.
+    """
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.encodings = []
+        self.requests = []
+
+    def request(self, verb, endpoint, headers=None, **kwargs):  # pylint: disable=unused-argument
+        self.encodings.append(headers.get('Content-Encoding'))
+        self.requests.append(dict(kwargs, headers=headers))
+        return self.responses.pop(0)
+
+
+class _RateLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+    def pause(self, delay):
+        pass
+
+
+class CompressionTest(unittest.TestCase):
+    """
+    Tests the fallback to uncompressed requests.
+    """
+    def _send(self, responses, payload=None, compress=True):
+        session = _Session(responses)
+        rate_limiter = _RateLimiter()
+        api_manager = APIManager(
+            scheme='https',
+            region=None,
+            netlocation='api.example.com',
+            base_path='/',
+            api_version='1',
+            session=session,
+            compress=compress,
+            rate_limiter=rate_limiter)
+        response = api_manager._request_with_retries('POST', _ENDPOINT, {}, payload or _PAYLOAD, False)
+        return response, session, rate_limiter, api_manager
+
+    def test_body_above_the_threshold_is_compressed(self):
+        (_, session, _, _) = self._send([_Response(201)])
+
+        [request] = session.requests
+        self.assertEqual(request['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(request['headers']['Content-Type'], 'application/json')
+        body = gzip.decompress(request['data'])
+        self.assertGreaterEqual(len(body), COMPRESSION_THRESHOLD)
+        self.assertLess(len(request['data']), len(body))
+        self.assertEqual(json.loads(body.decode('utf-8')), _PAYLOAD)
+
+    def test_body_below_the_threshold_is_sent_uncompressed(self):
+        payload = {'swagger': 'x' * (COMPRESSION_THRESHOLD - 100)}
+
+        (_, session, _, api_manager) = self._send([_Response(201)], payload)
+
+        [request] = session.requests
+        self.assertNotIn('Content-Encoding', request['headers'])
+        self.assertEqual(request['headers']['Content-Type'], 'application/json')
+        self.assertLess(len(request['data']), COMPRESSION_THRESHOLD)
+        self.assertEqual(json.loads(request['data'].decode('utf-8')), payload)
+        self.assertTrue(api_manager.compress)
+
+    def test_body_isnt_compressed_without_compression(self):
+        (_, session, _, _) = self._send([_Response(201)], compress=False)
+
+        [request] = session.requests
+        self.assertEqual(session.encodings, [None])
+        self.assertEqual(request['json'], _PAYLOAD)
+
+    def test_unsupported_media_type_falls_back(self):
+        (response, session, rate_limiter, api_manager) = self._send([_Response(415), _Response(201)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(session.encodings, ['gzip', None])
+        self.assertEqual(rate_limiter.acquired, 2)
+        self.assertFalse(api_manager.compress)
+
+    def test_bad_request_naming_the_encoding_falls_back(self):
+        error = '{"error": {"message": "Unsupported Content-Encoding"}}'
+        (response, session, _, api_manager) = self._send([_Response(400, error), _Response(201)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(session.encodings, ['gzip', None])
+        self.assertFalse(api_manager.compress)
+
+    def test_other_bad_request_is_not_sent_again(self):
+        error = '{"error": {"message": "The swagger is invalid."}}'
+        (response, session, rate_limiter, api_manager) = self._send([_Response(400, error)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(session.encodings, ['gzip'])
+        self.assertEqual(rate_limiter.acquired, 1)
+        self.assertTrue(api_manager.compress)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the arguments of a batch create.
+"""
+
+import unittest
+from unittest import mock
+
+from knack.util import CLIError
+
+from paconn.commands import create
+
+
+class BatchCreateTest(unittest.TestCase):
+    """
+    Tests the arguments refused with --batch, before anything is loaded.
+    """
+    def _create(self, client_secret=None, overwrite_settings=False):
+        with mock.patch.object(create, 'load_powerapps_rp') as load_powerapps_rp:
+            with self.assertRaises(CLIError) as context:
+                create.create(
+                    environment=None,
+                    api_properties=None,
+                    api_definition=None,
+                    icon=None,
+                    script=None,
+                    powerapps_url=None,
+                    powerapps_version=None,
+                    client_secret=client_secret,
+                    settings_file=None,
+                    overwrite_settings=overwrite_settings,
+                    compress=False,
+                    batch='connectors')
+        load_powerapps_rp.assert_not_called()
+        return str(context.exception)
+
+    def test_batch_requires_overwrite_settings(self):
+        self.assertIn('--overwrite-settings', self._create())
+
+    def test_batch_refuses_a_secret(self):
+        self.assertIn('--secret', self._create(client_secret='secret', overwrite_settings=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
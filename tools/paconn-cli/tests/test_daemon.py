@@ -0,0 +1,85 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the commands run by the daemon.
+"""
+
+import os
+import time
+import socket
+import tempfile
+import unittest
+from unittest import mock
+
+from paconn.common import daemon, cancellation
+
+
+def _wait_for_cancellation():
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            cancellation.check()
+        except cancellation.CommandCancelled:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class RunCommandTest(unittest.TestCase):
+    """
+    Tests the cancellation of the commands and the commands arriving while one runs.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = daemon.DaemonServer(os.path.join(self.directory.name, 'daemon.sock'), idle_timeout=0)
+        (self.connection, self.client) = socket.socketpair()
+
+    def tearDown(self):
+        self.connection.close()
+        self.client.close()
+        self.server.server_close()
+        self.directory.cleanup()
+        cancellation.reset()
+
+    def _run_command(self, invoke):
+        with mock.patch.object(daemon, 'invoke', invoke):
+            return self.server.run_command(self.connection, ['update'], self.directory.name)
+
+    def test_disconnected_client_cancels_the_command(self):
+        def invoke(args, cli_cls):
+            self.client.close()
+            # The CLI reports the cancellation as an error
+            return 1 if _wait_for_cancellation() else 0
+
+        self.assertEqual(self._run_command(invoke), 1)
+
+    def test_client_disconnecting_after_the_command_cancels_nothing(self):
+        self.assertEqual(self._run_command(lambda args, cli_cls: 0), 0)
+        self.client.close()
+
+        self.assertFalse(self._is_cancelled_after(0.2))
+
+    def test_command_arriving_while_another_runs_is_refused(self):
+        def invoke(args, cli_cls):
+            with self.assertRaises(daemon._DaemonBusy):  # pylint: disable=protected-access
+                self.server.run_command(self.connection, ['validate'], self.directory.name)
+            return 0
+
+        self.assertEqual(self._run_command(invoke), 0)
+        self.assertFalse(self.server.get_status()['busy'])
+
+    @staticmethod
+    def _is_cancelled_after(seconds):
+        time.sleep(seconds)
+        try:
+            cancellation.check()
+        except cancellation.CommandCancelled:
+            return True
+        return False
+
+
+if __name__ == '__main__':
+    unittest.main()
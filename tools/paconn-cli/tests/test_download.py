@@ -0,0 +1,268 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the artifact downloads.
+"""
+
+import io
+import os
+import json
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import requests
+from knack.util import CLIError
+
+from paconn.settings.settings import Settings
+from paconn.common.ledger import Ledger, LEDGER_FILE
+from paconn.operations import download
+from paconn.operations.download import _write_stream, _write_swagger, _download_connector, download_all
+
+_SAS_URL = 'https://storage.blob.core.windows.net/artifacts/icon.png?sv=2018-03-28&sig=secret'
+
+_ARTIFACTS = {
+    'https://storage.blob.core.windows.net/artifacts/swagger.json': b'{"swagger": "2.0", "paths": {}}',
+    'https://storage.blob.core.windows.net/artifacts/icon.png': b'icon',
+    'https://storage.blob.core.windows.net/artifacts/script.csx': b'script'
+}
+
+
+def _get_response(status_code, reason, content=b''):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.url = _SAS_URL
+    response.raw = io.BytesIO(content)
+    return response
+
+
+class WriteStreamTest(unittest.TestCase):
+    """
+    Tests the errors of the artifact downloads.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.session = mock.Mock()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file_is_written(self):
+        self.session.get.return_value = _get_response(200, 'OK', b'icon')
+        file_path = os.path.join(self.directory.name, 'icon.png')
+
+        _write_stream(self.session, _SAS_URL, file_path)
+
+        with open(file_path, 'rb') as file:
+            self.assertEqual(file.read(), b'icon')
+
+    def test_expired_link_raises_a_cli_error(self):
+        self.session.get.return_value = _get_response(403, 'Forbidden')
+
+        with self.assertRaises(CLIError) as context:
+            _write_stream(self.session, _SAS_URL, os.path.join(self.directory.name, 'icon.png'))
+
+        self.assertEqual(str(context.exception), 'Couldn\'t download icon.png: HTTP 403 Forbidden.')
+        self.assertNotIn('sig=', str(context.exception))
+
+    def test_swagger_error_names_the_swagger(self):
+        self.session.get.return_value = _get_response(404, 'Not Found')
+        file_path = os.path.join(self.directory.name, 'apiDefinition.swagger.json')
+
+        with self.assertRaises(CLIError) as context:
+            _write_swagger(self.session, _SAS_URL, file_path)
+
+        self.assertEqual(str(context.exception), 'Couldn\'t download apiDefinition.swagger.json: HTTP 404 Not Found.')
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_connection_error_raises_a_cli_error(self):
+        self.session.get.side_effect = requests.exceptions.ConnectionError('connection reset')
+
+        with self.assertRaises(CLIError) as context:
+            _write_stream(self.session, _SAS_URL, os.path.join(self.directory.name, 'script.csx'))
+
+        self.assertEqual(str(context.exception), 'Couldn\'t download script.csx: ConnectionError.')
+
+
+class _Session:
+    """
+    Returns the artifacts, answering a request only once the given number of requests arrived.
+    """
+    def __init__(self, concurrent_requests, statuses=None):
+        self.barrier = threading.Barrier(concurrent_requests, timeout=5)
+        self.statuses = statuses or {}
+
+    def get(self, url, **kwargs):  # pylint: disable=unused-argument
+        self.barrier.wait()
+        status_code = self.statuses.get(url, 200)
+        return _get_response(status_code, 'OK' if status_code == 200 else 'Forbidden', _ARTIFACTS[url])
+
+
+class _PowerAppsRP:
+    """
+    Lists the given connectors, and returns connectors with a swagger, an icon and a script.
+    The connectors named broken can't be read.
+    """
+    def __init__(self, session, connectors=None):
+        self.api_manager = mock.Mock(session=session)
+        self.api_manager.get_service_url.return_value = 'https://api.powerapps.com'
+        self.connectors = connectors or {}
+
+    def iter_connectors(self, environment, properties=None):  # pylint: disable=unused-argument
+        for (connector_id, is_custom) in self.connectors.items():
+            yield {'name': connector_id, 'properties': {'isCustomApi': is_custom}}
+
+    def get_connector(self, environment, connector_id):  # pylint: disable=unused-argument
+        if connector_id == 'broken':
+            raise CLIError('Connector broken not found.')
+        urls = list(_ARTIFACTS)
+        return {
+            'name': connector_id,
+            'properties': {
+                'iconBrandColor': '#007ee5',
+                'apiDefinitions': {'originalSwaggerUrl': urls[0]},
+                'iconUri': urls[1],
+                'scriptDefinitionUrl': urls[2],
+                'changedTime': '2020-01-01T00:00:00Z'
+            }
+        }
+
+
+class _DownloadTest(unittest.TestCase):
+    """
+    Downloads connectors into a temporary directory, with a temporary ledger.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        ledger = Ledger(os.path.join(self.directory.name, LEDGER_FILE))
+        patcher = mock.patch.object(download, 'get_ledger', return_value=ledger)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def _get_settings(connector_id=None):
+        return Settings(
+            connector_id=connector_id,
+            environment='environment',
+            api_properties='apiProperties.json',
+            api_definition='apiDefinition.swagger.json',
+            icon='icon.png',
+            script='script.csx',
+            powerapps_url=None,
+            powerapps_api_version=None)
+
+    def _read(self, *file_names):
+        with open(os.path.join(self.directory.name, *file_names), 'rb') as file:
+            return file.read()
+
+
+class DownloadConnectorTest(_DownloadTest):
+    """
+    Tests the concurrent fetch of the artifacts of a connector.
+    """
+    def _download(self, session):
+        return _download_connector(
+            powerapps_rp=_PowerAppsRP(session),
+            settings=self._get_settings('connector'),
+            directory=self.directory.name,
+            format_swagger=True)
+
+    def test_artifacts_are_fetched_concurrently(self):
+        # The session answers once the three artifacts are requested at the same time
+        self.assertTrue(self._download(_Session(concurrent_requests=3)))
+
+        self.assertEqual(json.loads(self._read('apiDefinition.swagger.json')), {'swagger': '2.0', 'paths': {}})
+        self.assertEqual(self._read('icon.png'), b'icon')
+        self.assertEqual(self._read('script.csx'), b'script')
+        self.assertEqual(
+            json.loads(self._read('apiProperties.json')),
+            {'properties': {'iconBrandColor': '#007ee5'}})
+
+    def test_failed_artifact_fails_the_download(self):
+        icon_url = list(_ARTIFACTS)[1]
+
+        with self.assertRaises(CLIError) as context:
+            self._download(_Session(concurrent_requests=3, statuses={icon_url: 403}))
+
+        self.assertEqual(str(context.exception), 'Couldn\'t download icon.png: HTTP 403 Forbidden.')
+
+    def test_unchanged_connector_isnt_fetched_again(self):
+        self.assertTrue(self._download(_Session(concurrent_requests=3)))
+
+        session = mock.Mock()
+        self.assertFalse(self._download(session))
+        session.get.assert_not_called()
+
+
+class DownloadAllTest(_DownloadTest):
+    """
+    Tests the download of all the custom connectors of an environment.
+    """
+    def setUp(self):
+        super().setUp()
+        self.session = mock.Mock()
+        self.session.get.side_effect = lambda url, **kwargs: _get_response(200, 'OK', _ARTIFACTS[url])
+        patcher = mock.patch.object(download, 'display')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _download_all(self, connectors, overwrite=False, settings=None):
+        (_, results) = download_all(
+            powerapps_rp=_PowerAppsRP(self.session, connectors),
+            settings=settings or self._get_settings(),
+            destination=self.directory.name,
+            overwrite=overwrite,
+            max_workers=2)
+        return {connector_id: (downloaded, str(error) if error else None)
+                for (connector_id, downloaded, error) in results}
+
+    def test_custom_connectors_are_downloaded_to_their_directories(self):
+        results = self._download_all({'first': True, 'second': True, 'shared': False})
+
+        self.assertEqual(results, {'first': (True, None), 'second': (True, None)})
+        for connector_id in ('first', 'second'):
+            self.assertEqual(self._read(connector_id, 'icon.png'), b'icon')
+            settings = json.loads(self._read(connector_id, 'settings.json'))
+            self.assertEqual(settings['connectorId'], connector_id)
+            self.assertEqual(settings['icon'], 'icon.png')
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, 'shared')))
+
+    def test_completed_downloads_are_skipped_unless_overwritten(self):
+        self._download_all({'first': True})
+        self.session.get.reset_mock()
+
+        self.assertEqual(self._download_all({'first': True, 'second': True}), {
+            'first': (False, None),
+            'second': (True, None)
+        })
+        self.assertEqual(self.session.get.call_count, len(_ARTIFACTS))
+
+        # Overwritten, but unchanged since the last download
+        self.session.get.reset_mock()
+        self.assertEqual(self._download_all({'first': True}, overwrite=True), {'first': (False, None)})
+        self.session.get.assert_not_called()
+
+    def test_failed_connector_doesnt_stop_the_others(self):
+        results = self._download_all({'broken': True, 'first': True})
+
+        self.assertEqual(results, {'broken': (False, 'Connector broken not found.'), 'first': (True, None)})
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, 'broken', 'settings.json')))
+
+    def test_file_names_outside_of_the_connector_directory_are_refused(self):
+        for file_name in (os.path.join(os.pardir, 'icon.png'), os.path.abspath('icon.png')):
+            settings = self._get_settings()
+            settings.icon = file_name
+            with self.subTest(file_name=file_name), self.assertRaises(CLIError):
+                self._download_all({'first': True}, settings=settings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the deployment to several environments.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from knack.util import CLIError
+
+from paconn.operations.fanout import get_environments, save_connector_ids, _run_once
+
+
+class FanoutTest(unittest.TestCase):
+    """
+    Tests the environments targeted, the shared validation and the environment file update.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.env_file = os.path.join(self.directory.name, 'environments.txt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_env_file(self, content):
+        with open(self.env_file, 'w') as file:
+            file.write(content)
+
+    def _read_env_file(self):
+        with open(self.env_file, 'r') as file:
+            return file.read()
+
+    def test_environments_of_the_file_and_the_argument(self):
+        self._write_env_file('# Production\nprod prod-connector\n\ntest\n')
+
+        environments = get_environments('test, dev', self.env_file, 'connector', is_update=True)
+
+        self.assertEqual(environments, [('prod', 'prod-connector'), ('test', 'connector'), ('dev', 'connector')])
+
+    def test_environments_without_connector_id_fail_an_update(self):
+        self._write_env_file('prod prod-connector\ntest\n')
+
+        with self.assertRaises(CLIError):
+            get_environments(None, self.env_file, None, is_update=True)
+        self.assertEqual(
+            get_environments(None, self.env_file, None, is_update=False),
+            [('prod', 'prod-connector'), ('test', None)])
+
+    def test_invalid_environment_file_lines_are_rejected(self):
+        self._write_env_file('prod connector extra\n')
+
+        with self.assertRaises(CLIError):
+            get_environments(None, self.env_file, None, is_update=False)
+
+    def test_run_once_shares_the_result(self):
+        calls = []
+        barrier = threading.Barrier(4, timeout=5)
+        validation = _run_once(lambda: calls.append('validated') or 'result')
+
+        def validate():
+            barrier.wait()
+            return validation()
+
+        threads = [threading.Thread(target=validate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(validation(), 'result')
+        self.assertEqual(calls, ['validated'])
+
+    def test_run_once_shares_the_exception(self):
+        calls = []
+
+        def fail():
+            calls.append('validated')
+            raise CLIError('invalid swagger')
+
+        validation = _run_once(fail)
+
+        for _ in range(2):
+            with self.assertRaises(CLIError):
+                validation()
+        self.assertEqual(calls, ['validated'])
+
+    def test_save_connector_ids_keeps_the_comments_and_order(self):
+        self._write_env_file('# Environments\nprod\n# Test\ntest existing\nfailed')
+        results = [
+            ('test', 'test-connector', None),
+            ('prod', 'prod-connector', None),
+            ('failed', None, CLIError('failed')),
+            ('dev', 'dev-connector', None)
+        ]
+
+        save_connector_ids(self.env_file, results)
+
+        self.assertEqual(
+            self._read_env_file(),
+            '# Environments\nprod prod-connector\n# Test\ntest test-connector\nfailed\ndev dev-connector\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
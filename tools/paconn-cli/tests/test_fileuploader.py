@@ -0,0 +1,121 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the blob uploads against a local storage endpoint.
+"""
+
+import os
+import time
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from unittest import mock
+
+from paconn.apimanager import fileuploader
+from paconn.apimanager.fileuploader import BlobUploader
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Accepts the blob and block uploads, recording the requests and the most requests in flight.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.client_ports.add(self.client_address[1])
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        with server.lock:
+            server.requests.append((url.path, query.get('comp', [None])[0], len(body)))
+
+        # Lets the other blocks arrive while this one is in flight
+        time.sleep(0.05)
+
+        with server.lock:
+            server.in_flight -= 1
+        self.send_response(201)
+        self.send_header('ETag', '"0x8D000000000000"')
+        self.send_header('Last-Modified', 'Thu, 01 Jan 2020 00:00:00 GMT')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class BlobUploaderTest(unittest.TestCase):
+    """
+    Tests the single and the parallel block uploads, and the shared connections.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.client_ports = set()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+
+        # Small blocks, to upload a small file in blocks
+        for patcher in (mock.patch.object(fileuploader, 'SINGLE_PUT_SIZE', 1024),
+                        mock.patch.object(fileuploader, 'BLOCK_SIZE', 256)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.sas_url = 'http://127.0.0.1:{}/container?sv=2018-03-28&sig=signature'.format(self.server.server_port)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def _write(self, file_name, size):
+        file_path = os.path.join(self.directory.name, file_name)
+        with open(file_path, 'wb') as file:
+            file.write(os.urandom(size))
+        return file_path
+
+    def test_small_file_is_uploaded_with_a_single_request(self):
+        icon = self._write('icon.png', 1000)
+
+        uri = BlobUploader(self.sas_url).upload(icon)
+
+        self.assertEqual(
+            uri,
+            'http://127.0.0.1:{}/container/icon.png?sv=2018-03-28&sig=signature'.format(self.server.server_port))
+        self.assertEqual(self.server.requests, [('/container/icon.png', None, 1000)])
+
+    def test_large_file_is_uploaded_in_parallel_blocks(self):
+        script = self._write('script.csx', 2000)
+
+        BlobUploader(self.sas_url, max_connections=4).upload(script)
+
+        blocks = [request for request in self.server.requests if request[1] == 'block']
+        self.assertEqual(sorted(size for (_, _, size) in blocks), [208, 256, 256, 256, 256, 256, 256, 256])
+        self.assertEqual(self.server.requests[-1][:2], ('/container/script.csx', 'blocklist'))
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertLessEqual(self.server.max_in_flight, 4)
+
+    def test_uploads_share_the_connections(self):
+        uploader = BlobUploader(self.sas_url, max_connections=1)
+        for index in range(3):
+            uploader.upload(self._write('file{}.png'.format(index), 100))
+
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the files changed in a git working tree, and of the validation of the changed connectors.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+
+from knack.util import CLIError
+
+from paconn.cli import invoke
+from paconn.commands import validate
+from paconn.common import schemavalidation
+from paconn.common.gitchanges import get_changed_files
+
+_GIT_ENVIRONMENT = {
+    'GIT_AUTHOR_NAME': 'test',
+    'GIT_AUTHOR_EMAIL': 'test@example.com',
+    'GIT_COMMITTER_NAME': 'test',
+    'GIT_COMMITTER_EMAIL': 'test@example.com'
+}
+
+
+class _RepositoryTest(unittest.TestCase):
+    """
+    Creates a repository with a main branch.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.repository = os.path.realpath(self.directory.name)
+        self._git('init', '-q')
+        self._git('checkout', '-q', '-b', 'main')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _git(self, *arguments):
+        subprocess.run(
+            ['git'] + list(arguments),
+            cwd=self.repository,
+            env=dict(os.environ, **_GIT_ENVIRONMENT),
+            check=True,
+            stdout=subprocess.PIPE)
+
+    def _write(self, file_name, content='{}'):
+        file_path = os.path.join(self.repository, file_name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+    def _commit(self, message):
+        self._git('add', '-A')
+        self._git('commit', '-q', '-m', message)
+
+
+@unittest.skipUnless(shutil.which('git'), 'git is not installed')
+class GetChangedFilesTest(_RepositoryTest):
+    """
+    Tests the changes found since a revision in a repository
+    with a main branch and a feature branch.
+    """
+    def setUp(self):
+        super().setUp()
+        for file_name in ('unchanged.json', 'modified.json', 'deleted.json', 'renamed.json'):
+            self._write(file_name)
+        self._write(os.path.join('connector with spaces', 'apiDefinition.swagger.json'))
+        self._commit('base')
+        self._git('checkout', '-q', '-b', 'feature')
+
+    def _changed(self, revision='main', directory=None):
+        changed = get_changed_files(revision, directory or self.repository)
+        return sorted(os.path.relpath(file_path, self.repository) for file_path in changed)
+
+    def test_no_changes(self):
+        self.assertEqual(self._changed(), [])
+
+    def test_committed_uncommitted_and_untracked_changes(self):
+        self._write('modified.json', '{"committed": true}')
+        os.remove(os.path.join(self.repository, 'deleted.json'))
+        self._git('mv', 'renamed.json', 'moved.json')
+        self._commit('feature')
+        self._write(os.path.join('connector with spaces', 'apiDefinition.swagger.json'), '{"uncommitted": 1}')
+        self._write('untracked é.json')
+
+        self.assertEqual(self._changed(), sorted([
+            'modified.json',
+            'deleted.json',
+            'renamed.json',
+            'moved.json',
+            os.path.join('connector with spaces', 'apiDefinition.swagger.json'),
+            'untracked é.json'
+        ]))
+
+    def test_changes_on_the_revision_since_the_fork_are_ignored(self):
+        self._write('modified.json', '{"feature": true}')
+        self._commit('feature')
+        self._git('checkout', '-q', 'main')
+        self._write('unchanged.json', '{"main": true}')
+        self._commit('main')
+        self._git('checkout', '-q', 'feature')
+
+        self.assertEqual(self._changed(), ['modified.json'])
+
+    def test_paths_are_relative_to_the_top_level(self):
+        self._write('modified.json', '{"feature": true}')
+        subdirectory = os.path.join(self.repository, 'connector with spaces')
+
+        self.assertEqual(self._changed(directory=subdirectory), ['modified.json'])
+
+    def test_unknown_revision_raises_a_cli_error(self):
+        with self.assertRaises(CLIError):
+            get_changed_files('no-such-branch', self.repository)
+
+
+_API_DEFINITION = {
+    'swagger': '2.0',
+    'info': {'title': 'Contoso', 'description': 'Contoso connector', 'version': '1.0'},
+    'host': 'contoso.com',
+    'basePath': '/',
+    'schemes': ['https'],
+    'paths': {}
+}
+
+
+@unittest.skipUnless(shutil.which('git'), 'git is not installed')
+class ValidateChangedTest(_RepositoryTest):
+    """
+    Tests validate --changed-since with connectors naming their files in their settings.
+    """
+    def setUp(self):
+        super().setUp()
+        self.swagger = os.path.join('renamed', 'swagger', 'contoso.json')
+        self._write(self.swagger, json.dumps(_API_DEFINITION))
+        self._write(os.path.join('renamed', 'settings.json'), json.dumps({
+            'apiDefinition': os.path.join('swagger', 'contoso.json'),
+            'apiProperties': 'properties.json'
+        }))
+        # An invalid connector, which is only validated when it changes
+        self._write(os.path.join('invalid', 'apiDefinition.swagger.json'), json.dumps(dict(_API_DEFINITION, swagger=2)))
+        self._commit('base')
+        self._git('checkout', '-q', '-b', 'feature')
+
+        self.displayed = []
+        working_directory = os.getcwd()
+        os.chdir(self.repository)
+        self.addCleanup(os.chdir, working_directory)
+        for patcher in (mock.patch.dict(os.environ, {'HOME': self.repository}),
+                        mock.patch.dict(schemavalidation._VALIDATORS, clear=True),  # pylint: disable=protected-access
+                        mock.patch.object(validate, 'display', self.displayed.append)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _validate_changed(self):
+        return invoke(['validate', '--changed-since', 'main', '--local'])
+
+    def test_valid_change_to_a_file_named_in_the_settings(self):
+        self._write(self.swagger, json.dumps(dict(_API_DEFINITION, host='contoso.net')))
+
+        self.assertEqual(self._validate_changed(), 0)
+        self.assertEqual(self.displayed, [
+            'renamed: validated successfully.',
+            '1 connector(s) validated, 0 failed.'
+        ])
+
+    def test_invalid_change_to_a_file_named_in_the_settings(self):
+        self._write(self.swagger, json.dumps(dict(_API_DEFINITION, swagger=2)))
+        self._commit('feature')
+
+        self.assertNotEqual(self._validate_changed(), 0)
+        self.assertTrue(self.displayed[0].startswith('renamed:\n'))
+        self.assertEqual(self.displayed[-1], '1 connector(s) validated, 1 failed.')
+
+    def test_files_the_settings_dont_name_dont_change_the_connector(self):
+        self._write(os.path.join('renamed', 'apiDefinition.swagger.json'), json.dumps(_API_DEFINITION))
+
+        self.assertEqual(self._validate_changed(), 0)
+        self.assertEqual(self.displayed, ['No connector changed since main.'])
+
+
+if __name__ == '__main__':
+    unittest.main()
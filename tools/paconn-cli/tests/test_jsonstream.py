@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the incremental parsing of streamed JSON documents.
+"""
+
+import json
+import codecs
+import unittest
+
+from paconn.common.jsonstream import iter_json_array
+
+_DOCUMENT = {
+    'count': 12345678901234567890,
+    'value': [
+        {
+            'name': 'quote " and backslash \\ and slash /',
+            'escapes': '\n\t\r\b\f\u0001',
+            'unicode': 'café \U0001F600 中文',
+            'numbers': [0, -1, 1.5, -2.25e-10, 6.02e23, 123456789],
+            'literals': [True, False, None]
+        },
+        [[1, [2, [3, []]]], {'nested': {'deep': [{'deeper': []}]}}],
+        'a string item',
+        1234567,
+        -0.5e+3,
+        {}
+    ],
+    'nextLink': 'https://api.example.com/apis?$skiptoken=abc%22def'
+}
+
+
+def _split(data, size):
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+def _parse(data, size, array_key='value'):
+    members = {}
+    items = list(iter_json_array(_split(data, size), array_key, members))
+    return items, members
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    """
+    Tests the items and members parsed for every chunk boundary.
+    """
+    def _assert_parsed(self, document, data):
+        expected_members = {key: value for (key, value) in document.items() if key != 'value'}
+        for size in range(1, len(data) + 1):
+            (items, members) = _parse(data, size)
+            self.assertEqual(items, document.get('value', []), 'chunk size {}'.format(size))
+            self.assertEqual(members, expected_members, 'chunk size {}'.format(size))
+
+    def test_every_chunk_boundary_with_escaped_output(self):
+        self._assert_parsed(_DOCUMENT, json.dumps(_DOCUMENT).encode('utf-8'))
+
+    def test_every_chunk_boundary_with_raw_utf8(self):
+        # Multi-byte characters are split across chunks too
+        self._assert_parsed(_DOCUMENT, json.dumps(_DOCUMENT, ensure_ascii=False).encode('utf-8'))
+
+    def test_every_chunk_boundary_with_whitespace(self):
+        self._assert_parsed(_DOCUMENT, json.dumps(_DOCUMENT, indent=4).encode('utf-8'))
+
+    def test_number_split_at_the_end_of_a_chunk(self):
+        data = b'{"value": [1234567890, 98.765e-4]}'
+        for size in range(1, len(data) + 1):
+            self.assertEqual(_parse(data, size)[0], [1234567890, 98.765e-4])
+
+    def test_byte_order_mark(self):
+        data = codecs.BOM_UTF8 + b'{"value": ["\xc3\xa9"]}'
+        for size in range(1, len(data) + 1):
+            self.assertEqual(_parse(data, size)[0], ['é'])
+
+    def test_empty_documents(self):
+        self.assertEqual(_parse(b'{}', 1), ([], {}))
+        self.assertEqual(_parse(b'{"value": []}', 1), ([], {}))
+        self.assertEqual(_parse(b'{"other": [1, 2]}', 3), ([], {'other': [1, 2]}))
+
+    def test_items_are_yielded_before_the_end_of_the_stream(self):
+        def chunks():
+            yield b'{"value": [{"name": "first"}, '
+            raise AssertionError('Read past the first item')
+
+        self.assertEqual(next(iter_json_array(chunks(), 'value')), {'name': 'first'})
+
+    def test_truncated_documents_are_rejected(self):
+        data = json.dumps(_DOCUMENT).encode('utf-8')
+        for end in (0, 1, len(data) // 3, len(data) // 2, len(data) - 1):
+            with self.assertRaises(ValueError, msg='truncated at {}'.format(end)):
+                _parse(data[:end], 7)
+
+    def test_malformed_documents_are_rejected(self):
+        for data in (b'[1, 2]', b'{"value": [1 2]}', b'{"value": [1], "other" 2}', b'{"value": [1]; }'):
+            with self.assertRaises(ValueError, msg=data):
+                _parse(data, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests that the JSON facade writes and reads like the standard library with both backends.
+"""
+
+import json
+import unittest
+from unittest import mock
+
+from paconn.common import jsonutil
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_DOCUMENTS = {
+    'non ascii': {
+        'title': 'Café Crème',
+        'emoji': '\U0001F600 ☃',
+        'scripts': ['中文', 'русский', 'العربية'],
+        'noncharacter': '\uffff\U0010ffff'
+    },
+    'control characters': {
+        'escapes': '\n\t\r\b\f"\\/',
+        'controls': ''.join(chr(code) for code in range(0x20)),
+        'delete': 'before\x7fafter',
+        'c1': '\x80\x9f\xa0'
+    },
+    'floats': {
+        'plain': [0.1, 1.5, -2.25, 100.0, -0.0, 123456.789, 5e-324],
+        'nested': {'ratio': [[0.30000000000000004]]}
+    },
+    'float exponents': {
+        'values': [1e16, 1.7976931348623157e308, 1e-7, 6.02e23, 1e22]
+    },
+    'non finite floats': {
+        'values': [float('nan'), float('inf'), float('-inf')]
+    },
+    'integers': {
+        'int64': [9223372036854775807, -9223372036854775808],
+        'uint64': 18446744073709551615,
+        'above 64 bits': [18446744073709551616, -9223372036854775809, 2 ** 200]
+    },
+    'key order': {
+        'zeta': 1,
+        'alpha': {'delta': [], 'beta': {}, 'Gamma': None},
+        'Beta': [{'b': True, 'a': False}],
+        '10': 'ten',
+        '9': 'nine',
+        'é': 'accent'
+    }
+}
+
+_ARGUMENTS = [
+    {},
+    {'sort_keys': True},
+    {'indent': 2},
+    {'indent': 2, 'sort_keys': True},
+    {'indent': 4},
+    {'sort_keys': True, 'ensure_ascii': False},
+    {'indent': 2, 'ensure_ascii': False}
+]
+
+
+def _stdlib_dumps(content, sort_keys=False, indent=None, ensure_ascii=True):
+    return json.dumps(
+        content,
+        sort_keys=sort_keys,
+        indent=indent,
+        ensure_ascii=ensure_ascii,
+        separators=(',', ': ') if indent else (',', ':'))
+
+
+class _BackendTest:
+    """
+    Compares the facade with the standard library, using the backend of the subclass.
+    """
+    backend = None
+
+    def setUp(self):
+        patcher = mock.patch.multiple(jsonutil, _ORJSON=self.backend, _ORJSON_LOADED=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_dumps_is_identical_to_the_standard_library(self):
+        for (name, document) in _DOCUMENTS.items():
+            for arguments in _ARGUMENTS:
+                with self.subTest(document=name, **arguments):
+                    self.assertEqual(jsonutil.dumps(document, **arguments), _stdlib_dumps(document, **arguments))
+
+    def test_loads_is_identical_to_the_standard_library(self):
+        for (name, document) in _DOCUMENTS.items():
+            data = _stdlib_dumps(document, indent=2)
+            with self.subTest(document=name):
+                # NaN isn't equal to itself, compare the serializations
+                self.assertEqual(
+                    _stdlib_dumps(jsonutil.loads(data)),
+                    _stdlib_dumps(json.loads(data)))
+                self.assertEqual(
+                    _stdlib_dumps(jsonutil.loads(data.encode('utf-8'))),
+                    _stdlib_dumps(json.loads(data)))
+
+    def test_large_integers_keep_their_type(self):
+        document = jsonutil.loads('{"big": 18446744073709551616, "small": 1}')
+
+        self.assertEqual(document, {'big': 18446744073709551616, 'small': 1})
+        self.assertIsInstance(document['big'], int)
+
+
+class StdlibBackendTest(_BackendTest, unittest.TestCase):
+    """
+    Tests the standard library backend.
+    """
+    backend = None
+
+
+@unittest.skipUnless(orjson, 'orjson is not installed')
+class OrjsonBackendTest(_BackendTest, unittest.TestCase):
+    """
+    Tests the orjson backend.
+    """
+    backend = orjson
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the ledger.
+"""
+
+import os
+import time
+import tempfile
+import unittest
+
+from paconn.common.ledger import Ledger, LEDGER_FILE, API_DEFINITION, ICON, SCRIPT, DEPLOYED_AT
+from paconn.common.ledger import URI_BUFFER_SECONDS
+
+SERVICE_URL = 'https://api.powerapps.com'
+
+
+class LedgerTest(unittest.TestCase):
+    """
+    Tests the creation and the recovery of the ledger.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.ledger_file = os.path.join(self.directory.name, LEDGER_FILE)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, file_name, content):
+        with open(os.path.join(self.directory.name, file_name), 'wb') as file:
+            file.write(content)
+
+    def test_deployment_round_trip(self):
+        ledger = Ledger(self.ledger_file)
+        ledger.set_deployment(SERVICE_URL, 'environment', 'connector', {API_DEFINITION: 'hash'})
+
+        deployment = ledger.get_deployment(SERVICE_URL, 'environment', 'connector')
+
+        self.assertEqual(deployment[API_DEFINITION], 'hash')
+        self.assertIn(DEPLOYED_AT, deployment)
+        self.assertIsNone(ledger.get_deployment(SERVICE_URL, 'environment', 'other'))
+
+    def test_deployments_of_other_services_are_apart(self):
+        ledger = Ledger(self.ledger_file)
+        ledger.set_deployment(SERVICE_URL, 'environment', 'connector', {API_DEFINITION: 'hash'})
+
+        self.assertIsNone(ledger.get_deployment('https://api.powerapps.us', 'environment', 'connector'))
+
+    def test_corrupt_ledger_is_discarded_with_its_log(self):
+        self._write(LEDGER_FILE, b'not a database' * 100)
+        self._write(LEDGER_FILE + '-wal', b'stale log' * 100)
+        self._write(LEDGER_FILE + '-shm', b'stale index' * 100)
+
+        ledger = Ledger(self.ledger_file)
+        ledger.set_deployment(SERVICE_URL, 'environment', 'connector', {API_DEFINITION: 'hash'})
+
+        self.assertEqual(ledger.get_deployment(SERVICE_URL, 'environment', 'connector')[API_DEFINITION], 'hash')
+
+    def test_upload_uri_of_the_same_content_is_reused(self):
+        uri = 'https://storage.blob.core.windows.net/container/icon.png?se=2099-01-01T00:00:00Z&sig=signature'
+        ledger = Ledger(self.ledger_file)
+        ledger.set_upload_uri(SERVICE_URL, 'environment', 'connector', ICON, 'hash', uri)
+
+        self.assertEqual(ledger.get_upload_uri(SERVICE_URL, 'environment', 'connector', ICON, 'hash'), uri)
+        self.assertIsNone(ledger.get_upload_uri(SERVICE_URL, 'environment', 'connector', ICON, 'other'))
+        self.assertIsNone(ledger.get_upload_uri(SERVICE_URL, 'environment', 'other', ICON, 'hash'))
+        self.assertIsNone(ledger.get_upload_uri(SERVICE_URL, 'environment', None, ICON, 'hash'))
+
+    def test_upload_uri_expiring_soon_is_not_reused(self):
+        expiry = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() + URI_BUFFER_SECONDS / 2))
+        ledger = Ledger(self.ledger_file)
+        for (part, uri) in ((ICON, 'https://storage.blob.core.windows.net/icon.png?se={}'.format(expiry)),
+                            (SCRIPT, 'https://storage.blob.core.windows.net/script.csx')):
+            ledger.set_upload_uri(SERVICE_URL, 'environment', 'connector', part, 'hash', uri)
+
+            self.assertIsNone(ledger.get_upload_uri(SERVICE_URL, 'environment', 'connector', part, 'hash'))
+
+
+if __name__ == '__main__':
+    unittest.main()
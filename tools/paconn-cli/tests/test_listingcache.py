@@ -0,0 +1,134 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the time bound cache of the environment and connector listings.
+"""
+
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+from paconn.apimanager.apimanager import APIManager
+from paconn.common import filecache, listingcache, prompts
+from paconn.common.listingcache import (
+    get_listing,
+    set_listing,
+    invalidate_listing,
+    get_cached_names,
+    ENVIRONMENTS,
+    CONNECTORS,
+    LISTING_TTL_SECONDS
+)
+
+
+def _get_api_manager(tenant='tenant', netlocation='api.powerapps.com'):
+    return APIManager(
+        scheme='https',
+        region=None,
+        netlocation=netlocation,
+        base_path='/',
+        api_version='1',
+        credentials={'tenant_id': tenant})
+
+
+class _PowerAppsRP:
+    """
+    Lists the given custom connectors.
+    """
+    def __init__(self, connector_ids):
+        self.api_manager = _get_api_manager()
+        self.connector_ids = connector_ids
+        self.listings = 0
+
+    def iter_connectors(self, environment, properties=None):  # pylint: disable=unused-argument
+        self.listings += 1
+        for connector_id in self.connector_ids:
+            yield {
+                'name': connector_id,
+                'properties': {
+                    'displayName': connector_id.title(),
+                    'createdBy': {'displayName': 'Contoso'},
+                    'isCustomApi': True
+                }
+            }
+
+
+class ListingCacheTest(unittest.TestCase):
+    """
+    Tests the cache hits, the expiry and the invalidation of the listings.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.now = time.time()
+        for patcher in (mock.patch.dict(os.environ, {'HOME': self.directory.name}),
+                        mock.patch.dict(filecache._CACHES, clear=True),  # pylint: disable=protected-access
+                        mock.patch.object(listingcache.time, 'time', lambda: self.now),
+                        mock.patch.object(prompts, 'prompt_choice_list', return_value=0),
+                        mock.patch.object(prompts, 'print', create=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_prompt_uses_the_cached_listing(self):
+        powerapps_rp = _PowerAppsRP(['first', 'second'])
+
+        self.assertEqual(prompts.get_connector_id(powerapps_rp, 'environment'), 'first')
+        self.assertEqual(prompts.get_connector_id(powerapps_rp, 'environment'), 'first')
+        self.assertEqual(powerapps_rp.listings, 1)
+
+        # The listings are cached per environment
+        prompts.get_connector_id(powerapps_rp, 'other')
+        self.assertEqual(powerapps_rp.listings, 2)
+
+    def test_expired_listing_is_listed_again(self):
+        powerapps_rp = _PowerAppsRP(['first'])
+        prompts.get_connector_id(powerapps_rp, 'environment')
+
+        self.now += LISTING_TTL_SECONDS
+        prompts.get_connector_id(powerapps_rp, 'environment')
+        self.assertEqual(powerapps_rp.listings, 1)
+
+        self.now += 1
+        prompts.get_connector_id(powerapps_rp, 'environment')
+        self.assertEqual(powerapps_rp.listings, 2)
+
+    def test_invalidated_listing_is_listed_again(self):
+        powerapps_rp = _PowerAppsRP(['second'])
+        prompts.get_connector_id(powerapps_rp, 'environment')
+
+        # A connector created since
+        powerapps_rp.connector_ids = ['first', 'second']
+        invalidate_listing(powerapps_rp.api_manager, CONNECTORS, 'environment')
+
+        self.assertEqual(prompts.get_connector_id(powerapps_rp, 'environment'), 'first')
+        self.assertEqual(powerapps_rp.listings, 2)
+
+    def test_listings_of_other_tenants_and_services_are_apart(self):
+        set_listing(_get_api_manager(), ENVIRONMENTS, [('Default', 'default')])
+
+        self.assertEqual(get_listing(_get_api_manager(), ENVIRONMENTS), [['Default', 'default']])
+        self.assertIsNone(get_listing(_get_api_manager(tenant='other'), ENVIRONMENTS))
+        self.assertIsNone(get_listing(_get_api_manager(netlocation='api.powerapps.us'), ENVIRONMENTS))
+
+    def test_completion_reads_the_fresh_names_of_the_tenant(self):
+        set_listing(_get_api_manager(), CONNECTORS, [('First', 'first')], 'environment')
+        set_listing(_get_api_manager(), CONNECTORS, [('Second', 'second')], 'other')
+        set_listing(_get_api_manager(tenant='other'), CONNECTORS, [('Third', 'third')], 'environment')
+
+        credentials = {'tenant_id': 'tenant'}
+        self.assertEqual(get_cached_names(credentials, CONNECTORS), ['first', 'second'])
+        self.assertEqual(get_cached_names(credentials, CONNECTORS, 'environment'), ['first'])
+
+        self.now += LISTING_TTL_SECONDS + 1
+        self.assertEqual(get_cached_names(credentials, CONNECTORS), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the connector listing of the PowerApps RP.
+"""
+
+import json
+import unittest
+
+from knack.util import CLIError
+from requests.exceptions import ChunkedEncodingError
+
+from paconn.apimanager.powerappsrp import PowerAppsRP
+
+_FIRST_PAGE = 'https://api.example.com/apis?page=1'
+
+
+class _Response:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def iter_content(self, chunk_size):  # pylint: disable=unused-argument
+        for chunk in self.chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class _APIManager:
+    """
+    Serves the pages by URL and records the requested URLs.
+    """
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def construct_url(self, path, query=None):  # pylint: disable=unused-argument
+        return _FIRST_PAGE
+
+    def request(self, verb, endpoint, headers=None, stream=False):  # pylint: disable=unused-argument
+        self.requested.append(endpoint)
+        return _Response(self.pages[endpoint])
+
+
+def _page(names, next_link=None):
+    page = {'value': [{'name': name, 'properties': {'displayName': name, 'isCustomApi': True}} for name in names]}
+    if next_link:
+        page['nextLink'] = next_link
+    data = json.dumps(page).encode('utf-8')
+    return [data[index:index + 5] for index in range(0, len(data), 5)]
+
+
+class IterConnectorsTest(unittest.TestCase):
+    """
+    Tests the paging and the errors of a streamed listing.
+    """
+    def test_next_links_are_followed(self):
+        api_manager = _APIManager({
+            _FIRST_PAGE: _page(['a', 'b'], 'https://api.example.com/apis?page=2'),
+            'https://api.example.com/apis?page=2': _page([], 'https://api.example.com/apis?page=3'),
+            'https://api.example.com/apis?page=3': _page(['c'])
+        })
+
+        connectors = list(PowerAppsRP(api_manager).iter_connectors('environment', properties=['isCustomApi']))
+
+        self.assertEqual([connector['name'] for connector in connectors], ['a', 'b', 'c'])
+        self.assertEqual(connectors[0]['properties'], {'isCustomApi': True})
+        self.assertEqual(len(api_manager.requested), 3)
+
+    def test_dropped_connection_raises_a_cli_error(self):
+        chunks = _page(['a', 'b'])[:3] + [ChunkedEncodingError('Connection broken')]
+        api_manager = _APIManager({_FIRST_PAGE: chunks})
+
+        with self.assertRaises(CLIError):
+            list(PowerAppsRP(api_manager).iter_connectors('environment'))
+
+    def test_truncated_listing_raises_a_cli_error(self):
+        api_manager = _APIManager({_FIRST_PAGE: _page(['a', 'b'])[:-2]})
+
+        with self.assertRaises(CLIError):
+            list(PowerAppsRP(api_manager).iter_connectors('environment'))
+
+
+if __name__ == '__main__':
+    unittest.main()
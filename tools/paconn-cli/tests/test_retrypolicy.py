@@ -0,0 +1,109 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the retry policy and the rate limiter.
+"""
+
+import time
+import unittest
+from email.utils import formatdate
+
+from paconn.apimanager.retrypolicy import RetryPolicy, get_retry_after
+from paconn.apimanager.ratelimiter import RateLimiter
+
+
+class _Response:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {'Retry-After': retry_after} if retry_after is not None else {}
+
+
+class RetryPolicyTest(unittest.TestCase):
+    """
+    Tests which failures are retried, and after which delay.
+    """
+    def setUp(self):
+        self.policy = RetryPolicy(max_retries=3, backoff_factor=1, max_backoff=5, max_retry_after=60)
+
+    def test_throttled_requests_are_always_retried(self):
+        self.assertIsNotNone(self.policy.get_delay('POST', 0, _Response(429)))
+        self.assertIsNotNone(self.policy.get_delay('GET', 0, _Response(429)))
+
+    def test_server_errors_only_retry_idempotent_requests(self):
+        self.assertIsNotNone(self.policy.get_delay('PATCH', 0, _Response(503)))
+        self.assertIsNone(self.policy.get_delay('POST', 0, _Response(503)))
+
+    def test_connection_errors_only_retry_idempotent_requests(self):
+        self.assertIsNotNone(self.policy.get_delay('GET', 0))
+        self.assertIsNone(self.policy.get_delay('POST', 0))
+
+    def test_client_errors_are_not_retried(self):
+        for status_code in (400, 401, 404, 409):
+            self.assertIsNone(self.policy.get_delay('GET', 0, _Response(status_code)))
+
+    def test_retries_are_limited(self):
+        self.assertIsNotNone(self.policy.get_delay('GET', 2, _Response(503)))
+        self.assertIsNone(self.policy.get_delay('GET', 3, _Response(503)))
+
+    def test_backoff_grows_up_to_the_maximum(self):
+        for attempt in range(10):
+            delay = self.policy.get_backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(5, 2 ** attempt))
+
+    def test_retry_after_is_used(self):
+        self.assertEqual(self.policy.get_delay('POST', 0, _Response(429, '7')), 7)
+
+    def test_retry_after_above_the_maximum_fails(self):
+        self.assertIsNone(self.policy.get_delay('GET', 0, _Response(429, '600')))
+
+    def test_retry_after_formats(self):
+        self.assertEqual(get_retry_after(_Response(429, '1.5')), 1.5)
+        self.assertEqual(get_retry_after(_Response(429, '-3')), 0)
+        self.assertIsNone(get_retry_after(_Response(429, 'soon')))
+        self.assertIsNone(get_retry_after(_Response(429)))
+        self.assertIsNone(get_retry_after(None))
+
+        delay = get_retry_after(_Response(429, formatdate(time.time() + 30, usegmt=True)))
+        self.assertTrue(25 <= delay <= 30, delay)
+
+
+class RateLimiterTest(unittest.TestCase):
+    """
+    Tests the rate and the pauses of the rate limiter.
+    """
+    def test_without_rate_requests_are_not_held_back(self):
+        limiter = RateLimiter()
+        start = time.monotonic()
+        for _ in range(1000):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_requests_are_spread_at_the_rate(self):
+        limiter = RateLimiter(rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        # The first request uses the burst, the next four wait 50 ms each
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_burst_is_sent_at_once(self):
+        limiter = RateLimiter(rate=1, burst=5)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_pause_holds_back_the_requests(self):
+        limiter = RateLimiter()
+        limiter.pause(0.2)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the local scan and of the discovery of the changed connectors.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from paconn.cli import invoke
+from paconn.common import schemavalidation
+from paconn.operations.batch import filter_changed
+from paconn.operations.scan import find_changed_connectors, get_connector_files, scan_connector
+
+_API_PROPERTIES = {'properties': {'iconBrandColor': '#007ee5', 'capabilities': []}}
+_API_DEFINITION = {
+    'swagger': '2.0',
+    'info': {'title': 'Contoso', 'description': 'Contoso connector', 'version': '1.0'},
+    'host': 'contoso.com',
+    'basePath': '/',
+    'schemes': ['https'],
+    'paths': {}
+}
+
+
+class ChangedConnectorsTest(unittest.TestCase):
+    """
+    Tests that validate and update find the same changed connectors,
+    with default and renamed connector files.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self.directory.name)
+
+        # A connector with the default file names, and one renaming its files in its settings
+        self.default = os.path.join(self.root, 'default')
+        self._write(os.path.join(self.default, 'apiDefinition.swagger.json'))
+        self._write(os.path.join(self.default, 'apiProperties.json'))
+        self._write(os.path.join(self.default, 'settings.json'), {'environment': 'environment'})
+
+        self.renamed = os.path.join(self.root, 'renamed')
+        self._write(os.path.join(self.renamed, 'swagger', 'contoso.json'))
+        self._write(os.path.join(self.renamed, 'properties.json'))
+        self._write(os.path.join(self.renamed, 'contoso.png'))
+        self._write(os.path.join(self.renamed, 'settings.json'), {
+            'environment': 'environment',
+            'apiDefinition': os.path.join('swagger', 'contoso.json'),
+            'apiProperties': 'properties.json',
+            'icon': 'contoso.png'
+        })
+
+        self.settings_files = [os.path.join(self.default, 'settings.json'), os.path.join(self.renamed, 'settings.json')]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def _write(file_path, content=None):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as file:
+            json.dump(content or {}, file)
+
+    def _changed(self, *file_names):
+        changed_files = [os.path.join(self.root, file_name) for file_name in file_names]
+        validated = find_changed_connectors(self.root, changed_files)
+        updated = [os.path.dirname(file_path) for file_path in filter_changed(self.settings_files, changed_files)]
+        self.assertEqual(validated, sorted(updated))
+        return [os.path.relpath(directory, self.root) for directory in validated]
+
+    def test_renamed_files_are_named_by_the_settings(self):
+        self.assertEqual(
+            get_connector_files(self.renamed),
+            (os.path.join(self.renamed, 'swagger', 'contoso.json'),
+             os.path.join(self.renamed, 'properties.json'),
+             os.path.join(self.renamed, 'contoso.png'),
+             None))
+
+    def test_changed_renamed_files(self):
+        self.assertEqual(self._changed(os.path.join('renamed', 'swagger', 'contoso.json')), ['renamed'])
+        self.assertEqual(self._changed(os.path.join('renamed', 'contoso.png')), ['renamed'])
+
+    def test_changed_settings_and_default_files(self):
+        self.assertEqual(
+            self._changed(os.path.join('default', 'apiProperties.json'), os.path.join('renamed', 'settings.json')),
+            ['default', 'renamed'])
+
+    def test_files_the_settings_dont_name_are_ignored(self):
+        self.assertEqual(self._changed(os.path.join('renamed', 'apiDefinition.swagger.json')), [])
+        self.assertEqual(self._changed(os.path.join('default', 'README.md')), [])
+
+    def test_directories_without_settings_use_the_default_names(self):
+        other = os.path.join(self.root, 'other')
+        self._write(os.path.join(other, 'apiDefinition.swagger.json'))
+
+        changed_files = [os.path.join(other, 'icon.png')]
+
+        self.assertEqual(find_changed_connectors(self.root, changed_files), [other])
+
+
+class ScanTest(unittest.TestCase):
+    """
+    Tests the local scan of clean, invalid and renamed connectors.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, 'connectors')
+
+        # The compiled schemas are written under the home directory
+        patcher = mock.patch.dict(os.environ, {'HOME': self.directory.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(schemavalidation._VALIDATORS, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_connector(self, name, files):
+        directory = os.path.join(self.root, name)
+        for (file_name, content) in files.items():
+            file_path = os.path.join(directory, file_name)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w') as file:
+                json.dump(content, file)
+        return directory
+
+    def _write_clean_connector(self, name):
+        return self._write_connector(name, {
+            'apiDefinition.swagger.json': _API_DEFINITION,
+            'apiProperties.json': _API_PROPERTIES
+        })
+
+    def test_clean_connector(self):
+        directory = self._write_clean_connector('clean')
+
+        self.assertEqual(scan_connector(directory), [])
+        self.assertEqual(invoke(['scan', self.root, '--workers', '1']), 0)
+
+    def test_connector_with_schema_errors(self):
+        self._write_clean_connector('clean')
+        directory = self._write_connector('invalid', {
+            'apiDefinition.swagger.json': dict(_API_DEFINITION, swagger=2),
+            'apiProperties.json': _API_PROPERTIES
+        })
+
+        errors = scan_connector(directory)
+
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('apiDefinition.swagger.json: '))
+        self.assertNotEqual(invoke(['scan', self.root, '--workers', '1']), 0)
+
+    def test_connector_with_renamed_files(self):
+        settings = {
+            'apiDefinition': os.path.join('swagger', 'contoso.json'),
+            'apiProperties': 'properties.json'
+        }
+        directory = self._write_connector('renamed', {
+            os.path.join('swagger', 'contoso.json'): _API_DEFINITION,
+            'properties.json': _API_PROPERTIES,
+            'settings.json': settings
+        })
+
+        self.assertEqual(scan_connector(directory), [])
+        self.assertEqual(invoke(['scan', self.root, '--workers', '1']), 0)
+
+        # The renamed files are checked, rather than reported missing
+        self._write_connector('renamed', {'properties.json': {'properties': []}})
+
+        errors = scan_connector(directory)
+
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('properties.json: '))
+        self.assertNotEqual(invoke(['scan', self.root, '--workers', '1']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the connection pooled HTTP session.
+"""
+
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from paconn import _VALIDATE
+from paconn.apimanager import session as sessions
+from paconn.apimanager.apimanager import APIManager
+from paconn.settings import util
+from paconn.settings.settings import Settings
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Answers every request with an empty JSON object, recording the client port of the requests.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.client_ports.append(self.client_address[1])
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class SessionTest(unittest.TestCase):
+    """
+    Tests the reuse of the connections and of the shared sessions.
+    """
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.client_ports = []
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+
+        patcher = mock.patch.dict(sessions._SESSIONS, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get(self, session, count):
+        api_manager = APIManager(
+            scheme='http',
+            region=None,
+            netlocation='127.0.0.1:{}'.format(self.server.server_port),
+            base_path='/',
+            api_version='1',
+            session=session)
+        for _ in range(count):
+            api_manager.request('GET', api_manager.construct_url('connectors'))
+
+    def test_consecutive_requests_reuse_the_connection(self):
+        session = sessions.create_session()
+        self._get(session, 3)
+        session.close()
+
+        self.assertEqual(len(self.server.client_ports), 3)
+        self.assertEqual(len(set(self.server.client_ports)), 1)
+
+    def test_requests_without_keep_alive_open_a_connection_each(self):
+        session = sessions.create_session(keep_alive=False)
+        self._get(session, 3)
+        session.close()
+
+        self.assertEqual(len(set(self.server.client_ports)), 3)
+
+    def test_pool_size_is_configured(self):
+        session = sessions.create_session(pool_connections=2, pool_maxsize=5, pool_block=True)
+
+        for prefix in ('https://', 'http://'):
+            adapter = session.get_adapter(prefix + 'api.example.com')
+            self.assertEqual(adapter._pool_connections, 2)  # pylint: disable=protected-access
+            self.assertEqual(adapter._pool_maxsize, 5)  # pylint: disable=protected-access
+            self.assertTrue(adapter._pool_block)  # pylint: disable=protected-access
+
+    def test_shared_session_per_pool_size(self):
+        session = sessions.get_shared_session()
+
+        self.assertIs(sessions.get_shared_session(), session)
+        self.assertIsNot(sessions.get_shared_session(pool_maxsize=32), session)
+
+    def test_powerapps_and_flow_rps_share_the_session(self):
+        settings = Settings(
+            connector_id=None,
+            environment=None,
+            api_properties=None,
+            api_definition=None,
+            icon=None,
+            script=None,
+            powerapps_url=None,
+            powerapps_api_version=None)
+
+        with mock.patch.object(util, 'load_credentials', return_value={}):
+            (powerapps_rp, flow_rp) = util.load_powerapps_and_flow_rp(settings, _VALIDATE, max_workers=32)
+
+        self.assertIs(powerapps_rp.api_manager.session, flow_rp.api_manager.session)
+        self.assertIs(powerapps_rp.api_manager.session, sessions.get_shared_session(pool_maxsize=32))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the task graph.
+"""
+
+import threading
+import unittest
+
+from paconn.common import cancellation
+from paconn.common.taskgraph import TaskGraph
+
+
+class TaskGraphTest(unittest.TestCase):
+    """
+    Tests the order, the inputs and the failures of the tasks.
+    """
+    def test_inputs_are_mapped_to_arguments(self):
+        tasks = TaskGraph()
+        tasks.add('resource storage', lambda: 'sas')
+        tasks.add('icon', lambda storage: storage + '/icon', inputs={'storage': 'resource storage'})
+
+        results = tasks.run()
+
+        self.assertEqual(results, {'resource storage': 'sas', 'icon': 'sas/icon'})
+
+    def test_dependencies_order_without_passing_results(self):
+        order = []
+        tasks = TaskGraph()
+        tasks.add('first', lambda: order.append('first'))
+        tasks.add('second', lambda: order.append('second'), ['first'])
+
+        tasks.run()
+
+        self.assertEqual(order, ['first', 'second'])
+
+    def test_independent_tasks_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        tasks = TaskGraph()
+        tasks.add('validation', barrier.wait)
+        tasks.add('upload', barrier.wait)
+
+        # Both tasks would time out waiting at the barrier if they ran one after the other
+        self.assertEqual(set(tasks.run()), {'validation', 'upload'})
+
+    def test_unknown_and_duplicate_tasks_are_rejected(self):
+        tasks = TaskGraph()
+        tasks.add('storage', lambda: None)
+        with self.assertRaises(ValueError):
+            tasks.add('storage', lambda: None)
+        with self.assertRaises(ValueError):
+            tasks.add('upload', lambda storage: None, inputs={'storage': 'missing'})
+
+    def test_failure_stops_the_dependent_tasks(self):
+        called = []
+
+        def fail():
+            raise RuntimeError('storage failed')
+
+        tasks = TaskGraph()
+        tasks.add('storage', fail)
+        tasks.add('upload', lambda storage: called.append(storage), inputs={'storage': 'storage'})
+
+        with self.assertRaises(RuntimeError):
+            tasks.run()
+        self.assertEqual(called, [])
+
+    def test_cancellation_stops_the_next_tasks(self):
+        called = []
+        tasks = TaskGraph()
+        tasks.add('storage', cancellation.cancel)
+        tasks.add('upload', lambda: called.append('upload'), ['storage'])
+
+        try:
+            with self.assertRaises(cancellation.CommandCancelled):
+                tasks.run()
+        finally:
+            cancellation.reset()
+        self.assertEqual(called, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
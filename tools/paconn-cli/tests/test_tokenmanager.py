@@ -0,0 +1,117 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the token renewal.
+"""
+
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+from knack.util import CLIError
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from paconn.settings.settings import Settings
+from paconn.authentication import tokenmanager
+from paconn.authentication.tokenmanager import TokenManager, TokenRefresher, _LOGIN_SETTINGS
+
+
+def _get_settings(tenant=None, client_id=None):
+    return Settings(
+        connector_id=None,
+        environment=None,
+        powerapps_url=None,
+        powerapps_api_version=None,
+        api_properties=None,
+        api_definition=None,
+        icon=None,
+        script=None,
+        client_id=client_id,
+        tenant=tenant)
+
+
+class RefreshTest(unittest.TestCase):
+    """
+    Tests the profile a token is renewed with.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.token_manager = TokenManager()
+        self.token_manager.token_file = os.path.join(self.directory.name, 'accessTokens.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _refresh(self, credentials, settings):
+        token = {'access_token': 'renewed', 'expires_on': time.time() + 3600}
+        with mock.patch('paconn.authentication.profile.Profile') as profile_class:
+            profile_class.return_value.authenticate_refresh_token.return_value = token
+            refreshed = self.token_manager.refresh(credentials, settings)
+        return refreshed, profile_class.call_args[1]
+
+    def test_refresh_uses_the_login_settings(self):
+        login_settings = TokenManager.get_login_settings(_get_settings(tenant='contoso', client_id='client'))
+        credentials = {'access_token': 'expired', 'refresh_token': 'refresh', _LOGIN_SETTINGS: login_settings}
+
+        (refreshed, profile) = self._refresh(credentials, _get_settings())
+
+        self.assertEqual(profile['tenant'], 'contoso')
+        self.assertEqual(profile['client_id'], 'client')
+        self.assertEqual(refreshed['access_token'], 'renewed')
+        self.assertEqual(self.token_manager.read()[_LOGIN_SETTINGS], login_settings)
+
+    def test_refresh_without_login_settings_uses_the_settings(self):
+        credentials = {'access_token': 'expired', 'refresh_token': 'refresh'}
+
+        (_, profile) = self._refresh(credentials, _get_settings(tenant='fabrikam'))
+
+        self.assertEqual(profile['tenant'], 'fabrikam')
+
+    def test_unreachable_service_asks_to_login_again(self):
+        credentials = {'access_token': 'expired', 'refresh_token': 'refresh', 'expires_on': time.time() - 60}
+        self.token_manager.write(credentials)
+
+        with mock.patch('paconn.authentication.profile.Profile') as profile_class:
+            profile_class.return_value.authenticate_refresh_token.side_effect = RequestsConnectionError('offline')
+            with self.assertRaises(CLIError) as context:
+                self.token_manager.get_credentials(_get_settings())
+
+        self.assertEqual(str(context.exception), 'Access token invalid. Please login again.')
+        self.assertEqual(self.token_manager.read(), credentials)
+
+
+class TokenRefresherTest(unittest.TestCase):
+    """
+    Tests the background token renewal.
+    """
+    def test_failed_refresh_is_retried(self):
+        credentials = {'access_token': 'expiring', 'refresh_token': 'refresh', 'expires_on': time.time() + 1}
+        renewed = {'access_token': 'renewed', 'refresh_token': 'refresh', 'expires_on': time.time() + 3600}
+
+        token_manager = mock.Mock()
+        refresher = TokenRefresher(credentials, _get_settings(), token_manager)
+
+        def refresh(*_):
+            if token_manager.refresh.call_count == 1:
+                raise RequestsConnectionError('network down')
+            # Stop after the renewed token is saved
+            refresher.stop()
+            return renewed
+        token_manager.refresh.side_effect = refresh
+
+        with mock.patch.object(tokenmanager, 'REFRESH_RETRY_SECONDS', 0):
+            refresher.start()
+            refresher.join(timeout=5)
+
+        self.assertFalse(refresher.is_alive())
+        self.assertEqual(token_manager.refresh.call_count, 2)
+        self.assertEqual(credentials['access_token'], 'renewed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the tracing of the commands run with --profile.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from paconn import cli
+from paconn.common import tracing, schemavalidation
+
+_API_DEFINITION = {
+    'swagger': '2.0',
+    'info': {'title': 'Contoso', 'description': 'Contoso connector', 'version': '1.0'},
+    'host': 'contoso.com',
+    'basePath': '/',
+    'schemes': ['https'],
+    'paths': {}
+}
+
+
+class _Response:
+    def __init__(self, status_code, content=b'', body=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+        self.request = mock.Mock(body=body)
+
+
+class TracerTest(unittest.TestCase):
+    """
+    Tests the recorded spans and requests.
+    """
+    def tearDown(self):
+        tracing.finish_tracing()
+
+    def test_nothing_is_recorded_without_tracing(self):
+        with tracing.span('phase') as attributes:
+            attributes['ignored'] = True
+        tracing.record_request('GET', 'https://api.powerapps.com/apis', time.perf_counter(), _Response(200))
+
+        self.assertFalse(tracing.is_tracing())
+        self.assertIsNone(tracing.finish_tracing())
+
+    def test_spans_are_nested_per_thread(self):
+        tracing.start_tracing('update')
+        with tracing.span('update connector', connector_id='connector') as attributes:
+            attributes['hit'] = False
+            thread = threading.Thread(target=tracing.traced('upload', lambda: None, file='icon.png'))
+            thread.start()
+            thread.join()
+            with self.assertRaises(ValueError), tracing.span('validate'):
+                raise ValueError('invalid')
+
+        events = {event['name']: event for event in tracing._TRACER.events}  # pylint: disable=protected-access
+
+        self.assertEqual(events['update connector']['args'], {'connector_id': 'connector', 'hit': False})
+        self.assertEqual(events['validate']['args'], {'parent': 'update connector', 'error': 'ValueError'})
+        # The spans of the other threads aren't nested in the span that started them
+        self.assertEqual(events['upload']['args'], {'file': 'icon.png'})
+        self.assertNotEqual(events['upload']['tid'], events['validate']['tid'])
+
+    def test_requests_are_recorded_by_url_template(self):
+        tracing.start_tracing('update')
+        url = 'https://api.powerapps.com/providers/Microsoft.PowerApps/apis/shared_contoso?$filter=environment'
+        tracing.record_request('PATCH', url, time.perf_counter(), _Response(200, b'{}', b'payload'))
+        tracing.record_request('PATCH', url, time.perf_counter(), attempt=1)
+
+        [succeeded, failed] = tracing._TRACER.events  # pylint: disable=protected-access
+
+        self.assertEqual(succeeded['name'], 'PATCH /providers/Microsoft.PowerApps/apis/{connectorId}')
+        self.assertEqual(succeeded['cat'], tracing.REQUEST)
+        self.assertEqual(succeeded['args'], {
+            'method': 'PATCH',
+            'url': 'https://api.powerapps.com/providers/Microsoft.PowerApps/apis/{connectorId}',
+            'status': 200,
+            'sent': 7,
+            'received': 2,
+            'attempt': 0
+        })
+        self.assertEqual((failed['args']['status'], failed['args']['attempt']), (None, 1))
+
+
+class ProfileTest(unittest.TestCase):
+    """
+    Tests the trace file written by --profile.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.api_definition = os.path.join(self.directory.name, 'apiDefinition.swagger.json')
+        with open(self.api_definition, 'w') as file:
+            json.dump(_API_DEFINITION, file)
+
+        self.displayed = []
+        for patcher in (mock.patch.dict(os.environ, {'HOME': self.directory.name}),
+                        mock.patch.dict(schemavalidation._VALIDATORS, clear=True),  # pylint: disable=protected-access
+                        mock.patch.object(cli, 'display', self.displayed.append)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_trace_file_is_in_the_chrome_trace_format(self):
+        trace_file = os.path.join(self.directory.name, 'trace.json')
+
+        exit_code = cli.invoke(['validate', '--api-def', self.api_definition, '--local', '--profile', trace_file])
+
+        self.assertEqual(exit_code, 0)
+        with open(trace_file) as file:
+            trace = json.load(file)
+        self.assertEqual(trace['displayTimeUnit'], 'ms')
+        self.assertEqual(trace['otherData'], {'command': 'validate'})
+
+        events = trace['traceEvents']
+        self.assertEqual([event['ts'] for event in events], sorted(event['ts'] for event in events))
+        for event in events:
+            self.assertEqual(
+                set(event),
+                {'name', 'cat', 'ph', 'ts', 'dur', 'pid', 'tid', 'args'})
+            self.assertEqual(event['ph'], 'X')
+            self.assertEqual(event['pid'], os.getpid())
+            self.assertIsInstance(event['ts'], int)
+            self.assertIsInstance(event['dur'], int)
+            self.assertGreaterEqual(event['dur'], 0)
+
+        self.assertEqual(
+            {(event['name'], event['cat']) for event in events},
+            {('load file', tracing.PHASE), ('validate schema', tracing.PHASE)})
+        self.assertIn(
+            {'schema': schemavalidation.API_DEFINITION_SCHEMA},
+            [event['args'] for event in events])
+
+        # The summary table is displayed as well
+        self.assertTrue(self.displayed[-1].startswith('Profile of validate: '))
+        self.assertFalse(tracing.is_tracing())
+
+    def test_profile_without_a_file_only_displays_the_summary(self):
+        exit_code = cli.invoke(['validate', '--api-def', self.api_definition, '--local', '--profile'])
+
+        self.assertEqual(exit_code, 0)
+        self.assertIn('validate schema', self.displayed[-1])
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['.paconn', 'apiDefinition.swagger.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
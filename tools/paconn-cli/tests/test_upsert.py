@@ -0,0 +1,215 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the loading and of the deployment of the connector files.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from paconn.settings.settings import Settings
+from paconn.apimanager.apimanager import APIManager
+from paconn.common import filecache
+from paconn.common.ledger import Ledger, LEDGER_FILE, API_PROPERTIES
+from paconn.common.listingcache import get_listing, set_listing, CONNECTORS
+from paconn.operations import upsert
+from paconn.operations.upsert import load_connector, deploy
+
+_API_PROPERTIES = {'properties': {'iconBrandColor': '#007ee5', 'capabilities': []}}
+_API_DEFINITION = {
+    'swagger': '2.0',
+    'info': {'title': 'Contoso', 'description': 'Contoso connector', 'version': '1.0'},
+    'host': 'contoso.com',
+    'basePath': '/',
+    'schemes': ['https'],
+    'paths': {}
+}
+
+
+class LoadConnectorTest(unittest.TestCase):
+    """
+    Tests the payload and the content hashes of a connector.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for (file_name, content) in (('apiProperties.json', _API_PROPERTIES),
+                                     ('apiDefinition.swagger.json', _API_DEFINITION)):
+            with open(os.path.join(self.directory.name, file_name), 'w') as file:
+                json.dump(content, file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _load(self, is_update):
+        settings = Settings(
+            connector_id='connector' if is_update else None,
+            environment='environment',
+            api_properties=os.path.join(self.directory.name, 'apiProperties.json'),
+            api_definition=os.path.join(self.directory.name, 'apiDefinition.swagger.json'),
+            icon=None,
+            script=None,
+            powerapps_url=None,
+            powerapps_api_version=None)
+        return load_connector(settings=settings, client_secret=None, is_update=is_update)
+
+    def test_create_and_update_hash_the_same_properties(self):
+        (created, _, _, create_hashes) = self._load(is_update=False)
+        (updated, _, _, update_hashes) = self._load(is_update=True)
+
+        # The display name is only sent on create, and doesn't prevent skipping the next update
+        self.assertEqual(created['properties']['displayName'], 'Contoso')
+        self.assertNotIn('displayName', updated['properties'])
+        self.assertEqual(create_hashes[API_PROPERTIES], update_hashes[API_PROPERTIES])
+
+
+class _PowerAppsRP:
+    """
+    Records the created and updated connectors and the generated storages.
+    """
+    def __init__(self):
+        self.api_manager = APIManager(
+            scheme='https',
+            region=None,
+            netlocation='api.powerapps.com',
+            base_path='/',
+            api_version='1')
+        self.payloads = []
+        self.storages = 0
+
+    def create_connector(self, environment, payload):  # pylint: disable=unused-argument
+        self.payloads.append(payload)
+        return json.dumps({'name': 'connector'})
+
+    def update_connector(self, environment, connector_id, payload):  # pylint: disable=unused-argument
+        self.payloads.append(payload)
+        return json.dumps({'name': connector_id})
+
+    def generate_resource_storage(self, environment):  # pylint: disable=unused-argument
+        self.storages += 1
+        return {'sharedAccessSignature': 'https://storage.blob.core.windows.net/container?sig=signature'}
+
+
+class _BlobUploader:
+    """
+    Records the uploaded files, and returns blob URIs valid for a day.
+    """
+    uploads = []
+    instances = []
+
+    def __init__(self, sas_url):
+        self.sas_url = sas_url
+        _BlobUploader.instances.append(self)
+
+    def upload(self, file_path):
+        _BlobUploader.uploads.append(file_path)
+        return 'https://storage.blob.core.windows.net/container/{}?se=2099-01-01T00:00:00Z&sig={}'.format(
+            os.path.basename(file_path), len(_BlobUploader.uploads))
+
+
+class DeployTest(unittest.TestCase):
+    """
+    Tests the reuse of the blob URIs of the unchanged uploaded files.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.icon = os.path.join(self.directory.name, 'icon.png')
+        self._write_icon(b'icon')
+        for (file_name, content) in (('apiProperties.json', _API_PROPERTIES),
+                                     ('apiDefinition.swagger.json', _API_DEFINITION)):
+            with open(os.path.join(self.directory.name, file_name), 'w') as file:
+                json.dump(content, file)
+
+        self.powerapps_rp = _PowerAppsRP()
+        _BlobUploader.uploads = []
+        _BlobUploader.instances = []
+        ledger = Ledger(os.path.join(self.directory.name, LEDGER_FILE))
+        for patcher in (mock.patch.object(upsert, 'get_ledger', return_value=ledger),
+                        mock.patch.object(upsert, 'BlobUploader', _BlobUploader),
+                        mock.patch.dict(os.environ, {'HOME': self.directory.name}),
+                        mock.patch.dict(filecache._CACHES, clear=True)):  # pylint: disable=protected-access
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_icon(self, content):
+        with open(self.icon, 'wb') as file:
+            file.write(content)
+
+    def _deploy(self, connector_id=None, version='1.0', force=False, script=None):
+        settings = Settings(
+            connector_id=connector_id,
+            environment='environment',
+            api_properties=os.path.join(self.directory.name, 'apiProperties.json'),
+            api_definition=os.path.join(self.directory.name, 'apiDefinition.swagger.json'),
+            icon=self.icon,
+            script=script,
+            powerapps_url=None,
+            powerapps_api_version=None)
+
+        # A changed swagger, so that the update isn't skipped
+        with open(settings.api_definition, 'w') as file:
+            json.dump(dict(_API_DEFINITION, info=dict(_API_DEFINITION['info'], version=version)), file)
+
+        is_update = connector_id is not None
+        connector = load_connector(settings=settings, client_secret=None, is_update=is_update)
+        deploy(
+            powerapps_rp=self.powerapps_rp,
+            settings=settings,
+            connector=connector,
+            client_secret=None,
+            is_update=is_update,
+            validation=lambda: None,
+            force=force)
+        return self.powerapps_rp.payloads[-1]['properties']['iconUri']
+
+    def test_unchanged_icon_reuses_its_blob(self):
+        icon_uri = self._deploy()
+
+        self.assertEqual(self._deploy(connector_id='connector', version='2.0'), icon_uri)
+        self.assertEqual(_BlobUploader.uploads, [self.icon])
+        self.assertEqual(self.powerapps_rp.storages, 1)
+
+    def test_changed_icon_is_uploaded_again(self):
+        icon_uri = self._deploy()
+        self._write_icon(b'new icon')
+
+        self.assertNotEqual(self._deploy(connector_id='connector', version='2.0'), icon_uri)
+        self.assertEqual(_BlobUploader.uploads, [self.icon, self.icon])
+        self.assertEqual(self.powerapps_rp.storages, 2)
+
+    def test_forced_update_uploads_again(self):
+        icon_uri = self._deploy()
+
+        self.assertNotEqual(self._deploy(connector_id='connector', version='2.0', force=True), icon_uri)
+        self.assertEqual(self.powerapps_rp.storages, 2)
+
+    def test_files_share_one_storage(self):
+        script = os.path.join(self.directory.name, 'script.csx')
+        with open(script, 'w') as file:
+            file.write('script')
+
+        self._deploy(script=script)
+
+        self.assertEqual(sorted(_BlobUploader.uploads), [self.icon, script])
+        self.assertEqual(self.powerapps_rp.storages, 1)
+        self.assertEqual(len(_BlobUploader.instances), 1)
+
+    def test_create_refreshes_the_connector_listing(self):
+        api_manager = self.powerapps_rp.api_manager
+        set_listing(api_manager, CONNECTORS, [('Other', 'other')], 'environment')
+
+        self._deploy()
+
+        self.assertIsNone(get_listing(api_manager, CONNECTORS, 'environment'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""
+Tests of the validation cache, and of the local validation against the bundled schemas.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from paconn.cli import invoke
+from paconn.common import ledger, schemavalidation
+from paconn.common.ledger import Ledger, LEDGER_FILE
+from paconn.operations import validate
+from paconn.settings.settings import Settings
+
+_API_DEFINITION = {
+    'swagger': '2.0',
+    'info': {'title': 'Contoso', 'description': 'Contoso connector', 'version': '1.0'},
+    'host': 'contoso.com',
+    'basePath': '/',
+    'schemes': ['https'],
+    'paths': {}
+}
+
+
+class _PowerAppsRP:
+    """
+    Records the validated swaggers.
+    """
+    def __init__(self):
+        self.validations = []
+
+    def validate_connector(self, payload, enable_certification_rules):  # pylint: disable=unused-argument
+        self.validations.append(payload)
+        return '"Validation {}"'.format(len(self.validations))
+
+
+class ValidationCacheTest(unittest.TestCase):
+    """
+    Tests the reuse of the validation results of the unchanged swaggers.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.api_definition = os.path.join(self.directory.name, 'apiDefinition.swagger.json')
+        self.powerapps_rp = _PowerAppsRP()
+
+        patcher = mock.patch.object(
+            validate, 'get_ledger', return_value=Ledger(os.path.join(self.directory.name, LEDGER_FILE)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _validate(self, content, indent=None, powerapps_url=None, use_cache=True):
+        with open(self.api_definition, 'w') as file:
+            json.dump(content, file, indent=indent)
+        settings = Settings(
+            connector_id=None,
+            environment=None,
+            api_properties=None,
+            api_definition=self.api_definition,
+            icon=None,
+            script=None,
+            powerapps_url=powerapps_url,
+            powerapps_api_version=None)
+        return validate.validate(self.powerapps_rp, settings, use_cache)
+
+    def test_unchanged_swagger_reuses_the_result(self):
+        self.assertEqual(self._validate(_API_DEFINITION), 'Validation 1')
+
+        # Formatting the swagger doesn't change it
+        self.assertEqual(self._validate(_API_DEFINITION, indent=2), 'Validation 1')
+        self.assertEqual(len(self.powerapps_rp.validations), 1)
+
+    def test_changed_swagger_is_validated(self):
+        self._validate(_API_DEFINITION)
+
+        self.assertEqual(self._validate(dict(_API_DEFINITION, host='contoso.net')), 'Validation 2')
+
+    def test_other_service_is_validated(self):
+        self._validate(_API_DEFINITION)
+
+        self.assertEqual(self._validate(_API_DEFINITION, powerapps_url='https://api.powerapps.us'), 'Validation 2')
+
+    def test_no_cache_validates_and_refreshes_the_result(self):
+        self._validate(_API_DEFINITION)
+
+        self.assertEqual(self._validate(_API_DEFINITION, use_cache=False), 'Validation 2')
+        self.assertEqual(self._validate(_API_DEFINITION), 'Validation 2')
+
+    def test_least_recently_used_results_are_evicted(self):
+        swaggers = [dict(_API_DEFINITION, host='{}.com'.format(name)) for name in ('first', 'second', 'third')]
+
+        with mock.patch.object(ledger, 'VALIDATION_LIMIT', 2):
+            self._validate(swaggers[0])
+            self._validate(swaggers[1])
+            self._validate(swaggers[0])
+            self._validate(swaggers[2])
+
+            self.assertEqual(self._validate(swaggers[0]), 'Validation 1')
+            self.assertEqual(self._validate(swaggers[1]), 'Validation 4')
+
+
+class ValidateLocalTest(unittest.TestCase):
+    """
+    Tests validate --local and the cache of the compiled schemas.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.schemas_dir = os.path.join(self.directory.name, '.paconn', 'schemas')
+
+        # The compiled schemas are written under the home directory
+        patcher = mock.patch.dict(os.environ, {'HOME': self.directory.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(schemavalidation._VALIDATORS, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _validate(self, content):
+        api_definition = os.path.join(self.directory.name, 'apiDefinition.swagger.json')
+        with open(api_definition, 'w') as file:
+            json.dump(content, file)
+        return invoke(['validate', '--api-def', api_definition, '--local'])
+
+    def _compiled_modules(self):
+        return sorted(file_name for file_name in os.listdir(self.schemas_dir) if file_name.endswith('.py'))
+
+    def test_valid_file_passes(self):
+        self.assertEqual(self._validate(_API_DEFINITION), 0)
+
+    def test_invalid_file_fails(self):
+        self.assertNotEqual(self._validate(dict(_API_DEFINITION, swagger=2)), 0)
+        self.assertNotEqual(self._validate(dict(_API_DEFINITION, paths=[])), 0)
+
+    def test_compiled_module_is_reused(self):
+        self.assertEqual(self._validate(_API_DEFINITION), 0)
+        compiled_modules = self._compiled_modules()
+        schemavalidation._VALIDATORS.clear()  # pylint: disable=protected-access
+
+        with mock.patch.object(schemavalidation, '_compile') as compile_schema:
+            self.assertEqual(self._validate(_API_DEFINITION), 0)
+
+        compile_schema.assert_not_called()
+        self.assertEqual(self._compiled_modules(), compiled_modules)
+
+    def test_stale_modules_are_removed(self):
+        self.assertEqual(self._validate(_API_DEFINITION), 0)
+        [compiled_module] = self._compiled_modules()
+        schemavalidation._VALIDATORS.clear()  # pylint: disable=protected-access
+
+        # The module of an older version of the schema, and a module of another schema
+        prefix = compiled_module[:-len('0123456789abcdef.py')]
+        stale_module = os.path.join(self.schemas_dir, prefix + '0123456789abcdef.py')
+        other_module = os.path.join(self.schemas_dir, 'other_schema_0123456789abcdef.py')
+        os.rename(os.path.join(self.schemas_dir, compiled_module), stale_module)
+        with open(other_module, 'w'):
+            pass
+
+        self.assertEqual(self._validate(_API_DEFINITION), 0)
+
+        self.assertEqual(self._compiled_modules(), sorted([compiled_module, os.path.basename(other_module)]))
+
+
+if __name__ == '__main__':
+    unittest.main()